@@ -2,16 +2,36 @@ import os
 from dash import Dash
 from layouts.main_layout import create_main_layout
 from callbacks import graph_callbacks
+from routes.export_routes import register_export_routes
+from routes.metrics_routes import register_metrics_routes
+from services import metrics
+from database import events
+from database.db import engine
 
 # Импорт приложения
-from config import app
+from config import app, set as settings
 
 # Инициализация приложения
-app.layout = create_main_layout()
+app.layout = create_main_layout  # Функция: layout строится при каждой загрузке страницы
+
+# Метрики: время SQL всех Engine; колбеки измеряются при регистрации (register_graph_callbacks)
+metrics.instrument_engines()
+metrics.start_flusher()
 
 # Подключение обратных вызовов
 graph_callbacks.register_graph_callbacks(app)
 
+# Выгрузка данных титулов (CSV / Parquet)
+register_export_routes(app)
+
+# Метрики Prometheus: GET /metrics
+register_metrics_routes(app)
+
+# Сброс кэша по уведомлениям о загрузке из других процессов (только PostgreSQL)
+if settings.cache_invalidation_listen:
+    events.start_listener(engine)
+
+# Сервер разработки; в продакшене — gunicorn -c gunicorn.conf.py wsgi:server (start.sh)
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8080))  # Используем порт от Railway
-    app.run_server(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=True)
@@ -0,0 +1,41 @@
+// Клиентские колбеки Dash (подключаются автоматически из assets/)
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    graph: {
+        // Добавляет или удаляет трассу «Сложность» и ось yaxis2 на отрисованном графике моделирования.
+        // overlay — store-complexity-trace (см. complexity_overlay в callbacks/graph_callbacks.py)
+        toggleComplexity: function (toggleComplexity, overlay, figure) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!overlay || !figure || !figure.data) {
+                return noUpdate;
+            }
+
+            const show = (toggleComplexity || []).includes("show_complexity");
+            const index = figure.data.findIndex((trace) => trace.name === overlay.trace.name);
+            const patch = new window.dash_clientside.Patch();
+
+            if (show && index === -1) {
+                patch.append(["data"], overlay.trace);
+                patch.assign(["layout", "yaxis2"], overlay.yaxis2);
+            } else if (!show && index !== -1) {
+                patch.delete(["data", index]);
+                patch.delete(["layout", "yaxis2"]);
+            } else {
+                return noUpdate;
+            }
+            patch.assign(["layout", "title", "text"], show ? overlay.titles.on : overlay.titles.off);
+            return patch.build();
+        },
+
+        // Ширина линейного графика в пикселях при загрузке страницы: предел точек LTTB на сервере
+        graphWidth: function () {
+            const graph = document.getElementById("line-graph");
+            const width = Math.round(graph ? graph.getBoundingClientRect().width : window.innerWidth);
+            return width > 0 ? width : window.dash_clientside.no_update;
+        },
+
+        // Опрос live-interval включён только при отмеченном «Живой режим»
+        liveIntervalDisabled: function (toggleLive) {
+            return !(toggleLive || []).includes("live");
+        },
+    },
+});
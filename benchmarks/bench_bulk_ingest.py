@@ -0,0 +1,64 @@
+"""
+Сравнение построчной загрузки (create_modeling_data) и пакетной (bulk_create_modeling_data).
+
+    python -m benchmarks.bench_bulk_ingest --rows 20000
+"""
+import argparse
+import datetime
+import random
+
+from benchmarks.common import add_reset_argument, reset_database, seed_dimensions, timed
+from database.db import SessionLocal
+from database import crud
+
+
+def make_rows(count: int, title_name: str, executor_numbers: list):
+    start = datetime.date(2020, 1, 1)
+    for i in range(count):
+        yield {
+            "date": start + datetime.timedelta(days=i % 1500),
+            "executor_number": random.choice(executor_numbers),
+            "title_name": title_name,
+            "total_mass": random.uniform(1e6, 5e7),
+            "total_complexity": random.uniform(1, 10),
+            "number_of_records": random.randint(1, 100),
+        }
+
+
+def per_row(db, rows):
+    # Старый путь: два поиска и add/commit/refresh на каждую строку
+    for row in rows:
+        row = dict(row)
+        executor = crud.get_executor_by_number(db, row.pop("executor_number"))
+        title = crud.get_title_by_name(db, row.pop("title_name"))
+        row["executor_id"] = executor.id
+        row["title_id"] = title.id
+        crud.create_modeling_data(db, row)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    db = SessionLocal()
+    try:
+        _, executor_numbers = seed_dimensions(db)
+        rows = list(make_rows(args.rows, "title-0", executor_numbers))
+
+        _, slow = timed(f"per-row create_modeling_data ({args.rows} rows)", per_row, db, rows)
+        _, fast = timed(
+            f"bulk_create_modeling_data ({args.rows} rows)",
+            crud.bulk_create_modeling_data, db, rows, chunk_size=args.chunk_size,
+        )
+        print(f"speedup: {slow / fast:.1f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Чтение большого результата в DataFrame: .all() + pd.DataFrame(rows) + to_datetime
+против services.frames.read_frame (пакеты yield_per в типизированные NumPy-колонки).
+Печатает время (без трассировки) и пиковую память (отдельный прогон под tracemalloc) для обоих путей.
+Прогон "GC отключён" показывает долю сборщика мусора в чтении: в сервисах сборщик не отключается —
+gc.disable() действует на весь процесс, в том числе на параллельные запросы.
+
+    python -m benchmarks.bench_frame_fetch --rows 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+from sqlalchemy import select
+
+from benchmarks.bench_numeric_fetch import seed
+from benchmarks.common import add_reset_argument, reset_database
+from database import models
+from database.db import session_scope
+from services.frames import DEFAULT_CHUNK_SIZE, as_float, read_frame
+
+COLUMNS = {"Дата": "datetime64[ns]", "executor_id": "int64", "Масса": "float64", "Сложность": "float64"}
+
+
+def statement():
+    data = models.ModelingData
+    return select(data.date, data.executor_id, as_float(data.total_mass), as_float(data.total_complexity))
+
+
+def rows_path():
+    # Прежний путь: список Row целиком, DataFrame из кортежей, затем преобразование даты
+    with session_scope() as db:
+        df = pd.DataFrame(db.execute(statement()).all(), columns=list(COLUMNS))
+    df["Дата"] = pd.to_datetime(df["Дата"], errors="coerce")
+    return df
+
+
+def columnar_path(chunk_size: int):
+    with session_scope() as db:
+        return read_frame(db, statement(), COLUMNS, chunk_size=chunk_size)
+
+
+def gc_disabled(fn):
+    def run():
+        gc.disable()
+        try:
+            return fn()
+        finally:
+            gc.enable()
+
+    return run
+
+
+def measure(label: str, fn):
+    # tracemalloc заметно замедляет построчное создание объектов, поэтому время и память — разными прогонами
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed:8.3f} s   peak {peak / 2**20:8.1f} MiB   dtypes {sorted(set(map(str, df.dtypes)))}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    seed(args.rows)
+    measure("rows + DataFrame + to_datetime", rows_path)
+    measure(f"read_frame (chunk {args.chunk_size})", lambda: columnar_path(args.chunk_size))
+    measure("read_frame, GC отключён", gc_disabled(lambda: columnar_path(args.chunk_size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Время запросов дашборда до и после создания составных индексов (title_id, date) / (title_id, executor_id).
+Замеряются только запросы к таблицам фактов: ряды графиков сервисы читают из агрегатов
+TitleDailyStats, на которые эти индексы не влияют, поэтому дневные ряды считаются здесь
+напрямую по фактам (так же, как их пересчитывает database/rollups.py).
+
+    python -m benchmarks.bench_indexes --rows 2000000 --titles 200
+"""
+import argparse
+import datetime
+import random
+
+from sqlalchemy import func, select
+
+from benchmarks.common import add_reset_argument, engine, reset_database, seed_dimensions, timed
+from database.db import SessionLocal, session_scope
+from database import crud, migrations, models
+from services.executor_service import get_executors_data_by_project
+from services.cache import service_cache
+
+
+def make_rows(count: int, title_ids: list, executor_ids: list, fields):
+    start = datetime.date(2018, 1, 1)
+    for _ in range(count):
+        row = {
+            "date": start + datetime.timedelta(days=random.randrange(2500)),
+            "title_id": random.choice(title_ids),
+            "executor_id": random.choice(executor_ids),
+        }
+        row.update(fields())
+        yield row
+
+
+def seed(db, rows: int, title_ids: list, executor_ids: list):
+    crud.bulk_create_modeling_data(db, make_rows(rows, title_ids, executor_ids, lambda: {
+        "total_mass": random.uniform(1e6, 5e7),
+        "total_complexity": random.uniform(1, 10),
+        "number_of_records": random.randint(1, 100),
+    }))
+    crud.bulk_create_drawing_data(db, make_rows(rows // 4, title_ids, executor_ids, lambda: {
+        "number_of_drawings": random.randint(1, 5),
+    }))
+    crud.bulk_create_work_hours_in_tekla(db, make_rows(rows // 2, title_ids, executor_ids, lambda: {
+        "hours_worked": random.uniform(0.5, 8),
+    }))
+    crud.bulk_create_work_hours_in_work_section(db, make_rows(rows // 2, title_ids, executor_ids, lambda: {
+        "hours_worked": random.uniform(0.5, 8),
+    }))
+
+
+def fact_series_queries(title_id: int) -> dict:
+    """Дневные ряды титула по таблицам фактов: фильтр по title_id и группировка по date."""
+    def daily(model, *columns):
+        return select(model.date, *columns).where(model.title_id == title_id).group_by(model.date).order_by(model.date)
+
+    return {
+        "modeling_data по дням": daily(
+            models.ModelingData, func.sum(models.ModelingData.total_mass), func.avg(models.ModelingData.total_complexity),
+        ),
+        "drawing_data по дням": daily(models.DrawingData, func.sum(models.DrawingData.number_of_drawings)),
+        "work_hours_in_tekla по дням": daily(models.WorkHoursInTekla, func.sum(models.WorkHoursInTekla.hours_worked)),
+    }
+
+
+def run_queries(title_id: int, label: str):
+    with session_scope() as db:
+        timed(f"[{label}] get_executors_data_by_project(from_facts)",
+              lambda: get_executors_data_by_project(db_session=db, title_id=title_id, from_facts=True))
+        for name, query in fact_series_queries(title_id).items():
+            timed(f"[{label}] {name}", lambda: db.execute(query).all())
+    service_cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--titles", type=int, default=200)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    migrations.drop_declared_indexes(engine)
+
+    db = SessionLocal()
+    try:
+        title_ids, _ = seed_dimensions(db, titles=args.titles)
+        executor_ids = [executor_id for (executor_id,) in db.query(models.Executor.id).all()]
+        timed(f"seed {args.rows} modeling rows (+ drawings / hours)", seed, db, args.rows, title_ids, executor_ids)
+    finally:
+        db.close()
+
+    title_id = title_ids[len(title_ids) // 2]
+    run_queries(title_id, "no indexes")
+    timed("create_missing_indexes", migrations.create_missing_indexes, engine)
+    run_queries(title_id, "indexes")
+
+
+if __name__ == "__main__":
+    main()
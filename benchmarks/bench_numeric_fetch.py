@@ -0,0 +1,76 @@
+"""
+Получение миллиона значений NUMERIC: Decimal на строку + .astype(float) против CAST(... AS FLOAT).
+Печатает время и пиковую память (tracemalloc) для обоих путей.
+
+    python -m benchmarks.bench_numeric_fetch --rows 1000000
+"""
+import argparse
+import datetime
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+from sqlalchemy import Numeric, select, type_coerce
+
+from benchmarks.common import add_reset_argument, reset_database, seed_dimensions
+from database import crud, models
+from database.db import SessionLocal, session_scope
+from services.frames import as_float
+
+
+def seed(rows: int):
+    db = SessionLocal()
+    try:
+        title_ids, executor_numbers = seed_dimensions(db)
+        start = datetime.date(2015, 1, 1)
+        crud.bulk_create_modeling_data(db, (
+            {"date": start + datetime.timedelta(days=i % 3650), "title_id": title_ids[0],
+             "executor_number": random.choice(executor_numbers),
+             "total_mass": random.uniform(1e6, 5e7), "total_complexity": random.uniform(1, 10)}
+            for i in range(rows)
+        ))
+    finally:
+        db.close()
+
+
+def decimal_path():
+    # Прежний путь: Numeric(asdecimal=True) -> Decimal в каждой ячейке -> DataFrame object -> astype(float)
+    data = models.ModelingData
+    stmt = select(type_coerce(data.total_mass, Numeric()), type_coerce(data.total_complexity, Numeric()))
+    with session_scope() as db:
+        df = pd.DataFrame(db.execute(stmt).all(), columns=["mass", "complexity"])
+    return df.astype(float)
+
+
+def float_path():
+    data = models.ModelingData
+    stmt = select(as_float(data.total_mass), as_float(data.total_complexity))
+    with session_scope() as db:
+        return pd.DataFrame(db.execute(stmt).all(), columns=["mass", "complexity"])
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<30} {elapsed:8.3f} s   peak {peak / 2**20:8.1f} MiB   dtypes {sorted(set(map(str, df.dtypes)))}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    seed(args.rows)
+    measure("Decimal + astype(float)", decimal_path)
+    measure("CAST AS FLOAT", float_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Обзор проекта с сотнями титулов: суммирование таблиц фактов против агрегатов и повторный вызов из кэша.
+
+    python -m benchmarks.bench_project_overview --rows 1000000 --titles 300
+"""
+import argparse
+
+from benchmarks.bench_indexes import seed
+from benchmarks.common import add_reset_argument, reset_database, seed_dimensions, timed
+from database import models
+from database.db import SessionLocal, session_scope
+from services.project_service import _project_overview_cache, get_project_overview
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--titles", type=int, default=300)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    db = SessionLocal()
+    try:
+        title_ids, executor_numbers = seed_dimensions(db, titles=args.titles)
+        executor_ids = [executor.id for executor in db.query(models.Executor).all()]
+        project_id = db.query(models.Title.project_id).filter(models.Title.id == title_ids[0]).scalar()
+        timed(f"seed ({args.rows} modeling rows, {args.titles} titles)", seed, db, args.rows, title_ids, executor_ids)
+    finally:
+        db.close()
+
+    with session_scope() as db:
+        facts, _ = timed("get_project_overview(from_facts)", get_project_overview, db, project_id, from_facts=True)
+        rollup, _ = timed("get_project_overview (агрегаты)", get_project_overview, db, project_id)
+        timed("get_project_overview (кэш)", get_project_overview, db, project_id)
+    _project_overview_cache.clear()
+
+    numeric = [column for column in rollup.columns if column != "title_name"]
+    difference = (rollup[numeric] - facts[numeric]).abs().max().max()
+    print(f"титулов: {len(rollup)}, максимальное расхождение агрегатов с фактами: {difference:.3g}")
+
+
+if __name__ == "__main__":
+    main()
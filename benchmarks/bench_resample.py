@@ -0,0 +1,62 @@
+"""
+Сравнение группировки по неделям / месяцам через to_period(...).apply(lambda) (прежняя
+реализация create_line_graph) и векторизованного resample_series на 10-летних дневных рядах.
+
+    python -m benchmarks.bench_resample --years 10 --repeat 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.resample_service import resample_series
+
+AGGREGATIONS = {"Масса": "sum", "Сложность": "mean", "Плановая масса": "sum"}
+PERIODS = {"week": "W", "month": "M"}
+
+
+def make_series(years: int) -> pd.DataFrame:
+    dates = pd.date_range("2015-01-01", periods=365 * years, freq="D")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Дата": dates,
+        "Масса": rng.uniform(0, 1, len(dates)),
+        "Сложность": rng.uniform(1, 10, len(dates)),
+        "Плановая масса": rng.uniform(0, 1, len(dates)),
+    })
+
+
+def period_apply(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    df = df.copy()
+    df["bucket"] = df["Дата"].dt.to_period(PERIODS[interval]).apply(lambda r: r.start_time)
+    return df.groupby("bucket").agg(AGGREGATIONS).reset_index().rename(columns={"bucket": "Дата"})
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_series(args.years)
+    print(f"{len(df)} daily rows")
+    for interval in PERIODS:
+        expected = period_apply(df, interval)
+        actual = resample_series(df, interval, AGGREGATIONS)
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_index_type=False)
+
+        old = measure(lambda: period_apply(df, interval), args.repeat)
+        new = measure(lambda: resample_series(df, interval, AGGREGATIONS), args.repeat)
+        print(f"{interval:<8} to_period.apply {old:8.2f} ms   resample_series {new:8.2f} ms   speedup {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Выбор титула: три последовательных синхронных запроса против параллельного gather_title_data.
+Для SQLite нужен aiosqlite (pip install aiosqlite), для PostgreSQL — asyncpg из requirements.txt.
+
+    python -m benchmarks.bench_title_fetch --rows 200000 --repeat 20
+"""
+import argparse
+import datetime
+import random
+
+from benchmarks.common import add_reset_argument, reset_database, seed_dimensions, timed
+from benchmarks.bench_indexes import seed
+from database import crud, models
+from database.db import SessionLocal, session_scope
+from services.cache import service_cache
+from services.drawing_service import get_data_for_project
+from services.executor_service import get_executors_data_by_project
+from services.project_service import get_time_by_chapter_for_title
+from services.title_service import gather_title_data
+
+
+def serial(title_id: int):
+    with session_scope() as db:
+        get_data_for_project(db, title_id=title_id)
+        get_time_by_chapter_for_title(db, title_id=title_id)
+        get_executors_data_by_project(db, title_id=title_id)
+
+
+def repeat(fn, count: int, *args):
+    for _ in range(count):
+        service_cache.clear()
+        fn(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--titles", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    add_reset_argument(parser)
+    args = parser.parse_args()
+
+    reset_database(force=args.reset)
+    db = SessionLocal()
+    try:
+        title_ids, executor_numbers = seed_dimensions(db, titles=args.titles)
+        executor_ids = [executor_id for (executor_id,) in db.query(models.Executor.id).all()]
+        seed(db, args.rows, title_ids, executor_ids)
+        chapters = [crud.create_title_chapter(db, f"chapter-{i}", title_ids[0]).id for i in range(10)]
+        crud.bulk_create_worksection_tasks(db, (
+            {"task_name": f"task-{i}", "date": datetime.date(2020, 1, 1), "time": random.uniform(1, 8), "money": 0,
+             "executor_number": random.choice(executor_numbers), "title_id": title_ids[0], "chapter_id": random.choice(chapters)}
+            for i in range(args.rows // 10)
+        ))
+    finally:
+        db.close()
+
+    timed(f"serial sync x{args.repeat}", repeat, serial, args.repeat, title_ids[0])
+    timed(f"gather_title_data x{args.repeat}", repeat, gather_title_data, args.repeat, title_ids[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Общие утилиты для бенчмарков.
+
+База бенчмарка задаётся отдельной переменной BENCH_DATABASE_URL (по умолчанию — временный
+файл SQLite); DATABASE_URL окружения не используется, чтобы не задеть рабочую базу.
+Модуль нужно импортировать до любых модулей из database/.
+Запуск бенчмарков из корня репозитория: python -m benchmarks.<имя>
+
+reset_database удаляет таблицы только в базе, которую создал бенчмарк (временный файл
+или база с таблицей benchmark_marker); непустую чужую базу — только с флагом --reset.
+"""
+import os
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "project_dashboard_bench.sqlite3")
+DEFAULT_DATABASE_URL = f"sqlite:///{DB_PATH}"
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL)
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect  # noqa: E402
+
+from database.db import Base, engine  # noqa: E402
+from database import models  # noqa: E402
+
+# Метка базы, созданной бенчмарком: таблица вне Base.metadata, drop_all её не удаляет
+_marker = Table("benchmark_marker", MetaData(), Column("id", Integer, primary_key=True))
+
+
+def add_reset_argument(parser):
+    """Флаг --reset: разрешить reset_database пересоздать таблицы в базе, созданной не бенчмарком."""
+    parser.add_argument(
+        "--reset", action="store_true",
+        help="Удалить все таблицы BENCH_DATABASE_URL, даже если базу создал не бенчмарк",
+    )
+
+
+def reset_database(force: bool = False):
+    """
+    Пересоздаёт все таблицы в базе бенчмарка.
+
+    :param force: удалить таблицы, даже если база не помечена как созданная бенчмарком
+    """
+    tables = inspect(engine).get_table_names()
+    owned = BENCH_DATABASE_URL == DEFAULT_DATABASE_URL or _marker.name in tables
+    if tables and not owned and not force:
+        raise SystemExit(
+            f"{engine.url.render_as_string(hide_password=True)}: база создана не бенчмарком "
+            f"(нет таблицы {_marker.name}), таблицы не удалены. Для пересоздания запустите с --reset."
+        )
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    _marker.create(bind=engine, checkfirst=True)
+
+
+def seed_dimensions(db, titles: int = 1, executors: int = 50):
+    """
+    Создаёт проект, титулы и исполнителей.
+
+    :return: (список id титулов, список executor_number)
+    """
+    project = models.Project(project_name="bench")
+    db.add(project)
+    db.flush()
+
+    title_objs = [models.Title(title_name=f"title-{i}", project_id=project.id, initial_mass=1000) for i in range(titles)]
+    executor_objs = [models.Executor(executor_number=1000 + i, executor_name=f"executor-{i}") for i in range(executors)]
+    db.add_all(title_objs + executor_objs)
+    db.commit()
+
+    return [t.id for t in title_objs], [e.executor_number for e in executor_objs]
+
+
+def timed(label: str, fn, *args, **kwargs):
+    """Выполняет fn, печатает время выполнения и возвращает (результат, секунды)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<50} {elapsed:10.3f} s")
+    return result, elapsed
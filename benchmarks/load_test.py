@@ -0,0 +1,151 @@
+"""
+Нагрузочный тест запущенного дашборда: параллельные запросы колбеков Dash по HTTP,
+пропускная способность и перцентили задержки по сценариям.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+    python -m benchmarks.load_test --url http://127.0.0.1:8080 --title-id 1 --title-id 2 --concurrency 16 --requests 500
+
+Сценарии (по кругу):
+  title    — выбор титула: снимок всех рядов (store-title-snapshot);
+  table    — страница таблицы специалистов;
+  progress — прогресс-бар титула;
+  overview — обзор проекта (если задан --project-id).
+"""
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _payload(output: str, inputs: list, state: list = ()) -> dict:
+    outputs = [
+        dict(zip(("id", "property"), part.split(".")))
+        for part in (output[2:-2].split("...") if output.startswith("..") else [output])
+    ]
+    return {
+        "output": output,
+        "outputs": outputs if output.startswith("..") else outputs[0],
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+        "state": [{"id": i, "property": p, "value": v} for i, p, v in state],
+        "changedPropIds": [f"{i}.{p}" for i, p, _ in inputs[:1]],
+    }
+
+
+def scenarios(title_ids: list, project_id: int = None):
+    """Генератор (имя сценария, тело запроса) по кругу."""
+    requests = []
+    for title_id in title_ids:
+        requests.append(("title", _payload("store-title-snapshot.data", [("title-dropdown", "value", title_id)])))
+        requests.append(("table", _payload(
+            "..specialist-table.data...specialist-table.page_count...specialist-table.page_current..",
+            [
+                ("store-title-snapshot", "data", {"title_id": title_id}),
+                ("specialist-table", "page_current", 0),
+                ("specialist-table", "page_size", 5),
+                ("specialist-table", "sort_by", []),
+                ("specialist-table", "filter_query", ""),
+            ],
+        )))
+        requests.append(("progress", _payload(
+            "..progress-bar.style...progress-label.children..",
+            [("title-dropdown", "value", title_id), ("live-interval", "n_intervals", None)],
+        )))
+    if project_id is not None:
+        requests.append(("overview", _payload(
+            "..project-overview-container.style...project-overview-summary.children...project-overview-graph.figure..",
+            [("project-dropdown", "value", project_id)],
+        )))
+    return itertools.cycle(requests)
+
+
+def send(url: str, body: bytes, timeout: float):
+    """:return: (секунды, байт ответа, ошибка или None)"""
+    request = urllib.request.Request(
+        f"{url}/_dash-update-component", data=body, headers={"Content-Type": "application/json"}, method="POST",
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            size = len(response.read())
+        return time.perf_counter() - start, size, None
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        return time.perf_counter() - start, 0, str(e)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def report(label: str, latencies: list, sizes: list, errors: int, elapsed: float):
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{label:<10} {len(ms):>7} {len(ms) / elapsed:>9.1f} "
+        f"{percentile(ms, 50):>8.1f} {percentile(ms, 90):>8.1f} {percentile(ms, 99):>8.1f} "
+        f"{(max(ms) if ms else float('nan')):>8.1f} {(statistics.mean(sizes) / 1024 if sizes else 0):>8.1f} {errors:>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест колбеков дашборда")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--title-id", type=int, action="append", dest="title_ids", required=True)
+    parser.add_argument("--project-id", type=int)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10, help="Запросов до начала замера")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    source = scenarios(args.title_ids, args.project_id)
+    source_lock = threading.Lock()
+
+    def next_request():
+        with source_lock:
+            name, payload = next(source)
+        return name, json.dumps(payload).encode("utf-8")
+
+    for _ in range(args.warmup):
+        send(args.url, next_request()[1], args.timeout)
+
+    results = defaultdict(lambda: {"latencies": [], "sizes": [], "errors": 0})
+
+    def worker(_):
+        name, body = next_request()
+        seconds, size, error = send(args.url, body, args.timeout)
+        return name, seconds, size, error
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for name, seconds, size, error in pool.map(worker, range(args.requests)):
+            if error:
+                results[name]["errors"] += 1
+                continue
+            results[name]["latencies"].append(seconds)
+            results[name]["sizes"].append(size)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} запросов, {args.concurrency} параллельно, {elapsed:.2f} s")
+    print(f"{'сценарий':<10} {'запросов':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'KiB':>8} {'ошибок':>6}")
+    for name, result in results.items():
+        report(name, result["latencies"], result["sizes"], result["errors"], elapsed)
+    report(
+        "всего",
+        [value for result in results.values() for value in result["latencies"]],
+        [value for result in results.values() for value in result["sizes"]],
+        sum(result["errors"] for result in results.values()),
+        elapsed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,19 @@
-from dash import Input, Output, callback_context
+from dash import ClientsideFunction, Input, Output, Patch, State, callback_context, no_update
 import plotly.graph_objects as go
-from services.project_service import get_project_list, get_time_by_chapter_for_title
-from services.drawing_service import get_data_for_project, get_drawing_data_for_project
-from services.executor_service import get_executors_data_by_project
+from services.figure_payload import compact_trace, figure_payload, list_figure, max_points_for_width, sample_indices
+from services.metrics import instrument_app, report_error
+from services.resample_service import resample_series
+from services.title_service import get_title_snapshot, frame_from_columns, frame_to_columns
+from services.project_service import get_project_list_cached, get_project_overview
+from services.executor_service import get_executors_page
+from services.drawing_service import get_comparison_data, get_data_since, get_drawing_data_since
+from services.progress_service import get_title_progress
 import database.db as database
 import database.models as models
+import datetime
+import math
 import pandas as pd
-from config import app
-
-# Функция для получения данных для графика
-def fetch_data_for_graph(db_session, selected_title, interval, toggle_switch_m_or_d):
-    try:
-        # Возвращаем данные в зависимости от состояния переключателя
-        if toggle_switch_m_or_d:
-            return get_data_for_project(db=db_session, title_id=selected_title)
-        return get_drawing_data_for_project(db=db_session, title_id=selected_title)
-    except Exception as e:
-        print(f"Error fetching data for graph: {e}")
-        return pd.DataFrame()  # Возвращаем пустой DataFrame в случае ошибки
+from config import app, set as settings
 
 # Функция для создания круговой диаграммы
 def create_pie_chart(df_pie):
@@ -42,39 +38,81 @@ def create_pie_chart(df_pie):
             )
         )
     except Exception as e:
-        print(f"Error creating pie chart: {e}")
+        report_error(f"Error creating pie chart: {e}")
         return go.Figure()  # Возвращаем пустую фигуру в случае ошибки
 
-# Функция для создания линейного графика
+# Обзор проекта: масса, плановая масса и проектный тоннаж по титулам
+def create_project_overview_chart(df_overview):
+    try:
+        names = df_overview["title_name"].astype(str)
+        return go.Figure(
+            data=[
+                go.Bar(x=names, y=df_overview["mass"], name="Масса, т", marker_color="#3b5998"),
+                go.Bar(x=names, y=df_overview["plan_mass"], name="Плановая масса", marker_color="#FFA500"),
+                go.Bar(x=names, y=df_overview["initial_mass"], name="Проектный тоннаж, т", marker_color="#8BC34A"),
+            ],
+            layout=go.Layout(
+                barmode="group",
+                hovermode="x unified",
+                margin=dict(l=40, r=10, t=10, b=40),
+                plot_bgcolor="#f9f9f9",
+                paper_bgcolor="#f9f9f9",
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+            )
+        )
+    except Exception as e:
+        report_error(f"Error creating project overview chart: {e}")
+        return go.Figure()
+
+def project_overview_summary(df_overview):
+    planned = df_overview["initial_mass"].sum()
+    return (
+        f"Титулов: {len(df_overview)} · "
+        f"Масса: {df_overview['mass'].sum():,.1f} т из {planned:,.1f} т · "
+        f"Плановая масса: {df_overview['plan_mass'].sum():,.1f} · "
+        f"Чертежи: {int(df_overview['drawings'].sum()):,} · "
+        f"Часы: {df_overview['work_section_hours'].sum():,.1f} (Tekla {df_overview['tekla_hours'].sum():,.1f})"
+    ).replace(",", " ")
+
+# Трасса сложности и оформление вторичной оси; используются и при полной сборке, и в store-complexity-trace
+def create_complexity_trace(df_line):
+    return go.Scatter(
+        x=df_line["Дата"], y=df_line["Сложность"],
+        mode="lines+markers", name="Сложность",
+        line=dict(color="#FF5722", width=2),
+        marker=dict(color="#2196F3", size=6),
+        yaxis="y2"
+    )
+
+COMPLEXITY_YAXIS = dict(title="Сложность", tickfont=dict(color="#FF5722"), overlaying="y", side="right")
+
+def modeling_graph_title(interval, show_complexity):
+    if show_complexity:
+        return f"Линейный график производительности и сложности ({interval})"
+    return f"Линейный график производительности ({interval})"
+
+# Подготовка ряда для линейного графика: приведение даты и агрегация по интервалу
+def prepare_line_data(df_line, interval, toggle_switch_m_or_d):
+    if not isinstance(df_line, pd.DataFrame):
+        raise TypeError("Expected df_line to be a DataFrame")
+    if "Дата" not in df_line.columns:
+        raise KeyError("Column 'Дата' not found in the DataFrame")
+
+    # Преобразование столбца "Дата" в datetime
+    df_line["Дата"] = pd.to_datetime(df_line["Дата"], errors="coerce")
+
+    if interval in ["week", "month", "quarter"]:
+        agg_dict = {"Всего чертежей": "sum"} if not toggle_switch_m_or_d else {
+            "Масса": "sum",
+            "Сложность": "mean",
+            "Плановая масса": "sum"
+        }
+        df_line = resample_series(df_line, interval, agg_dict)
+    return df_line
+
+# Функция для создания линейного графика (df_line — ряд после prepare_line_data)
 def create_line_graph(df_line, interval, toggle_switch_m_or_d, toggle_complexity):
     try:
-        if not isinstance(df_line, pd.DataFrame):
-            raise TypeError("Expected df_line to be a DataFrame")
-        if "Дата" not in df_line.columns:
-            raise KeyError("Column 'Дата' not found in the DataFrame")
-
-        # Преобразование столбца "Дата" в datetime
-        df_line["Дата"] = pd.to_datetime(df_line["Дата"], errors="coerce")
-        
-        if interval == "week":
-            df_line["Неделя"] = df_line["Дата"].dt.to_period("W").apply(lambda r: r.start_time)
-            group_col = "Неделя"
-        elif interval == "month":
-            df_line["Месяц"] = df_line["Дата"].dt.to_period("M").apply(lambda r: r.start_time)
-            group_col = "Месяц"
-        else:
-            group_col = "Дата"
-
-        if interval in ["week", "month"]:
-            agg_dict = {"Всего чертежей": "sum"} if not toggle_switch_m_or_d else {
-                "Масса": "sum",
-                "Сложность": "mean",
-                "Плановая масса": "sum"
-            }
-            df_line = df_line.groupby(group_col).agg(agg_dict).reset_index().rename(columns={group_col: "Дата"})
-        else:
-            df_line = df_line
-        
         # Создание графика
         line_fig = go.Figure()
 
@@ -96,25 +134,21 @@ def create_line_graph(df_line, interval, toggle_switch_m_or_d, toggle_complexity
                 yaxis="y1"
             ))
 
-            if "show_complexity" in toggle_complexity:
-                line_fig.add_trace(go.Scatter(
-                    x=df_line["Дата"], y=df_line["Сложность"],
-                    mode="lines+markers", name="Сложность",
-                    line=dict(color="#FF5722", width=2),
-                    marker=dict(color="#2196F3", size=6),
-                    yaxis="y2"
-                ))
-
-                line_fig.update_layout(
-                    title=f"Линейный график производительности и сложности ({interval})",
-                    xaxis_title="Дата",
-                    yaxis=dict(title="Масса", tickfont=dict(color="#4CAF50")),  
-                    yaxis2=dict(title="Сложность", tickfont=dict(color="#FF5722"), overlaying="y", side="right"),
-                    hovermode="x unified",
-                    plot_bgcolor="#f9f9f9",
-                    paper_bgcolor="#f9f9f9",
-                    legend=dict(title="Показатели", orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-                )
+            show_complexity = "show_complexity" in (toggle_complexity or [])
+            line_fig.update_layout(
+                title=modeling_graph_title(interval, show_complexity),
+                xaxis_title="Дата",
+                yaxis=dict(title="Масса", tickfont=dict(color="#4CAF50")),
+                hovermode="x unified",
+                plot_bgcolor="#f9f9f9",
+                paper_bgcolor="#f9f9f9",
+                legend=dict(title="Показатели", orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+            )
+
+            if show_complexity:
+                # Сложность добавляется последней трассой (её же добавляет / удаляет assets/clientside.js)
+                line_fig.add_trace(create_complexity_trace(df_line))
+                line_fig.update_layout(yaxis2=COMPLEXITY_YAXIS)
         else:
             # Добавляем линии для "Всего чертежей"
             line_fig.add_trace(go.Scatter(
@@ -137,57 +171,424 @@ def create_line_graph(df_line, interval, toggle_switch_m_or_d, toggle_complexity
 
         return line_fig
     except Exception as e:
-        print(f"Error creating line graph: {e}")
+        report_error(f"Error creating line graph: {e}")
         return go.Figure()  # Возвращаем пустую фигуру в случае ошибки
 
+# Сравнение титулов: по линии на титул (масса или чертежи), с агрегацией по интервалу
+def create_comparison_graph(df_compare, interval, toggle_switch_m_or_d):
+    try:
+        metric = "Масса" if toggle_switch_m_or_d else "Всего чертежей"
+        line_fig = go.Figure()
+
+        for (title_id, title_name), group in df_compare.groupby(["title_id", "title_name"], sort=False):
+            group = group[group[metric].notna()]
+            if interval in ["week", "month", "quarter"]:
+                group = resample_series(group, interval, {metric: "sum"})
+            line_fig.add_trace(go.Scatter(
+                x=group["Дата"], y=group[metric],
+                mode="lines", name=str(title_name),
+                line=dict(width=2),
+            ))
+
+        line_fig.update_layout(
+            title=f"Сравнение титулов: {metric.lower()} ({interval})",
+            xaxis_title="Дата",
+            yaxis=dict(title=metric),
+            hovermode="x unified",
+            plot_bgcolor="#f9f9f9",
+            paper_bgcolor="#f9f9f9",
+            legend=dict(title="Титулы", orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        )
+        return line_fig
+    except Exception as e:
+        report_error(f"Error creating comparison graph: {e}")
+        return go.Figure()
+
+def complexity_overlay(df_line, interval, compact=True, max_points=None):
+    """
+    Трасса «Сложность», ось yaxis2 и оба заголовка для store-complexity-trace: по ним клиентский колбек
+    добавляет или удаляет сложность на уже отрисованном графике без запроса к серверу.
+
+    :param df_line: Ряд моделирования после prepare_line_data
+    :param interval: Интервал агрегации (для заголовка)
+    :param compact: False — x/y списками (живой режим дописывает в них точки)
+    :param max_points: Предел точек LTTB; по умолчанию settings.line_graph_max_points. Точки выбираются
+        по ряду «Масса», как для трасс графика (figure_payload), чтобы сложность совпадала с ними по датам
+    """
+    trace = create_complexity_trace(df_line).to_plotly_json()
+    if not compact:
+        trace = list_figure(go.Figure(trace))["data"][0]
+    elif settings.compact_figures:
+        max_points = settings.line_graph_max_points if max_points is None else max_points
+        trace = compact_trace(trace, keep=sample_indices(df_line["Дата"].to_numpy(), df_line["Масса"].to_numpy(), max_points))
+    return {
+        "trace": trace,
+        "yaxis2": COMPLEXITY_YAXIS,
+        "titles": {
+            "on": modeling_graph_title(interval, True),
+            "off": modeling_graph_title(interval, False),
+        },
+    }
+
+def line_figure(series, interval, toggle_switch_m_or_d, toggle_complexity, max_points, extendable=False):
+    """
+    Линейный график титула и store-complexity-trace из дневного ряда (снимок и строки живого режима).
+
+    :param extendable: True — x/y списками, чтобы живой режим дописывал точки через Patch
+    :return: (фигура, overlay или None, df_line после prepare_line_data)
+    """
+    df_line = prepare_line_data(series, interval, toggle_switch_m_or_d)
+    line_fig = create_line_graph(df_line, interval, toggle_switch_m_or_d, toggle_complexity)
+    overlay = complexity_overlay(df_line, interval, not extendable, max_points) if toggle_switch_m_or_d else None
+    return (list_figure(line_fig) if extendable else figure_payload(line_fig, max_points)), overlay, df_line
+
+def comparison_figure(compare_titles, interval, toggle_switch_m_or_d, max_points):
+    """
+    График сравнения титулов. Ряды берутся из get_comparison_data (кэш с версиями титулов в ключе:
+    БД читается только после загрузки данных по одному из них).
+
+    :return: (фигура, отпечаток рядов или None) — по отпечатку живой режим определяет, изменились ли данные
+    """
+    with database.session_scope() as db:
+        df_compare = get_comparison_data(db, compare_titles)
+    if df_compare.empty:
+        return go.Figure().to_dict(), None
+    fingerprint = str(pd.util.hash_pandas_object(df_compare, index=False).sum())
+    line_fig = create_comparison_graph(df_compare, interval, toggle_switch_m_or_d)
+    return figure_payload(line_fig, max_points), fingerprint
+
+# Живой режим: ряды Store и колонки их трасс на линейном графике (порядок как в create_line_graph;
+# «Сложность» — последней трассой, если показана)
+LIVE_SERIES = {
+    "modeling": ["Масса", "Плановая масса"],
+    "drawings": ["Всего чертежей"],
+}
+LIVE_SERVICES = {"modeling": get_data_since, "drawings": get_drawing_data_since}
+
+def series_part(toggle_switch_m_or_d):
+    return "modeling" if toggle_switch_m_or_d else "drawings"
+
+def _last_row(columns):
+    if not columns or not columns.get("Дата"):
+        return None
+    return {column: values[-1:] for column, values in columns.items()}
+
+def new_live_state(snapshot):
+    """
+    Состояние живого режима для store-live: курсор (последний показанный день) по каждому ряду,
+    строки, полученные после загрузки снимка (начиная с последнего дня снимка), параметры
+    графика, к которому можно дописывать точки, и отпечаток рядов показанного сравнения титулов.
+    """
+    rows = {part: _last_row(snapshot.get(part)) for part in LIVE_SERIES}
+    return {
+        "title_id": snapshot.get("title_id"),
+        "cursor": {part: (rows[part]["Дата"][0] if rows[part] else None) for part in LIVE_SERIES},
+        "rows": rows,
+        "graph": None,
+        "compare": None,
+    }
+
+def merge_series(columns, live_columns):
+    """Ряд из снимка, дополненный строками живого режима; более свежие значения дня заменяют старые."""
+    df = frame_from_columns(columns)
+    if not live_columns or not live_columns.get("Дата"):
+        return df
+    live_df = frame_from_columns(live_columns)
+    if df.empty:
+        return live_df
+    df = pd.concat([df, live_df], ignore_index=True)
+    return df.drop_duplicates("Дата", keep="last").sort_values("Дата", ignore_index=True)
+
+def fresh_rows(delta, known):
+    """
+    Строки хвоста ряда, которых ещё нет на экране: дни после курсора и изменившийся день курсора.
+
+    :param delta: Колонки хвоста (frame_to_columns), начиная с дня курсора
+    :param known: Колонки известных строк живого режима (последняя — день курсора)
+    :return: Список строк-словарей
+    """
+    rows = [dict(zip(delta, values)) for values in zip(*delta.values())]
+    last = {column: values[-1] for column, values in known.items()} if known and known.get("Дата") else None
+    if rows and last and rows[0]["Дата"] == last["Дата"] and all(rows[0].get(c) == v for c, v in last.items()):
+        rows = rows[1:]
+    return rows
+
+def extend_graph(figure_patch, overlay_patch, graph, rows, show_complexity):
+    """
+    Дописывает строки к трассам отрисованного графика (Patch): значение дня, уже присутствующего
+    на графике (последняя точка), заменяется, более поздние дни добавляются в конец.
+    """
+    columns = LIVE_SERIES[graph["series"]]
+    if graph["series"] == "modeling" and show_complexity:
+        columns = columns + ["Сложность"]
+    last_index = graph["points"] - 1
+
+    appended = [row for row in rows if row["Дата"] > graph["last_date"]]
+    for row in rows:
+        if row["Дата"] == graph["last_date"] and last_index >= 0:
+            for index, column in enumerate(columns):
+                figure_patch["data"][index]["y"][last_index] = row[column]
+            if graph["series"] == "modeling":
+                overlay_patch["trace"]["y"][last_index] = row["Сложность"]
+
+    if appended:
+        dates = [row["Дата"] for row in appended]
+        for index, column in enumerate(columns):
+            figure_patch["data"][index]["x"].extend(dates)
+            figure_patch["data"][index]["y"].extend([row[column] for row in appended])
+        if graph["series"] == "modeling":
+            overlay_patch["trace"]["x"].extend(dates)
+            overlay_patch["trace"]["y"].extend([row["Сложность"] for row in appended])
+        graph["points"] += len(appended)
+        graph["last_date"] = dates[-1]
+    return graph
+
 # Регистрация колбеков для обновления графиков и таблиц
 def register_graph_callbacks(app):
+    # Серверные колбеки регистрируются через прокси с замером времени (services/metrics.py)
+    app = instrument_app(app)
+
     @app.callback(
-        Output("pie-chart", "figure"),
-        [Input("title-dropdown", "value")],
+        Output("store-title-snapshot", "data"),
+        Input("title-dropdown", "value"),
     )
-    def update_pie_chart(selected_title):
+    def load_title_snapshot(selected_title):
+        # Все агрегаты титула одним параллельным запросом; графики и таблица строятся из Store
         try:
             if not selected_title:
+                return None
+            return get_title_snapshot(selected_title)
+        except Exception as e:
+            report_error(f"Error loading title snapshot: {e}")
+            return None
+
+    @app.callback(
+        Output("pie-chart", "figure"),
+        Input("store-title-snapshot", "data"),
+    )
+    def update_pie_chart(snapshot):
+        try:
+            if not snapshot or not snapshot.get("pie"):
                 return go.Figure().to_dict()
 
-            db = next(database.get_db())
-            df_pie = get_time_by_chapter_for_title(db=db, title_id=selected_title)
+            df_pie = frame_from_columns(snapshot["pie"])
             return create_pie_chart(df_pie).to_dict()
         except Exception as e:
-            print(f"Error updating pie chart: {e}")
+            report_error(f"Error updating pie chart: {e}")
             return go.Figure().to_dict()
 
     @app.callback(
-        Output("line-graph", "figure"),
+        Output("store-interval", "data"),
         [
-            Input("title-dropdown", "value"),
             Input("interval-day", "n_clicks"),
             Input("interval-week", "n_clicks"),
             Input("interval-month", "n_clicks"),
-            Input("toggle-complexity", "value"),
-            Input("toggle-table", "value"),
+            Input("interval-quarter", "n_clicks"),
+        ],
+    )
+    def select_interval(n_clicks_day, n_clicks_week, n_clicks_month, n_clicks_quarter):
+        ctx = callback_context
+        if not ctx.triggered:
+            return "day"
+        button_id = ctx.triggered[0]["prop_id"].split(".")[0]
+        return button_id.split("-")[1]
+
+    @app.callback(
+        [
+            Output("line-graph", "figure"),
+            Output("store-complexity-trace", "data"),
+            Output("store-live", "data"),
+        ],
+        [
+            Input("store-title-snapshot", "data"),
             Input("toggle-switch", "value"),
+            Input("store-interval", "data"),
+            Input("compare-dropdown", "value"),
+            Input("toggle-live", "value"),
+        ],
+        [
+            State("toggle-complexity", "value"),
+            State("store-live", "data"),
+            State("store-graph-width", "data"),
         ],
     )
-    def update_graph(selected_title, n_clicks_day, n_clicks_week, n_clicks_month, toggle_complexity, toggle_table, toggle_switch_m_or_d):
+    def update_graph(snapshot, toggle_switch_m_or_d, interval, compare_titles, toggle_live, toggle_complexity, live,
+                     graph_width):
+        # Дневные ряды уже в Store: переключение режима и интервала не обращается к БД;
+        # флажок сложности — State, его переключение обрабатывает клиентский колбек ниже.
+        # Строки, полученные в живом режиме, хранятся в store-live и добавляются к рядам снимка.
+        # Длинные ряды прореживаются до ширины графика в пикселях
+        max_points = max_points_for_width(graph_width)
         try:
-            ctx = callback_context
-            interval = "day"  # default value
-            if ctx.triggered:
-                button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-                interval = button_id.split("-")[1]
+            if not snapshot:
+                live = None
+            elif callback_context.triggered_id in (None, "store-title-snapshot") or not live \
+                    or live.get("title_id") != snapshot.get("title_id"):
+                live = new_live_state(snapshot)
+            else:
+                live["graph"] = None
 
-            db = next(database.get_db())
-            df_line = fetch_data_for_graph(db, selected_title, interval, toggle_switch_m_or_d)
+            if compare_titles:
+                # Ряды всех выбранных титулов — одним запросом (с кэшем по версиям титулов)
+                line_fig, fingerprint = comparison_figure(compare_titles, interval or "day", toggle_switch_m_or_d, max_points)
+                if live is not None:
+                    live["compare"] = fingerprint
+                return line_fig, None, live
 
-            if df_line.empty:
-                return go.Figure().to_dict()
+            part = series_part(toggle_switch_m_or_d)
+            series = merge_series((snapshot or {}).get(part), live and live["rows"][part])
+            if series.empty or "Дата" not in series.columns:
+                return go.Figure().to_dict(), None, live
 
-            return create_line_graph(df_line, interval, toggle_switch_m_or_d, toggle_complexity).to_dict()
+            interval = interval or "day"
+            # Живой режим дописывает точки только в дневной ряд; для этого x/y передаются списками.
+            # График по неделям / месяцам / кварталам refresh_live_data пересобирает целиком
+            extendable = live is not None and "live" in (toggle_live or []) and interval == "day"
+            line_fig, overlay, df_line = line_figure(
+                series, interval, toggle_switch_m_or_d, toggle_complexity, max_points, extendable,
+            )
+            if extendable:
+                live["graph"] = {
+                    "series": part,
+                    "points": len(df_line),
+                    "last_date": df_line["Дата"].iloc[-1].strftime("%Y-%m-%d"),
+                }
+            return line_fig, overlay, live
         except Exception as e:
-            print(f"Error updating line graph: {e}")
-            return go.Figure().to_dict()
+            report_error(f"Error updating line graph: {e}")
+            return go.Figure().to_dict(), None, None
+
+    # Флажок сложности: Patch фигуры в браузере (assets/clientside.js), без обращения к серверу
+    app.clientside_callback(
+        ClientsideFunction(namespace="graph", function_name="toggleComplexity"),
+        Output("line-graph", "figure", allow_duplicate=True),
+        Input("toggle-complexity", "value"),
+        State("store-complexity-trace", "data"),
+        State("line-graph", "figure"),
+        prevent_initial_call=True,
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="graph", function_name="graphWidth"),
+        Output("store-graph-width", "data"),
+        Input("url", "pathname"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="graph", function_name="liveIntervalDisabled"),
+        Output("live-interval", "disabled"),
+        Input("toggle-live", "value"),
+    )
+
+    @app.callback(
+        [
+            Output("line-graph", "figure", allow_duplicate=True),
+            Output("store-complexity-trace", "data", allow_duplicate=True),
+            Output("store-live", "data", allow_duplicate=True),
+        ],
+        Input("live-interval", "n_intervals"),
+        [
+            State("store-live", "data"),
+            State("toggle-complexity", "value"),
+            State("store-title-snapshot", "data"),
+            State("toggle-switch", "value"),
+            State("store-interval", "data"),
+            State("compare-dropdown", "value"),
+            State("store-graph-width", "data"),
+        ],
+        prevent_initial_call=True,
+    )
+    def refresh_live_data(n_intervals, live, toggle_complexity, snapshot, toggle_switch_m_or_d, interval,
+                          compare_titles, graph_width):
+        # Только хвосты рядов начиная с последнего показанного дня (кэш по версии титула:
+        # без новых загрузок БД не опрашивается). Дневной график дописывается через Patch;
+        # график по неделям / месяцам / кварталам пересобирается из снимка и строк живого режима
+        # без обращения к БД; сравнение титулов — заново, если изменились его ряды
+        try:
+            if not live or not live.get("title_id"):
+                return no_update, no_update, no_update
+
+            fresh = {}
+            with database.session_scope() as db:
+                for part, service in LIVE_SERVICES.items():
+                    cursor = live["cursor"][part]
+                    since = datetime.date.fromisoformat(cursor) if cursor else None
+                    delta = frame_to_columns(service(db, title_id=live["title_id"], since=since))
+                    rows = fresh_rows(delta, live["rows"][part]) if delta else []
+                    if rows:
+                        fresh[part] = rows
+
+            figure_patch, overlay_patch = Patch(), Patch()
+            graph = live.get("graph")
+            for part, rows in fresh.items():
+                known = merge_series(live["rows"][part], {c: [row[c] for row in rows] for c in rows[0]})
+                live["rows"][part] = frame_to_columns(known)
+                live["cursor"][part] = live["rows"][part]["Дата"][-1]
+                if graph and graph["series"] == part:
+                    show_complexity = "show_complexity" in (toggle_complexity or [])
+                    live["graph"] = extend_graph(figure_patch, overlay_patch, graph, rows, show_complexity)
+            live_output = live if fresh else no_update
+            max_points = max_points_for_width(graph_width)
+
+            if compare_titles:
+                # Сравниваемые титулы могут обновиться и без новых строк выбранного
+                line_fig, fingerprint = comparison_figure(compare_titles, interval or "day", toggle_switch_m_or_d, max_points)
+                if fingerprint == live.get("compare"):
+                    return no_update, no_update, live_output
+                live["compare"] = fingerprint
+                return line_fig, None, live
+            if graph:
+                if graph["series"] in fresh:
+                    overlay = overlay_patch if graph["series"] == "modeling" else no_update
+                    return figure_patch, overlay, live
+                return no_update, no_update, live_output
+
+            part = series_part(toggle_switch_m_or_d)
+            if part not in fresh or not snapshot or snapshot.get("title_id") != live["title_id"]:
+                return no_update, no_update, live_output
+            series = merge_series(snapshot.get(part), live["rows"][part])
+            line_fig, overlay, _ = line_figure(series, interval or "day", toggle_switch_m_or_d, toggle_complexity, max_points)
+            return line_fig, overlay, live
+        except Exception as e:
+            report_error(f"Error refreshing live data: {e}")
+            return no_update, no_update, no_update
+
+    @app.callback(
+        [
+            Output("progress-bar", "style"),
+            Output("progress-label", "children"),
+        ],
+        [
+            Input("title-dropdown", "value"),
+            Input("live-interval", "n_intervals"),
+        ]
+    )
+    def update_progress_bar(selected_title, n_intervals):
+        # Накопленная масса поддерживается при загрузке (TitleTotals): одна строка по ключу
+        style = {
+            "width": "0%",
+            "height": "100%",
+            "background": "linear-gradient(90deg, #4CAF50, #8BC34A)",
+            "borderRadius": "15px",
+        }
+        try:
+            if not selected_title:
+                return style, ""
+            with database.session_scope() as db:
+                progress = get_title_progress(db, selected_title)
+            if progress is None:
+                return style, ""
+            if progress["percentage"] is None:
+                return style, f"Смоделировано {progress['mass']:.1f} т · проектный тоннаж не задан"
+
+            style["width"] = f"{min(progress['percentage'], 100)}%"
+            return style, (
+                f"{progress['percentage']}% · смоделировано {progress['mass']:.1f} т "
+                f"из {progress['initial_mass']:.1f} т"
+            )
+        except Exception as e:
+            report_error(f"Error updating progress bar: {e}")
+            return style, ""
 
     @app.callback(
         Output("store-show-table", "data"),
@@ -197,7 +598,7 @@ def register_graph_callbacks(app):
         try:
             return {"show_table": "show_table" in toggle_table}
         except Exception as e:
-            print(f"Error toggling table visibility: {e}")
+            report_error(f"Error toggling table visibility: {e}")
             return {}
 
     @app.callback(
@@ -210,23 +611,41 @@ def register_graph_callbacks(app):
                 return {"display": "none"}
             return {"height": "45%", "width": "100%"}
         except Exception as e:
-            print(f"Error updating pie chart visibility: {e}")
+            report_error(f"Error updating pie chart visibility: {e}")
             return {"height": "45%", "width": "100%"}
 
     @app.callback(
-        Output("specialist-table", "data"),
-        Input("title-dropdown", "value")
+        [
+            Output("specialist-table", "data"),
+            Output("specialist-table", "page_count"),
+            Output("specialist-table", "page_current"),
+        ],
+        [
+            Input("store-title-snapshot", "data"),
+            Input("specialist-table", "page_current"),
+            Input("specialist-table", "page_size"),
+            Input("specialist-table", "sort_by"),
+            Input("specialist-table", "filter_query"),
+        ]
     )
-    def update_specialist_table(selected_project):
+    def update_specialist_table(snapshot, page_current, page_size, sort_by, filter_query):
+        # В браузер уходит только текущая страница; при загрузке титула таблица уже в кэше сервисов.
+        # Смена титула, фильтра, сортировки или размера страницы возвращает на первую страницу
+        pager = "specialist-table.page_current" in callback_context.triggered_prop_ids
+        page = (page_current or 0) if pager else 0
+        page_output = no_update if page == page_current else page
         try:
-            if not selected_project:
-                return []
-            db = next(database.get_db())
-            df = get_executors_data_by_project(db_session=db, title_id=selected_project)
-            return df.to_dict("records")
+            if not snapshot or not snapshot.get("title_id"):
+                return [], 0, page_output
+            page_size = page_size or 5
+            with database.session_scope() as db:
+                page_df, total = get_executors_page(
+                    db, snapshot["title_id"], page, page_size, sort_by, filter_query,
+                )
+            return page_df.to_dict("records"), max(math.ceil(total / page_size), 1), page_output
         except Exception as e:
-            print(f"Error updating specialist table: {e}")
-            return []
+            report_error(f"Error updating specialist table: {e}")
+            return [], 0, page_output
 
     @app.callback(
         Output("specialist-table-container", "style"),
@@ -236,13 +655,56 @@ def register_graph_callbacks(app):
         return {"height": "45%", "width": "100%", "display": "block" if store_data["show_table"] else "none"}
 
     @app.callback(
-        Output("title-dropdown", "options"),
+        Output("project-dropdown", "options"),
+        Input("url", "pathname")
+    )
+    def load_project_options(pathname):
+        try:
+            return get_project_list_cached()
+        except Exception as e:
+            report_error(f"Error loading project list: {e}")
+            return []
+
+    @app.callback(
+        [
+            Output("project-overview-container", "style"),
+            Output("project-overview-summary", "children"),
+            Output("project-overview-graph", "figure"),
+        ],
+        Input("project-dropdown", "value")
+    )
+    def update_project_overview(project_id):
+        # Одна строка на титул из агрегатов; результат кэшируется до следующей загрузки данных
+        hidden = {"display": "none"}
+        try:
+            if not project_id:
+                return hidden, "", go.Figure().to_dict()
+            with database.session_scope() as db:
+                df_overview = get_project_overview(db, project_id)
+            if df_overview is None or df_overview.empty:
+                return hidden, "", go.Figure().to_dict()
+            return (
+                {"display": "block"},
+                project_overview_summary(df_overview),
+                figure_payload(create_project_overview_chart(df_overview)),
+            )
+        except Exception as e:
+            report_error(f"Error updating project overview: {e}")
+            return hidden, "", go.Figure().to_dict()
+
+    @app.callback(
+        [
+            Output("title-dropdown", "options"),
+            Output("compare-dropdown", "options"),
+            Output("compare-dropdown", "value"),
+        ],
         Input("project-dropdown", "value")
     )
     def update_titles(project_id):
+        # Титулы сравнения прежнего проекта сбрасываются вместе со списком
         if not project_id:
-            return []
-        db = next(database.get_db())
-        titles = db.query(models.Title).filter(models.Title.project_id == project_id).all()
-        db.close()
-        return [{"label": title.title_name, "value": title.id} for title in titles]
+            return [], [], []
+        with database.session_scope() as db:
+            titles = db.query(models.Title).filter(models.Title.project_id == project_id).all()
+            options = [{"label": title.title_name, "value": title.id} for title in titles]
+            return options, options, []
@@ -9,6 +9,52 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     database_url: str
 
+    # Размер пакета (и транзакции) при массовой загрузке в database/crud.py
+    bulk_chunk_size: int = 5000
+
+    # Пул соединений (database/db.py)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Пул асинхронного engine (database/async_db.py) — соединения сверх синхронного пула,
+    # поэтому он меньше: параллельно выполняются только части данных титула
+    db_async_pool_size: int = 4
+    db_async_max_overflow: int = 0
+    # Пауза перед повторной попыткой async-пути после ошибки подключения (services/title_service.py), секунд
+    db_async_retry_seconds: float = 30
+
+    # Кэш результатов сервисов (services/cache.py)
+    cache_max_entries: int = 256
+    cache_ttl_seconds: int = 300
+    project_list_ttl_seconds: int = 30
+    # Слушатель PostgreSQL LISTEN/NOTIFY в каждом воркере (database/events.py): при нём
+    # кэш сбрасывается сразу после загрузки в любом процессе, и TTL можно держать длинным
+    cache_invalidation_listen: bool = True
+    # memory — кэш в памяти процесса; file — общий для воркеров файл SQLite (services/cache.py);
+    # пусто — file под gunicorn с несколькими воркерами (gunicorn.conf.py), иначе memory
+    cache_backend: str = ""
+    cache_path: str = ""  # по умолчанию — файл в новом приватном каталоге (services/runtime_dir.py)
+
+    # Метрики Prometheus (services/metrics.py, GET /metrics); metrics_dir — каталог для суммирования
+    # значений воркеров gunicorn (по умолчанию — приватный каталог, создаётся в gunicorn.conf.py)
+    metrics_enabled: bool = True
+    metrics_dir: str = ""
+    metrics_flush_seconds: float = 5
+
+    # Продакшен-сервер (gunicorn.conf.py)
+    web_workers: int = 0  # 0 — по числу ядер
+    web_threads: int = 4
+    web_timeout: int = 60
+
+    # Передача фигур в браузер (services/figure_payload.py): base64-массивы и прореживание LTTB
+    compact_figures: bool = True
+    line_graph_max_points: int = 2000  # 0 — без прореживания
+
+    # Живой режим: период опроса новых данных титула, секунд
+    live_refresh_seconds: int = 30
+
     class Config:
         env_file = ''
 
@@ -0,0 +1,97 @@
+# async_db.py
+"""
+Асинхронный доступ к БД (asyncpg для PostgreSQL, aiosqlite для локальной SQLite).
+
+Dash-колбеки синхронные, поэтому корутины выполняются в одном фоновом event loop
+(run_async): пул асинхронных соединений привязан к этому loop и переиспользуется
+между колбеками, а независимые запросы внутри корутины идут параллельно.
+Пул ограничен settings.db_async_pool_size: его соединения открываются сверх синхронного пула.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from config import set
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_engine = None
+_session_factory = None
+_loop = None
+_lock = threading.Lock()
+
+
+def to_async_url(url: str) -> str:
+    """
+    Заменяет синхронный драйвер в URL на асинхронный (psycopg2 -> asyncpg, pysqlite -> aiosqlite).
+    Параметр libpq sslmode asyncpg не принимает — он передаётся как ssl с тем же значением.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Асинхронный драйвер для '{backend}' не поддерживается")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        parsed = parsed.update_query_dict({"ssl": parsed.query["sslmode"]}).difference_update_query(["sslmode"])
+    return parsed.render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    global _engine, _session_factory
+    with _lock:
+        if _engine is None:
+            url = to_async_url(set.database_url)
+            options = {"pool_pre_ping": set.db_pool_pre_ping}
+            if make_url(url).get_backend_name() != "sqlite":
+                options.update(
+                    pool_size=set.db_async_pool_size,
+                    max_overflow=set.db_async_max_overflow,
+                    pool_timeout=set.db_pool_timeout,
+                    pool_recycle=set.db_pool_recycle,
+                )
+            _engine = create_async_engine(url, **options)
+            _session_factory = async_sessionmaker(_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        return _engine
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Асинхронная сессия с гарантированным закрытием и откатом при исключении."""
+    get_async_engine()
+    db = _session_factory()
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def check_connection():
+    """Открывает соединение и выполняет SELECT 1: ошибки драйвера и подключения не перехватываются."""
+    async with get_async_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-db-loop", daemon=True).start()
+        return _loop
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Выполняет корутину в фоновом event loop и возвращает её результат (для синхронных колбеков).
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
@@ -1,5 +1,11 @@
+from itertools import islice
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from . import models
+import pandas as pd
+
+from config import set
+from . import events, models, rollups
 
 # Работа с проектами
 def get_project_by_name(db: Session, project_name: str):
@@ -46,38 +52,158 @@ def create_executor(db: Session, executor_number: int, executor_name: str):
 def create_modeling_data(db: Session, modeling_data: dict):
     db_modeling_data = models.ModelingData(**modeling_data)
     db.add(db_modeling_data)
+    rollups.apply_rows(db, models.ModelingData, [modeling_data])
+    events.notify_title_changes(db, [modeling_data.get("title_id")])
     db.commit()
     db.refresh(db_modeling_data)
+    events.publish_title_changes([db_modeling_data.title_id])
     return db_modeling_data
 
 # Работа с DrawingData
 def create_drawing_data(db: Session, drawing_data: dict):
     db_drawing_data = models.DrawingData(**drawing_data)
     db.add(db_drawing_data)
+    rollups.apply_rows(db, models.DrawingData, [drawing_data])
+    events.notify_title_changes(db, [drawing_data.get("title_id")])
     db.commit()
     db.refresh(db_drawing_data)
+    events.publish_title_changes([db_drawing_data.title_id])
     return db_drawing_data
 
 # Работа с WorksectionTask
 def create_worksection_task(db: Session, task_data: dict):
     db_task = models.WorksectionTask(**task_data)
     db.add(db_task)
+    rollups.apply_rows(db, models.WorksectionTask, [task_data])
+    events.notify_title_changes(db, [task_data.get("title_id")])
     db.commit()
     db.refresh(db_task)
+    events.publish_title_changes([db_task.title_id])
     return db_task
 
 # Работа с WorkHoursInTekla
 def create_work_hours_in_tekla(db: Session, work_hours: dict):
     db_work_hours = models.WorkHoursInTekla(**work_hours)
     db.add(db_work_hours)
+    rollups.apply_rows(db, models.WorkHoursInTekla, [work_hours])
+    events.notify_title_changes(db, [work_hours.get("title_id")])
     db.commit()
     db.refresh(db_work_hours)
+    events.publish_title_changes([db_work_hours.title_id])
     return db_work_hours
 
 # Работа с WorkHoursInWorkSection
 def create_work_hours_in_work_section(db: Session, work_hours: dict):
     db_work_hours = models.WorkHoursInWorkSection(**work_hours)
     db.add(db_work_hours)
+    rollups.apply_rows(db, models.WorkHoursInWorkSection, [work_hours])
+    events.notify_title_changes(db, [work_hours.get("title_id")])
     db.commit()
     db.refresh(db_work_hours)
+    events.publish_title_changes([db_work_hours.title_id])
     return db_work_hours
+
+
+# Пакетная загрузка (выгрузки Tekla / Worksection)
+def build_executor_map(db: Session):
+    """
+    Возвращает словарь {executor_number: id} для всех исполнителей.
+    Используется вместо вызова get_executor_by_number на каждую строку.
+    """
+    rows = db.query(models.Executor.executor_number, models.Executor.id).all()
+    return {number: executor_id for number, executor_id in rows}
+
+def build_title_map(db: Session):
+    """
+    Возвращает словарь {title_name: id} для всех титулов.
+    При совпадении имён берётся титул с наименьшим id — как в get_title_by_name.
+    """
+    rows = db.query(models.Title.title_name, models.Title.id).order_by(models.Title.id.desc()).all()
+    return {title_name: title_id for title_name, title_id in rows}
+
+def _iter_chunks(rows, chunk_size: int):
+    """
+    Разбивает iterable словарей или DataFrame на списки словарей длиной chunk_size.
+    Пропуски (NaN/NaT) в DataFrame заменяются на None.
+    """
+    if isinstance(rows, pd.DataFrame):
+        frame = rows.astype(object).where(rows.notna(), None)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size].to_dict("records")
+        return
+
+    iterator = iter(rows)
+    while True:
+        chunk = [dict(row) for row in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+def _resolve_lookups(chunk: list, executor_map: dict, title_map: dict, executor_column: str = "executor_id"):
+    """
+    Заменяет executor_number / title_name в строках на executor_id / title_id.
+    """
+    for row in chunk:
+        if "executor_number" in row:
+            number = row.pop("executor_number")
+            if number not in executor_map:
+                raise ValueError(f"Неизвестный executor_number: {number}")
+            row[executor_column] = executor_map[number]
+        if "title_name" in row:
+            name = row.pop("title_name")
+            if name not in title_map:
+                raise ValueError(f"Неизвестный title_name: {name}")
+            row["title_id"] = title_map[name]
+    return chunk
+
+def bulk_insert(db: Session, model, rows, chunk_size: int = None, executor_map: dict = None, title_map: dict = None):
+    """
+    Массовая вставка строк в таблицу модели через executemany, один commit на пакет.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param model: Класс модели (например, models.ModelingData)
+    :param rows: Iterable словарей или DataFrame; вместо executor_id / title_id
+                 допускаются executor_number / title_name
+    :param chunk_size: Размер пакета, по умолчанию set.bulk_chunk_size
+    :param executor_map: Готовый словарь {executor_number: id}, иначе строится из БД
+    :param title_map: Готовый словарь {title_name: id}, иначе строится из БД
+    :return: Количество вставленных строк
+    """
+    chunk_size = chunk_size or set.bulk_chunk_size
+    inserted = 0
+
+    for chunk in _iter_chunks(rows, chunk_size):
+        if executor_map is None and any("executor_number" in row for row in chunk):
+            executor_map = build_executor_map(db)
+        if title_map is None and any("title_name" in row for row in chunk):
+            title_map = build_title_map(db)
+        executor_column = "user_id" if model is models.WorksectionTask else "executor_id"
+        _resolve_lookups(chunk, executor_map or {}, title_map or {}, executor_column)
+
+        try:
+            db.execute(insert(model), chunk)
+            rollups.apply_rows(db, model, chunk)
+            events.notify_title_changes(db, (row.get("title_id") for row in chunk))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        inserted += len(chunk)
+        events.publish_title_changes(row.get("title_id") for row in chunk)
+
+    return inserted
+
+def bulk_create_modeling_data(db: Session, rows, **kwargs):
+    return bulk_insert(db, models.ModelingData, rows, **kwargs)
+
+def bulk_create_drawing_data(db: Session, rows, **kwargs):
+    return bulk_insert(db, models.DrawingData, rows, **kwargs)
+
+def bulk_create_worksection_tasks(db: Session, rows, **kwargs):
+    return bulk_insert(db, models.WorksectionTask, rows, **kwargs)
+
+def bulk_create_work_hours_in_tekla(db: Session, rows, **kwargs):
+    return bulk_insert(db, models.WorkHoursInTekla, rows, **kwargs)
+
+def bulk_create_work_hours_in_work_section(db: Session, rows, **kwargs):
+    return bulk_insert(db, models.WorkHoursInWorkSection, rows, **kwargs)
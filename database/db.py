@@ -1,20 +1,126 @@
 # db.py
+import threading
+import time
+from contextlib import contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
 
 from config import set
 
 # Replace with your actual database connection details
 DATABASE_URL = set.database_url
 
-engine = create_engine(DATABASE_URL)
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool, учитывающий время ожидания свободного соединения (wait_*) отдельно от времени
+    открытия новых соединений (connect_*): по wait_* подбираются pool_size / max_overflow,
+    connect_* показывает задержку самой базы.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self._checkout = threading.local()
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connect_count = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def _do_get(self):
+        # QueuePool._do_get вызывает себя рекурсивно — время считает только внешний вызов
+        if getattr(self._checkout, "active", False):
+            return super()._do_get()
+        self._checkout.active = True
+        self._checkout.connect_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start - self._checkout.connect_seconds
+            self._checkout.active = False
+            with self._wait_lock:
+                self.wait_count += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            seconds = time.perf_counter() - start
+            if getattr(self._checkout, "active", False):
+                self._checkout.connect_seconds += seconds
+            with self._wait_lock:
+                self.connect_count += 1
+                self.connect_seconds_total += seconds
+                self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": set.db_pool_pre_ping}
+    parsed = make_url(url)
+    # SQLite в памяти работает через SingletonThreadPool, размеры пула к нему неприменимы
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=set.db_pool_size,
+        max_overflow=set.db_max_overflow,
+        pool_timeout=set.db_pool_timeout,
+        pool_recycle=set.db_pool_recycle,
+    )
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+@contextmanager
+def session_scope():
+    """
+    Сессия на время одного колбека / запроса: соединение гарантированно возвращается в пул,
+    при исключении транзакция откатывается.
+    """
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_db():
+    with session_scope() as db:
+        yield db
+
+def get_pool_metrics() -> dict:
+    """Состояние пула соединений: размер, выданные соединения, overflow, время ожидания и открытия соединений."""
+    pool = engine.pool
+    metrics = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        metrics.update(
+            wait_count=pool.wait_count,
+            wait_seconds_total=pool.wait_seconds_total,
+            wait_seconds_max=pool.wait_seconds_max,
+            connect_count=pool.connect_count,
+            connect_seconds_total=pool.connect_seconds_total,
+            connect_seconds_max=pool.connect_seconds_max,
+        )
+    return metrics
@@ -0,0 +1,168 @@
+# events.py
+"""
+Уведомления об изменении данных титулов.
+
+Загрузка через database/crud.py публикует id титулов, по которым записаны новые строки,
+а подписчики (например, кэш сервисов) сбрасывают зависящие от них результаты.
+
+Между процессами изменения передаются через PostgreSQL LISTEN/NOTIFY: загрузка в той же
+транзакции выполняет pg_notify (notify_title_changes), а поток TitleChangeListener в каждом
+воркере дашборда получает уведомления и рассылает их локальным подписчикам. Для SQLite
+и тестов остаётся только внутрипроцессная рассылка (publish_title_changes).
+"""
+import logging
+import select
+import threading
+
+from sqlalchemy import text
+
+CHANNEL = "title_changes"
+
+_subscribers = []
+_reset_subscribers = []
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """
+    Регистрирует обработчик callback(title_ids: set) изменений данных титулов.
+    """
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def subscribe_reset(callback):
+    """
+    Регистрирует обработчик callback() полного сброса: вызывается, когда часть уведомлений
+    могла быть потеряна (переподключение слушателя).
+    """
+    if callback not in _reset_subscribers:
+        _reset_subscribers.append(callback)
+    return callback
+
+
+def _notify(callbacks, *args):
+    for callback in list(callbacks):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Ошибка обработчика изменений титулов: {e}")
+
+
+def publish_title_changes(title_ids):
+    """
+    Оповещает подписчиков текущего процесса об изменении данных указанных титулов.
+
+    :param title_ids: Iterable id титулов (None игнорируются)
+    """
+    title_ids = {title_id for title_id in title_ids if title_id is not None}
+    if not title_ids:
+        return
+    _notify(_subscribers, title_ids)
+
+
+def publish_reset():
+    """Оповещает подписчиков текущего процесса о необходимости сбросить всё."""
+    _notify(_reset_subscribers)
+
+
+def encode_payload(title_ids) -> str:
+    return ",".join(str(title_id) for title_id in sorted(title_ids))
+
+
+def decode_payload(payload: str) -> set:
+    return {int(part) for part in payload.split(",") if part.strip().isdigit()}
+
+
+def notify_title_changes(db, title_ids):
+    """
+    Ставит уведомление для других процессов в текущую транзакцию (только PostgreSQL):
+    NOTIFY доставляется слушателям при commit и отменяется при rollback.
+    Вызывается до commit; локальных подписчиков не оповещает.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param title_ids: Iterable id титулов (None игнорируются)
+    """
+    title_ids = {title_id for title_id in title_ids if title_id is not None}
+    if not title_ids or db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": encode_payload(title_ids)})
+
+
+class TitleChangeListener(threading.Thread):
+    """
+    Фоновый поток: LISTEN на выделенном (вне пула) соединении psycopg2 и рассылка
+    полученных id титулов локальным подписчикам. При обрыве соединения переподключается
+    и вызывает publish_reset, так как уведомления за время обрыва потеряны.
+    """
+
+    def __init__(self, engine, channel: str = CHANNEL, poll_timeout: float = 5.0, reconnect_delay: float = 5.0):
+        super().__init__(name="title-change-listener", daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+        self.reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+        self.connected = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        first_connection = True
+        while not self._stop_event.is_set():
+            try:
+                self._listen(reset=not first_connection)
+            except Exception as e:
+                logging.error(f"Слушатель изменений титулов отключён: {e}")
+            self.connected.clear()
+            first_connection = False
+            self._stop_event.wait(self.reconnect_delay)
+
+    def _listen(self, reset: bool):
+        pooled = self.engine.raw_connection()
+        pooled.detach()  # соединение держится постоянно и не должно занимать место в пуле
+        connection = pooled.driver_connection
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self.connected.set()
+            if reset:
+                publish_reset()
+
+            while not self._stop_event.is_set():
+                if select.select([connection], [], [], self.poll_timeout) == ([], [], []):
+                    continue
+                connection.poll()
+                title_ids = set()
+                while connection.notifies:
+                    title_ids |= decode_payload(connection.notifies.pop(0).payload)
+                publish_title_changes(title_ids)
+        finally:
+            pooled.close()
+
+
+def start_listener(engine):
+    """
+    Запускает TitleChangeListener в текущем процессе (один на процесс).
+    Для диалектов, отличных от PostgreSQL, ничего не делает: остаётся внутрипроцессная рассылка.
+    Вызывать после fork (в каждом воркере).
+
+    :return: Поток слушателя или None
+    """
+    global _listener
+    if engine.dialect.name != "postgresql":
+        return None
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = TitleChangeListener(engine)
+            _listener.start()
+        return _listener
@@ -0,0 +1,88 @@
+# migrations.py
+"""
+Миграции для уже существующих баз данных.
+
+Base.metadata.create_all не изменяет существующие таблицы, поэтому индексы и новые
+таблицы, добавленные в models.py, создаются здесь. Пустые таблицы агрегатов при
+непустых фактах заполняются полным пересчётом (database/rollups.py). Все операции идемпотентны:
+
+    python -m database.migrations
+"""
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from .db import Base, engine
+from . import models  # noqa: F401  (регистрация моделей в Base.metadata)
+from . import rollups
+
+logging.basicConfig(level=logging.INFO)
+
+
+def create_missing_tables(bind=engine):
+    """Создаёт таблицы, которых ещё нет в базе (вместе с их индексами)."""
+    Base.metadata.create_all(bind=bind, checkfirst=True)
+
+
+def create_missing_indexes(bind=engine):
+    """
+    Создаёт объявленные в моделях индексы, которых ещё нет в базе.
+
+    :return: Список имён созданных индексов
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=bind)
+            created.append(index.name)
+            logging.info(f"Создан индекс {index.name}")
+
+    return created
+
+
+def drop_declared_indexes(bind=engine):
+    """Удаляет объявленные в моделях индексы (для бенчмарков и отката)."""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                index.drop(bind=bind)
+
+
+def backfill_rollups(bind=engine) -> bool:
+    """
+    Заполняет агрегаты из таблиц фактов, если агрегаты пусты (новые таблицы в существующей базе).
+
+    :return: True, если пересчёт выполнен
+    """
+    with Session(bind=bind) as db:
+        if not rollups.rollups_empty(db) or rollups.facts_empty(db):
+            return False
+        rollups.rebuild_rollups(db)
+    logging.info("Агрегаты заполнены из таблиц фактов")
+    return True
+
+
+def upgrade(bind=engine):
+    """Приводит схему базы к текущему состоянию моделей и заполняет пустые агрегаты."""
+    create_missing_tables(bind)
+    create_missing_indexes(bind)
+    backfill_rollups(bind)
+
+
+if __name__ == "__main__":
+    upgrade()
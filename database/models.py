@@ -1,8 +1,10 @@
 # models.py
-from sqlalchemy import Column, Integer, Text, Date, Numeric, ForeignKey, Time
+from sqlalchemy import Column, Integer, Text, Date, Numeric, ForeignKey, Time, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 
+# Numeric(asdecimal=False): в БД остаётся NUMERIC, в Python значения приходят как float, а не Decimal
+
 
 class Project(Base):
     __tablename__ = "projects"
@@ -17,7 +19,7 @@ class Title(Base):
     id = Column(Integer, primary_key=True)
     title_name = Column(Text, nullable=False)
     project_id = Column(Integer, ForeignKey("projects.id"))
-    initial_mass = Column(Numeric, nullable=True)  # Новое поле для хранения тоннажа
+    initial_mass = Column(Numeric(asdecimal=False), nullable=True)  # Новое поле для хранения тоннажа
 
     project = relationship("Project", back_populates="titles")
     chapters = relationship("TitleChapter", back_populates="title")
@@ -39,11 +41,15 @@ class TitleChapter(Base):
 
 class WorksectionTask(Base):
     __tablename__ = "worksection_tasks"
+    __table_args__ = (
+        Index("ix_worksection_tasks_title_date", "title_id", "date"),
+        Index("ix_worksection_tasks_title_chapter", "title_id", "chapter_id"),
+    )
     id = Column(Integer, primary_key=True)
     task_name = Column(Text, nullable=False)
     date = Column(Date, nullable=False)
-    time = Column(Numeric, nullable=False)
-    money = Column(Numeric, nullable=False)
+    time = Column(Numeric(asdecimal=False), nullable=False)
+    money = Column(Numeric(asdecimal=False), nullable=False)
     user_id = Column(Integer, ForeignKey("executors.id"))
     title_id = Column(Integer, ForeignKey("titles.id"))
     chapter_id = Column(Integer, ForeignKey("title_chapters.id"))
@@ -69,11 +75,15 @@ class Executor(Base):
 
 class WorkHoursInTekla(Base):
     __tablename__ = "work_hours_in_tekla"
+    __table_args__ = (
+        Index("ix_work_hours_in_tekla_title_date", "title_id", "date"),
+        Index("ix_work_hours_in_tekla_title_executor", "title_id", "executor_id"),
+    )
     id = Column(Integer, primary_key=True)
     date = Column(Date, nullable=False)
     executor_id = Column(Integer, ForeignKey("executors.id"))
     title_id = Column(Integer, ForeignKey("titles.id"))
-    hours_worked = Column(Numeric)
+    hours_worked = Column(Numeric(asdecimal=False))
     
     executor = relationship("Executor", back_populates="work_hours")
     title = relationship("Title")
@@ -81,12 +91,16 @@ class WorkHoursInTekla(Base):
 
 class ModelingData(Base):
     __tablename__ = "modeling_data"
+    __table_args__ = (
+        Index("ix_modeling_data_title_date", "title_id", "date"),
+        Index("ix_modeling_data_title_executor", "title_id", "executor_id"),
+    )
     id = Column(Integer, primary_key=True)
     date = Column(Date, nullable=False)
     executor_id = Column(Integer, ForeignKey("executors.id"))
     title_id = Column(Integer, ForeignKey("titles.id"))
-    total_mass = Column(Numeric)
-    total_complexity = Column(Numeric)
+    total_mass = Column(Numeric(asdecimal=False))
+    total_complexity = Column(Numeric(asdecimal=False))
     number_of_records = Column(Integer)
     
     executor = relationship("Executor", back_populates="modeling_data")
@@ -95,6 +109,10 @@ class ModelingData(Base):
 
 class DrawingData(Base):
     __tablename__ = "drawing_data"
+    __table_args__ = (
+        Index("ix_drawing_data_title_date", "title_id", "date"),
+        Index("ix_drawing_data_title_executor", "title_id", "executor_id"),
+    )
     id = Column(Integer, primary_key=True)
     date = Column(Date, nullable=False)
     executor_id = Column(Integer, ForeignKey("executors.id"))
@@ -107,14 +125,63 @@ class DrawingData(Base):
 
 class WorkHoursInWorkSection(Base):
     __tablename__ = "work_hours_in_work_section"
+    __table_args__ = (
+        Index("ix_work_hours_in_work_section_title_date", "title_id", "date"),
+        Index("ix_work_hours_in_work_section_title_executor", "title_id", "executor_id"),
+    )
     id = Column(Integer, primary_key=True)
     date = Column(Date, nullable=False)
     task_id = Column(Integer, ForeignKey("worksection_tasks.id"))
     title_id = Column(Integer, ForeignKey("titles.id"))
     executor_id = Column(Integer, ForeignKey("executors.id"))
-    hours_worked = Column(Numeric)
+    hours_worked = Column(Numeric(asdecimal=False))
     
     task = relationship("WorksectionTask", back_populates="work_hours")
     title = relationship("Title", back_populates="work_hours_in_work_section")
     executor = relationship("Executor", back_populates="work_hours_in_work_section")
 
+
+# Агрегаты, поддерживаемые инкрементально при загрузке (см. database/rollups.py)
+class TitleDailyStats(Base):
+    __tablename__ = "title_daily_stats"
+    title_id = Column(Integer, ForeignKey("titles.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    modeling_rows = Column(Integer, nullable=False, default=0)
+    total_mass = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    complexity_sum = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    complexity_count = Column(Integer, nullable=False, default=0)
+    drawing_rows = Column(Integer, nullable=False, default=0)
+    total_drawings = Column(Integer, nullable=False, default=0)
+    tekla_hours = Column(Numeric(asdecimal=False), nullable=False, default=0)
+
+
+class TitleExecutorStats(Base):
+    __tablename__ = "title_executor_stats"
+    title_id = Column(Integer, ForeignKey("titles.id"), primary_key=True)
+    executor_id = Column(Integer, ForeignKey("executors.id"), primary_key=True)
+    total_mass = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    drawing_rows = Column(Integer, nullable=False, default=0)
+    work_section_hours = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    tekla_hours = Column(Numeric(asdecimal=False), nullable=False, default=0)
+
+    executor = relationship("Executor")
+
+
+class TitleChapterStats(Base):
+    __tablename__ = "title_chapter_stats"
+    title_id = Column(Integer, ForeignKey("titles.id"), primary_key=True)
+    chapter_id = Column(Integer, ForeignKey("title_chapters.id"), primary_key=True)
+    total_time = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
+
+    chapter = relationship("TitleChapter")
+
+
+class TitleTotals(Base):
+    __tablename__ = "title_totals"
+    title_id = Column(Integer, ForeignKey("titles.id"), primary_key=True)
+    modeling_rows = Column(Integer, nullable=False, default=0)
+    total_mass = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    total_drawings = Column(Integer, nullable=False, default=0)
+    tekla_hours = Column(Numeric(asdecimal=False), nullable=False, default=0)
+    work_section_hours = Column(Numeric(asdecimal=False), nullable=False, default=0)
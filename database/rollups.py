@@ -0,0 +1,306 @@
+# rollups.py
+"""
+Предагрегированные таблицы для дашборда.
+
+TitleDailyStats    — суммы по (title_id, date) для линейного графика;
+TitleExecutorStats — суммы по (title_id, executor_id) для таблицы специалистов;
+TitleChapterStats  — время задач по (title_id, chapter_id) для круговой диаграммы;
+TitleTotals        — итоги по title_id (обзор проекта).
+
+При загрузке через database/crud.py к агрегатам прибавляются дельты вставленных строк
+в той же транзакции. Строки фактов, вставленные в обход crud (SQL, другие приложения),
+а также изменённые и удалённые строки в агрегаты не попадают: после таких изменений
+агрегаты затронутых титулов нужно пересчитать. Полный пересчёт (backfill):
+
+    python -m database.rollups --rebuild [--title-id 1 --title-id 2]
+
+database/migrations.py выполняет его сам, если таблицы агрегатов пусты, а факты — нет.
+"""
+import argparse
+import datetime
+import logging
+from collections import defaultdict
+
+from sqlalchemy import Integer, func, update, insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+logging.basicConfig(level=logging.INFO)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    return value
+
+
+def _num(value):
+    return float(value) if value is not None else 0.0
+
+
+# Дельты для одной вставленной строки: [(модель агрегата, ключ, {колонка: прирост})]
+def _modeling_deltas(row: dict):
+    mass = _num(row.get("total_mass"))
+    complexity = row.get("total_complexity")
+    yield models.TitleDailyStats, (row.get("title_id"), _as_date(row.get("date"))), {
+        "modeling_rows": 1,
+        "total_mass": mass,
+        "complexity_sum": _num(complexity),
+        "complexity_count": int(complexity is not None),
+    }
+    yield models.TitleExecutorStats, (row.get("title_id"), row.get("executor_id")), {"total_mass": mass}
+    yield models.TitleTotals, (row.get("title_id"),), {"modeling_rows": 1, "total_mass": mass}
+
+
+def _drawing_deltas(row: dict):
+    drawings = int(row.get("number_of_drawings") or 0)
+    yield models.TitleDailyStats, (row.get("title_id"), _as_date(row.get("date"))), {
+        "drawing_rows": 1,
+        "total_drawings": drawings,
+    }
+    yield models.TitleExecutorStats, (row.get("title_id"), row.get("executor_id")), {"drawing_rows": 1}
+    yield models.TitleTotals, (row.get("title_id"),), {"total_drawings": drawings}
+
+
+def _tekla_hours_deltas(row: dict):
+    hours = _num(row.get("hours_worked"))
+    yield models.TitleDailyStats, (row.get("title_id"), _as_date(row.get("date"))), {"tekla_hours": hours}
+    yield models.TitleExecutorStats, (row.get("title_id"), row.get("executor_id")), {"tekla_hours": hours}
+    yield models.TitleTotals, (row.get("title_id"),), {"tekla_hours": hours}
+
+
+def _work_section_hours_deltas(row: dict):
+    hours = _num(row.get("hours_worked"))
+    yield models.TitleExecutorStats, (row.get("title_id"), row.get("executor_id")), {"work_section_hours": hours}
+    yield models.TitleTotals, (row.get("title_id"),), {"work_section_hours": hours}
+
+
+def _worksection_task_deltas(row: dict):
+    yield models.TitleChapterStats, (row.get("title_id"), row.get("chapter_id")), {
+        "total_time": _num(row.get("time")),
+        "task_count": 1,
+    }
+
+
+DELTA_BUILDERS = {
+    models.ModelingData: _modeling_deltas,
+    models.DrawingData: _drawing_deltas,
+    models.WorkHoursInTekla: _tekla_hours_deltas,
+    models.WorkHoursInWorkSection: _work_section_hours_deltas,
+    models.WorksectionTask: _worksection_task_deltas,
+}
+
+KEY_COLUMNS = {
+    models.TitleDailyStats: ("title_id", "date"),
+    models.TitleExecutorStats: ("title_id", "executor_id"),
+    models.TitleChapterStats: ("title_id", "chapter_id"),
+    models.TitleTotals: ("title_id",),
+}
+
+
+def collect_deltas(model, rows):
+    """
+    Суммирует дельты агрегатов по строкам одной модели фактов.
+
+    :return: {модель агрегата: {ключ: {колонка: прирост}}}
+    """
+    builder = DELTA_BUILDERS.get(model)
+    deltas = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+    if builder is None:
+        return deltas
+
+    for row in rows:
+        for rollup_model, key, values in builder(row):
+            # Строки без титула, исполнителя или главы в агрегаты не попадают (как и в JOIN сервисов)
+            if any(part is None for part in key):
+                continue
+            target = deltas[rollup_model][key]
+            for column, value in values.items():
+                target[column] += value
+    return deltas
+
+
+def _upsert_increments(db: Session, rollup_model, increments: dict):
+    """Прибавляет приросты к строкам агрегата, создавая отсутствующие строки."""
+    if not increments:
+        return
+
+    key_columns = KEY_COLUMNS[rollup_model]
+    table = rollup_model.__table__
+    value_columns = [c.name for c in table.columns if c.name not in key_columns]
+    integer_columns = {c.name for c in table.columns if isinstance(c.type, Integer)}
+    # Строки в порядке ключа: параллельные загрузки блокируют строки агрегатов в одном порядке
+    # и не попадают во взаимную блокировку (PostgreSQL)
+    records = []
+    for key, values in sorted(increments.items(), key=lambda item: item[0]):
+        record = dict(zip(key_columns, key))
+        for column in value_columns:
+            value = values.get(column, 0)
+            record[column] = int(value) if column in integer_columns else value
+        records.append(record)
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: table.c[column] + stmt.excluded[column] for column in value_columns},
+        )
+        db.execute(stmt, records)
+        return
+
+    # Прочие диалекты: UPDATE, а при отсутствии строки — INSERT
+    for record in records:
+        condition = [table.c[column] == record[column] for column in key_columns]
+        result = db.execute(
+            update(table).where(*condition).values({column: table.c[column] + record[column] for column in value_columns})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(**record))
+
+
+def apply_rows(db: Session, model, rows):
+    """
+    Обновляет агрегаты по вставленным строкам модели фактов. Не делает commit —
+    вызывается внутри транзакции загрузки.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param model: Модель фактов, в которую вставлены строки
+    :param rows: Список словарей со значениями вставленных строк
+    """
+    for rollup_model, increments in collect_deltas(model, rows).items():
+        _upsert_increments(db, rollup_model, increments)
+
+
+def rollups_empty(db: Session) -> bool:
+    """True, если во всех таблицах агрегатов нет строк."""
+    return all(db.query(rollup_model).first() is None for rollup_model in KEY_COLUMNS)
+
+
+def facts_empty(db: Session) -> bool:
+    """True, если во всех таблицах фактов нет строк."""
+    return all(db.query(model).first() is None for model in DELTA_BUILDERS)
+
+
+def rebuild_rollups(db: Session, title_ids: list = None):
+    """
+    Полностью пересчитывает агрегаты из таблиц фактов.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param title_ids: Список титулов для пересчёта, по умолчанию все
+    """
+    try:
+        for rollup_model in KEY_COLUMNS:
+            query = db.query(rollup_model)
+            if title_ids:
+                query = query.filter(rollup_model.title_id.in_(title_ids))
+            query.delete(synchronize_session=False)
+
+        for rollup_model, increments in _aggregate_facts(db, title_ids):
+            _upsert_increments(db, rollup_model, increments)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _aggregate_facts(db: Session, title_ids: list = None):
+    """Группирующие запросы по таблицам фактов в формате приростов для _upsert_increments."""
+    def grouped(model, keys, columns):
+        query = db.query(*keys, *columns).group_by(*keys)
+        if title_ids:
+            query = query.filter(model.title_id.in_(title_ids))
+        return query.all()
+
+    daily = defaultdict(dict)
+    executors = defaultdict(dict)
+    chapters = defaultdict(dict)
+
+    modeling = models.ModelingData
+    for title_id, date, rows, mass, complexity_sum, complexity_count in grouped(
+        modeling, (modeling.title_id, modeling.date),
+        (func.count(), func.sum(modeling.total_mass), func.sum(modeling.total_complexity), func.count(modeling.total_complexity)),
+    ):
+        daily[(title_id, date)].update(
+            modeling_rows=rows, total_mass=_num(mass), complexity_sum=_num(complexity_sum), complexity_count=complexity_count,
+        )
+
+    drawing = models.DrawingData
+    for title_id, date, rows, drawings in grouped(
+        drawing, (drawing.title_id, drawing.date), (func.count(), func.sum(drawing.number_of_drawings)),
+    ):
+        daily[(title_id, date)].update(drawing_rows=rows, total_drawings=int(drawings or 0))
+
+    tekla = models.WorkHoursInTekla
+    for title_id, date, hours in grouped(tekla, (tekla.title_id, tekla.date), (func.sum(tekla.hours_worked),)):
+        daily[(title_id, date)]["tekla_hours"] = _num(hours)
+
+    for title_id, executor_id, mass in grouped(
+        modeling, (modeling.title_id, modeling.executor_id), (func.sum(modeling.total_mass),),
+    ):
+        executors[(title_id, executor_id)]["total_mass"] = _num(mass)
+
+    for title_id, executor_id, rows in grouped(
+        drawing, (drawing.title_id, drawing.executor_id), (func.count(drawing.number_of_drawings),),
+    ):
+        executors[(title_id, executor_id)]["drawing_rows"] = rows
+
+    work_section = models.WorkHoursInWorkSection
+    for title_id, executor_id, hours in grouped(
+        work_section, (work_section.title_id, work_section.executor_id), (func.sum(work_section.hours_worked),),
+    ):
+        executors[(title_id, executor_id)]["work_section_hours"] = _num(hours)
+
+    for title_id, executor_id, hours in grouped(
+        tekla, (tekla.title_id, tekla.executor_id), (func.sum(tekla.hours_worked),),
+    ):
+        executors[(title_id, executor_id)]["tekla_hours"] = _num(hours)
+
+    task = models.WorksectionTask
+    for title_id, chapter_id, time, rows in grouped(
+        task, (task.title_id, task.chapter_id), (func.sum(task.time), func.count()),
+    ):
+        chapters[(title_id, chapter_id)].update(total_time=_num(time), task_count=rows)
+
+    # Итоги по титулу — из уже посчитанных сумм (включая строки без исполнителя, как в дельтах)
+    totals = defaultdict(lambda: defaultdict(float))
+    for (title_id, _), values in daily.items():
+        for column in ("modeling_rows", "total_mass", "total_drawings", "tekla_hours"):
+            totals[(title_id,)][column] += values.get(column, 0)
+    for (title_id, _), values in executors.items():
+        totals[(title_id,)]["work_section_hours"] += values.get("work_section_hours", 0)
+
+    def complete(increments):
+        return {key: values for key, values in increments.items() if None not in key}
+
+    yield models.TitleDailyStats, complete(daily)
+    yield models.TitleExecutorStats, complete(executors)
+    yield models.TitleChapterStats, complete(chapters)
+    yield models.TitleTotals, complete(totals)
+
+
+if __name__ == "__main__":
+    from .db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Пересчёт агрегатов дашборда")
+    parser.add_argument("--rebuild", action="store_true", help="Полный пересчёт агрегатов из таблиц фактов")
+    parser.add_argument("--title-id", type=int, action="append", dest="title_ids")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+    else:
+        db = SessionLocal()
+        try:
+            rebuild_rollups(db, args.title_ids)
+            logging.info("Агрегаты пересчитаны.")
+        finally:
+            db.close()
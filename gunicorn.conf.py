@@ -0,0 +1,65 @@
+"""
+Настройки gunicorn для продакшена (start.sh):
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Число воркеров, потоков и таймаут задаются переменными окружения WEB_WORKERS, WEB_THREADS,
+WEB_TIMEOUT (config.Settings). При нескольких воркерах по умолчанию включается общий кэш
+(CACHE_BACKEND=file): посчитанные агрегаты титулов делят все воркеры; CACHE_BACKEND=memory
+оставляет кэш в каждом процессе (с предупреждением в логе). GET /metrics суммирует метрики всех воркеров через каталог METRICS_DIR
+(по умолчанию — новый приватный каталог при каждом запуске).
+"""
+import multiprocessing
+import os
+import shutil
+
+from config import set as settings
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8080)}"  # Порт от Railway
+workers = settings.web_workers or multiprocessing.cpu_count()
+threads = settings.web_threads
+worker_class = "gthread"
+timeout = settings.web_timeout
+keepalive = 5
+
+# Приложение импортируется в каждом воркере отдельно: пул соединений SQLAlchemy и поток
+# слушателя LISTEN/NOTIFY (app.py) создаются после fork и не делятся между процессами
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+
+
+# Приватные каталоги, созданные при старте (services/runtime_dir.py); удаляются в on_exit
+_created_dirs = []
+
+
+def on_starting(server):
+    if not settings.cache_backend:
+        settings.cache_backend = "file" if workers > 1 else "memory"
+        os.environ["CACHE_BACKEND"] = settings.cache_backend
+    elif settings.cache_backend == "memory" and workers > 1:
+        server.log.warning(
+            f"CACHE_BACKEND=memory при {workers} воркерах: каждый воркер считает агрегаты титулов заново"
+        )
+    # Общий кэш: новый приватный каталог или проверенный CACHE_PATH без устаревших записей
+    # (пока сервер был остановлен, загрузки никто не слушал). Воркеры получают путь через
+    # settings (fork мастера) и CACHE_PATH
+    if settings.cache_backend == "file":
+        from services.cache import prepare_shared_cache
+        created = prepare_shared_cache()
+        if created:
+            _created_dirs.append(created)
+        os.environ["CACHE_PATH"] = settings.cache_path
+    # Метрики воркеров суммируются через приватный каталог (services/metrics.py)
+    if settings.metrics_enabled:
+        from services.metrics import prepare_metrics_dir
+        created = prepare_metrics_dir()
+        if created:
+            _created_dirs.append(created)
+        os.environ["METRICS_DIR"] = settings.metrics_dir
+
+
+def on_exit(server):
+    for path in _created_dirs:
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,14 +1,12 @@
 from dash import dcc, html, dash_table, callback_context
 from dash_daq import ToggleSwitch
 
-import database.db as database
-
-from services.project_service import get_project_list
+from config import set as settings
 
+# Dash вызывает функцию при каждой загрузке страницы (app.layout = create_main_layout);
+# список проектов подгружается колбеком load_project_options, без обращения к БД при старте
 def create_main_layout():
     
-    db = next(database.get_db())
-
     layout = html.Div(
         # Main container style
         style={
@@ -24,11 +22,45 @@ def create_main_layout():
             "gap": "1%",
         },
         children=[
+            # Page location (triggers lazy loading of the project list)
+            dcc.Location(id="url", refresh=False),
+
             # State for table visibility
             dcc.Store(
                 id="store-show-table",  # State store for table visibility
                 data={"show_table": True}
             ),
+            # Snapshot of the selected title: daily series, chapter breakdown, specialist table
+            dcc.Store(
+                id="store-title-snapshot",
+                data=None
+            ),
+            # Selected interval: day / week / month / quarter
+            dcc.Store(
+                id="store-interval",
+                data="day"
+            ),
+            # Complexity trace of the modeling graph, added / removed client-side by the checkbox
+            dcc.Store(
+                id="store-complexity-trace",
+                data=None
+            ),
+            # Live mode: last seen day per series, rows received since the snapshot, extendable graph state
+            dcc.Store(
+                id="store-live",
+                data=None
+            ),
+            # Width of the line graph in pixels (assets/clientside.js): LTTB point limit
+            dcc.Store(
+                id="store-graph-width",
+                data=None
+            ),
+            # Live mode polling, enabled by the "toggle-live" checkbox
+            dcc.Interval(
+                id="live-interval",
+                interval=settings.live_refresh_seconds * 1000,
+                disabled=True,
+            ),
 
             # Left Dashboard Section
             html.Div(
@@ -93,7 +125,7 @@ def create_main_layout():
                             
                             dcc.Dropdown(
                                 id="project-dropdown",
-                                options=get_project_list(db=db),
+                                options=[],  # Загружается колбеком load_project_options
                                 placeholder="Выберите проект",
                                 className="custom-dropdown",
                                 style={
@@ -124,6 +156,25 @@ def create_main_layout():
                                     "lineHeight": "1.5",
                                 },
                             ),
+
+                            # Comparison mode: several titles overlaid on the line graph
+                            dcc.Dropdown(
+                                id="compare-dropdown",
+                                options=[],
+                                multi=True,
+                                placeholder="Сравнить титулы",
+                                className="custom-dropdown-title",
+                                style={
+                                    "width": "100%",
+                                    "padding": "0.1%",
+                                    "border": "1px solid #ddd",
+                                    "borderRadius": "8px",
+                                    "background": "#f9f9f9",
+                                    "fontSize": "1rem",
+                                    "boxShadow": "0 2px 5px rgba(0, 0, 0, 0.1)",
+                                    "lineHeight": "1.5",
+                                },
+                            ),
                             
                             # dcc.Dropdown(
                             #     id="project-dropdown",  # Dropdown for project selection
@@ -248,6 +299,21 @@ def create_main_layout():
                                             "boxShadow": "0 2px 5px rgba(0, 0, 0, 0.1)",
                                         },
                                     ),
+                                    html.Button(
+                                        "Q",
+                                        id="interval-quarter",  # Button for quarterly interval
+                                        n_clicks=0,
+                                        style={
+                                            "padding": "10px 20px",
+                                            "borderRadius": "8px",
+                                            "background": "#9C27B0",
+                                            "color": "#fff",
+                                            "fontWeight": "bold",
+                                            "border": "none",
+                                            "cursor": "pointer",
+                                            "boxShadow": "0 2px 5px rgba(0, 0, 0, 0.1)",
+                                        },
+                                    ),
                                 ],
                             ),
                         ],
@@ -256,7 +322,7 @@ def create_main_layout():
                     # Toggle Complexity Checkbox
                     html.Div(
                         id="toggle-complexity-container",  # Container for toggle complexity
-                        style={"marginBottom": "15px"},
+                        style={"marginBottom": "15px", "display": "flex", "gap": "30px"},
                         children=[
                             dcc.Checklist(
                                 id="toggle-complexity",  # Checkbox to toggle complexity
@@ -266,6 +332,14 @@ def create_main_layout():
                                 value=["show_complexity"],
                                 style={"fontSize": "1rem"},
                             ),
+                            dcc.Checklist(
+                                id="toggle-live",  # Checkbox to toggle live mode (wall screens)
+                                options=[
+                                    {"label": "Живой режим", "value": "live"}
+                                ],
+                                value=[],
+                                style={"fontSize": "1rem"},
+                            ),
                         ],
                     ),
 
@@ -345,6 +419,31 @@ def create_main_layout():
                             "overflow": "auto",  # Enable scrolling if content exceeds max height
                         },
                         children=[
+                            # Project Overview (all titles of the selected project)
+                            html.Div(
+                                id="project-overview-container",
+                                style={"display": "none"},
+                                children=[
+                                    dcc.Markdown(
+                                        "### Обзор проекта",
+                                        style={
+                                            "marginTop": "10px",
+                                            "marginBottom": "5px",
+                                            "fontSize": "1.25rem",
+                                            "fontWeight": "bold",
+                                            "textAlign": "left",
+                                        },
+                                    ),
+                                    html.Div(
+                                        id="project-overview-summary",
+                                        style={"fontSize": "0.95rem", "color": "#555", "marginBottom": "5px"},
+                                    ),
+                                    dcc.Graph(
+                                        id="project-overview-graph",
+                                        style={"height": "300px", "width": "100%"},
+                                    ),
+                                ],
+                            ),
                             # Pie Chart
                             dcc.Graph(
                                 id="pie-chart",  # Pie chart for visualization
@@ -380,11 +479,11 @@ def create_main_layout():
                                         id="specialist-table",  # ID таблицы
                                         columns=[
                                             {"name": "ФИО", "id": "name"},       # Специалист
-                                            {"name": "Σm", "id": "mass"},        # Суммарная масса (т)
-                                            {"name": "Σч", "id": "completed_drawings"},        # Суммарная чертежи (кол-во)
-                                            {"name": "Σt", "id": "total_hours"}, # Суммарное время (ч)
-                                            {"name": "Pₘ", "id": "plan_mass"},   # Плановая масса (т)
-                                            {"name": "Tk%", "id": "tekla_percentage"},   # Плановая масса (т)
+                                            {"name": "Σm", "id": "mass", "type": "numeric"},        # Суммарная масса (т)
+                                            {"name": "Σч", "id": "completed_drawings", "type": "numeric"},        # Суммарная чертежи (кол-во)
+                                            {"name": "Σt", "id": "total_hours", "type": "numeric"}, # Суммарное время (ч)
+                                            {"name": "Pₘ", "id": "plan_mass", "type": "numeric"},   # Плановая масса (т)
+                                            {"name": "Tk%", "id": "tekla_percentage", "type": "numeric"},   # Плановая масса (т)
                                         ],
                                         style_table={"width": "100%"},  # Стиль таблицы
                                         style_cell={
@@ -408,8 +507,14 @@ def create_main_layout():
                                         data=[],  # Данные загружаются динамически
                                         page_size=5,  # Максимум 9 строк на странице
                                         style_as_list_view=True,
-                                        sort_action="native",  # Возможность сортировки
+                                        # Страницы, сортировка и фильтр выполняются на сервере (update_specialist_table)
+                                        page_action="custom",
+                                        page_current=0,
+                                        sort_action="custom",  # Возможность сортировки
                                         sort_mode="single",  # Сортировка по одному столбцу
+                                        sort_by=[],
+                                        filter_action="custom",
+                                        filter_query="",
                                     ),
                                 ],
                             ),
@@ -452,13 +557,22 @@ def create_main_layout():
                                 children=html.Div(
                                     id="progress-bar",  # Actual progress bar
                                     style={
-                                        "width": "75%",  # Dynamic width based on progress
+                                        "width": "0%",  # Dynamic width based on progress (update_progress_bar)
                                         "height": "100%",
                                         "background": "linear-gradient(90deg, #4CAF50, #8BC34A)",
                                         "borderRadius": "15px",
                                     },
                                 ),
                             ),
+                            html.Div(
+                                id="progress-label",  # Modeled mass vs planned tonnage
+                                style={
+                                    "fontSize": "0.95rem",
+                                    "textAlign": "center",
+                                    "color": "#555",
+                                    "marginTop": "8px",
+                                },
+                            ),
                         ],
                     ),
                 ],
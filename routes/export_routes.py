@@ -0,0 +1,141 @@
+"""
+Выгрузка аналитики титулов в CSV / Parquet через Flask-сервер Dash.
+
+    GET /export/<набор>.<csv|parquet>?title_id=1&title_id=2
+
+Наборы: modeling, drawings (линейные ряды), chapters (время по главам), executors (таблица специалистов).
+Строки читаются пакетами с серверного курсора (services.frames.iter_frames) и сразу отдаются клиенту,
+поэтому выгрузка за несколько лет по нескольким титулам не собирается в памяти целиком.
+Parquet требует pyarrow (есть в requirements.txt; без него выгрузка в Parquet отвечает 501).
+"""
+import datetime
+
+from flask import Response, abort, request
+
+from database.db import session_scope
+from services.drawing_service import (
+    DRAWING_COLUMNS, MODELING_COLUMNS, _drawing_frame, _modeling_frame, drawing_series_query, modeling_series_query,
+)
+from services.executor_service import EXECUTOR_DTYPES, executor_stats_query
+from services.frames import iter_frames
+from services.project_service import CHAPTER_COLUMNS, time_by_chapter_query
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+def _executor_frame(df):
+    return df.fillna(0)
+
+
+# Набор -> (запрос по титулу, колонки и типы, обработка пакета)
+EXPORTS = {
+    "modeling": (modeling_series_query, MODELING_COLUMNS, _modeling_frame),
+    "drawings": (drawing_series_query, DRAWING_COLUMNS, _drawing_frame),
+    "chapters": (time_by_chapter_query, CHAPTER_COLUMNS, None),
+    "executors": (executor_stats_query, EXECUTOR_DTYPES, _executor_frame),
+}
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_export_frames(dataset: str, title_ids: list):
+    """
+    Пакеты DataFrame набора по титулам; первая колонка — title_id.
+
+    :param dataset: Имя набора из EXPORTS
+    :param title_ids: Список ID титулов
+    """
+    query, columns, finish = EXPORTS[dataset]
+    with session_scope() as db:
+        for title_id in title_ids:
+            for chunk in iter_frames(db, query(title_id), columns):
+                if finish is not None:
+                    chunk = finish(chunk)
+                chunk.insert(0, "title_id", title_id)
+                yield chunk
+
+
+def _stream_csv(frames):
+    # BOM — чтобы Excel открыл кириллицу в UTF-8. Заголовок пишется с первым пакетом:
+    # iter_frames отдаёт пакет без строк и для пустого результата
+    yield "\ufeff"
+    header = True
+    for chunk in frames:
+        yield chunk.to_csv(index=False, header=header, date_format="%Y-%m-%d")
+        header = False
+
+
+class _ChunkSink:
+    """Файлоподобный приёмник для ParquetWriter: накопленные байты забираются после каждой группы строк."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _stream_parquet(frames):
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for chunk in frames:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            # Схема задаётся первым пакетом; приведение на случай расхождения типов NULL-колонок
+            writer.write_table(table.cast(writer.schema))
+            yield sink.take()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.take()
+
+
+def register_export_routes(app):
+    server = app.server
+
+    @server.route("/export/<dataset>.<fmt>")
+    def export_title_data(dataset, fmt):
+        if dataset not in EXPORTS or fmt not in FORMATS:
+            abort(404)
+        title_ids = request.args.getlist("title_id", type=int)
+        if not title_ids or any(title_id <= 0 for title_id in title_ids):
+            abort(400, "Укажите один или несколько параметров title_id (положительные числа).")
+        if fmt == "parquet" and pq is None:
+            abort(501, "Выгрузка в Parquet требует установленного pyarrow.")
+
+        frames = iter_export_frames(dataset, title_ids)
+        body = _stream_csv(frames) if fmt == "csv" else _stream_parquet(frames)
+        filename = f"{dataset}_{'-'.join(map(str, title_ids))}_{datetime.date.today():%Y%m%d}.{fmt}"
+        return Response(
+            body,
+            mimetype=FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
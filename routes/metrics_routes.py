@@ -0,0 +1,39 @@
+"""
+Метрики дашборда в формате Prometheus через Flask-сервер Dash.
+
+    GET /metrics
+
+Гистограммы колбеков, сервисов, SQL и сборки DataFrame — services/metrics.py; здесь же
+состояние пула соединений (database.db.get_pool_metrics) и счётчики кэша сервисов.
+Размер ответа каждого колбека учитывается в after_request.
+"""
+from flask import Response, g, request
+
+from database.db import get_pool_metrics
+from services import metrics
+from services.cache import cache_stats
+
+
+def _gauges() -> dict:
+    gauges = {}
+    for name, value in get_pool_metrics().items():
+        if isinstance(value, (int, float)):
+            gauges[f"dashboard_db_pool_{name}"] = (f"Пул соединений SQLAlchemy ({name}), текущий процесс", value)
+    for name, value in cache_stats().items():
+        gauges[f"dashboard_service_cache_{name}"] = (f"Кэш сервисов ({name}), текущий процесс", value)
+    return gauges
+
+
+def register_metrics_routes(app):
+    server = app.server
+
+    @server.after_request
+    def observe_callback_response(response):
+        callback = g.get("dashboard_callback")
+        if callback and request.path.endswith("/_dash-update-component") and not response.is_streamed:
+            metrics.observe_response(callback, response.content_length or len(response.get_data()))
+        return response
+
+    @server.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(_gauges()), content_type="text/plain; version=0.0.4; charset=utf-8")
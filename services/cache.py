@@ -0,0 +1,318 @@
+"""
+Кэш результатов сервисных функций дашборда.
+
+Результаты хранятся в LRU-кэше ограниченного размера с TTL. Ключ включает имя функции,
+её аргументы (кроме сессии) и версию данных титула: при загрузке новых строк через
+database/crud.py версия титула увеличивается, а его записи удаляются из кэша.
+В других процессах то же делает слушатель PostgreSQL NOTIFY (database/events.py).
+
+settings.cache_backend="file" — общий для воркеров gunicorn кэш в файле SQLite (FileCache):
+агрегат, посчитанный одним воркером, получают все остальные. Под gunicorn с несколькими
+воркерами он выбирается по умолчанию (gunicorn.conf.py), в остальных случаях — кэш в памяти. Файл лежит в приватном каталоге
+(services/runtime_dir.py): значения из него десериализуются pickle.
+"""
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+from config import set as settings
+from database import events
+from services import metrics
+from services.runtime_dir import check_private_file, create_private_dir
+
+
+class TTLCache:
+    """
+    Потокобезопасный LRU-кэш с ограничением по количеству записей и временем жизни.
+    Ключи — кортежи вида (имя функции, title_id, версия, аргументы).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, title_id) -> int:
+        with self._lock:
+            return self._versions.get(title_id, 0)
+
+    def get(self, key):
+        """
+        :return: (найдено, значение)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_titles(self, title_ids):
+        """Увеличивает версию данных титулов и удаляет их записи."""
+        title_ids = set(title_ids)
+        with self._lock:
+            for title_id in title_ids:
+                self._versions[title_id] = self._versions.get(title_id, 0) + 1
+            for key in [key for key in self._entries if key[1] in title_ids]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class FileCache:
+    """
+    Кэш в файле SQLite, общий для процессов на одной машине; интерфейс как у TTLCache.
+    Версии титулов хранятся в том же файле, поэтому ключи совпадают во всех воркерах.
+    Значения сериализуются pickle, поэтому перед открытием проверяется, что каталог и файлы
+    принадлежат текущему пользователю (check_private_file). При переполнении удаляются записи
+    с ближайшим сроком жизни (при общем TTL — самые старые).
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение на поток; после fork — новое
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            for suffix in ("", "-wal", "-shm"):
+                check_private_file(self.path + suffix)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, title_id INTEGER, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_title_id ON entries (title_id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_expires_at ON entries (expires_at)")
+            connection.execute("CREATE TABLE IF NOT EXISTS versions (title_id TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def version(self, title_id) -> int:
+        row = self._connection().execute("SELECT version FROM versions WHERE title_id = ?", (repr(title_id),)).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        """
+        :return: (найдено, значение)
+        """
+        connection = self._connection()
+        row = connection.execute("SELECT expires_at, value FROM entries WHERE key = ?", (repr(key),)).fetchone()
+        if row is not None:
+            expires_at, value = row
+            if expires_at > time.time():
+                self._count("hits")
+                return True, pickle.loads(value)
+            connection.execute("DELETE FROM entries WHERE key = ? AND expires_at = ?", (repr(key), expires_at))
+        self._count("misses")
+        return False, None
+
+    def set(self, key, value):
+        title_id = key[1] if isinstance(key[1], int) else None
+        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, title_id, expires_at, value) VALUES (?, ?, ?, ?)",
+            (repr(key), title_id, time.time() + self.ttl_seconds, value),
+        )
+        excess = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+            with self._lock:
+                self.evictions += excess
+
+    def invalidate_titles(self, title_ids):
+        """Увеличивает версию данных титулов и удаляет их записи (для всех процессов)."""
+        title_ids = list(set(title_ids))
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO versions (title_id, version) VALUES (?, 1) "
+                "ON CONFLICT (title_id) DO UPDATE SET version = version + 1",
+                [(repr(title_id),) for title_id in title_ids],
+            )
+            connection.executemany("DELETE FROM entries WHERE title_id = ?", [(title_id,) for title_id in title_ids])
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        entries = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        with self._lock:
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+CACHE_FILE_NAME = "cache.sqlite3"
+_private_dir = None  # каталог, созданный shared_cache_path в этом процессе
+
+
+def shared_cache_path() -> str:
+    """settings.cache_path; если не задан — файл в новом приватном каталоге."""
+    global _private_dir
+    if not settings.cache_path:
+        _private_dir = create_private_dir("project_dashboard_cache_")
+        settings.cache_path = os.path.join(_private_dir, CACHE_FILE_NAME)
+    return settings.cache_path
+
+
+def prepare_shared_cache():
+    """
+    Готовит файл общего кэша при старте сервера (gunicorn.conf.py, до запуска воркеров):
+    без settings.cache_path — в новом приватном каталоге; файл проверяется (check_private_file)
+    и удаляется: пока сервер не работал, никто не получал уведомлений о загрузках.
+
+    :return: Созданный каталог (удаляется при остановке сервера) или None для заданного CACHE_PATH
+    """
+    path = shared_cache_path()
+    for suffix in ("", "-wal", "-shm"):
+        check_private_file(path + suffix)
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return _private_dir
+
+
+def _create_service_cache():
+    if settings.cache_backend == "file":
+        return FileCache(shared_cache_path(), max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
+    return TTLCache(max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
+
+
+service_cache = _create_service_cache()
+events.subscribe(service_cache.invalidate_titles)
+events.subscribe_reset(service_cache.clear)
+
+
+def _copy(value):
+    # Колбеки изменяют DataFrame на месте, поэтому наружу отдаётся копия
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+def cached_by_title(func):
+    """
+    Декоратор для сервисных функций вида func(session, title_id, ...), в том числе async.
+
+    Сессия в ключ не входит и при попадании в кэш не используется; sync- и async-версии
+    одной функции (суффикс _async) делят общие записи.
+    Пустые результаты (None, пустой DataFrame) не кэшируются.
+    Время вызова учитывается в метриках (services/metrics.py) с признаком попадания в кэш.
+    func.peek(title_id=..., ...) возвращает (найдено, значение) без обращения к БД.
+    """
+    signature = inspect.signature(func)
+    session_param = next(iter(signature.parameters))
+    name = func.__qualname__.removesuffix("_async")
+
+    def make_key(args, kwargs):
+        arguments = dict(signature.bind(*args, **kwargs).arguments)
+        arguments.pop(session_param)
+        title_id = arguments.get("title_id")
+        return (name, title_id, service_cache.version(title_id), tuple(sorted(arguments.items())))
+
+    def store(key, value):
+        if value is not None and not (isinstance(value, pd.DataFrame) and value.empty):
+            service_cache.set(key, _copy(value))
+        return value
+
+    def peek(*args, **kwargs):
+        # Значение из кэша без вызова функции и без сессии: (найдено, значение)
+        found, value = service_cache.get(make_key((None, *args), kwargs))
+        return found, (_copy(value) if found else None)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            key = make_key(args, kwargs)
+            found, value = service_cache.get(key)
+            if found:
+                metrics.observe_service(name, time.perf_counter() - start, "hit")
+                return _copy(value)
+            with metrics.service_scope(name):
+                value = store(key, await func(*args, **kwargs))
+            metrics.observe_service(name, time.perf_counter() - start, "miss")
+            return value
+
+        async_wrapper.peek = peek
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        key = make_key(args, kwargs)
+        found, value = service_cache.get(key)
+        if found:
+            metrics.observe_service(name, time.perf_counter() - start, "hit")
+            return _copy(value)
+        with metrics.service_scope(name):
+            value = store(key, func(*args, **kwargs))
+        metrics.observe_service(name, time.perf_counter() - start, "miss")
+        return value
+
+    wrapper.peek = peek
+    return wrapper
+
+
+def cache_stats() -> dict:
+    """Счётчики попаданий и промахов кэша сервисов."""
+    return service_cache.stats()
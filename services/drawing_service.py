@@ -1,13 +1,101 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 
 from database import models
+from services.cache import cached_by_title, service_cache
+from services.frames import as_float, read_frame, read_frame_async
+from services.metrics import report_error, timed_service
 
 import pandas as pd
 
 import logging
 
+# Запросы к дневным агрегатам (TitleDailyStats, см. database/rollups.py); общие для sync и async версий
+# since — только дни начиная с указанной даты (включительно): живой режим дочитывает хвост ряда
+def _since(query, since):
+    return query.where(models.TitleDailyStats.date >= since) if since is not None else query
+
+def drawing_series_query(title_id: int, since=None):
+    stats = models.TitleDailyStats
+    return _since(
+        select(
+            stats.date,
+            stats.total_drawings.label("total_drawings")
+        )
+        .where(stats.title_id == title_id)
+        .where(stats.drawing_rows > 0)
+        .order_by(stats.date),
+        since,
+    )
+
+def modeling_series_query(title_id: int, since=None):
+    stats = models.TitleDailyStats
+    return _since(
+        select(
+            stats.date,
+            as_float(stats.total_mass / 100000000).label("total_mass"),
+            as_float(stats.complexity_sum / func.nullif(stats.complexity_count, 0)).label("avg_complexity"),
+            as_float(stats.tekla_hours).label("total_hours")
+        )
+        .where(stats.title_id == title_id)
+        .where(stats.modeling_rows > 0)
+        .order_by(stats.date),
+        since,
+    )
+
+# Колонки и типы DataFrame в порядке колонок запросов (см. services.frames.read_frame)
+DRAWING_COLUMNS = {"Дата": "datetime64[ns]", "Всего чертежей": "int64"}
+MODELING_COLUMNS = {"Дата": "datetime64[ns]", "Масса": "float64", "Сложность": "float64", "Общие часы": "float64"}
+COMPARISON_COLUMNS = {
+    "title_id": "int64", "title_name": object, "Дата": "datetime64[ns]", "Масса": "float64", "Всего чертежей": "float64",
+}
+
+def comparison_series_query(title_ids):
+    """
+    Дневные ряды моделирования и чертежей сразу для нескольких титулов: одна выборка
+    из TitleDailyStats (строки уже сгруппированы по title_id, date) с title_id IN (...).
+    Масса / чертежи — NULL в днях, где соответствующих записей не было.
+    """
+    stats = models.TitleDailyStats
+    return (
+        select(
+            stats.title_id,
+            models.Title.title_name,
+            stats.date,
+            as_float(case((stats.modeling_rows > 0, stats.total_mass / 100000000))).label("total_mass"),
+            as_float(case((stats.drawing_rows > 0, stats.total_drawings))).label("total_drawings")
+        )
+        .join(models.Title, models.Title.id == stats.title_id)
+        .where(stats.title_id.in_(title_ids))
+        .order_by(stats.title_id, stats.date)
+    )
+
+def _drawing_frame(drawing_df):
+    if drawing_df.empty:
+        print("❌ DataFrame для линейных пуст!")
+
+    return drawing_df
+
+def _modeling_frame(result_df):
+    # Средняя сложность дня без записей сложности — NaN
+    result_df = result_df.fillna(0)
+
+    # Рассчёт плановой массы
+    result_df["Плановая масса"] = result_df["Общие часы"] / 3
+
+    if result_df.empty:
+        print("⚠️ DataFrame пуст!")
+
+    return result_df
+
+def _check_title_id(title_id):
+    if not isinstance(title_id, int) or title_id <= 0:
+        raise ValueError("Некорректный `title_id`, должен быть положительным числом.")
+
+
+@cached_by_title
 def get_drawing_data_for_project(db: Session, title_id: int):
     """
     Получает данные по чертежам для указанного проекта и возвращает их в виде DataFrame.
@@ -17,33 +105,15 @@ def get_drawing_data_for_project(db: Session, title_id: int):
     :return: DataFrame с колонками [Дата, Всего чертежей]
     """
     try:
-        drawing_query = (
-            db.query(
-                models.DrawingData.date,
-                func.sum(models.DrawingData.number_of_drawings).label("total_drawings")
-            )
-            .join(models.Title, models.DrawingData.title_id == models.Title.id)
-            .filter(models.DrawingData.title_id == title_id)
-            .group_by(models.DrawingData.date)
-            .order_by(models.DrawingData.date)
-        )
-        drawing_result = drawing_query.all()
-
-        drawing_df = pd.DataFrame(drawing_result, columns=["Дата", "Всего чертежей"])
-        drawing_df["Дата"] = pd.to_datetime(drawing_df["Дата"], errors="coerce")
-
-        if drawing_df.empty:
-            print("❌ DataFrame для линейных пуст!")
-
-        return drawing_df
+        drawing_df = read_frame(db, drawing_series_query(title_id), DRAWING_COLUMNS)
+        return _drawing_frame(drawing_df)
 
     except Exception as e:
-        print(f"Ошибка при получении данных: {e}")
-        return pd.DataFrame(columns=["Дата", "Всего чертежей"])  # Возвращаем пустой DataFrame
-    finally:
-        db.close()  # Закрываем соединение, если оно было открыто
+        report_error(f"Ошибка при получении данных: {e}")
+        return pd.DataFrame(columns=list(DRAWING_COLUMNS))  # Возвращаем пустой DataFrame
 
 
+@cached_by_title
 def get_data_for_project(db: Session, title_id: int):
     """
     Получает данные по смоделированым конструкциям для указанного проекта и возвращает их в виде DataFrame.
@@ -53,60 +123,117 @@ def get_data_for_project(db: Session, title_id: int):
     :param title_id: ID проекта (title_id)
     :return: DataFrame с колонками [Дата, Масса, Сложность, Общие часы]
     """
-    if not isinstance(title_id, int) or title_id <= 0:
-        raise ValueError("Некорректный `title_id`, должен быть положительным числом.")
+    _check_title_id(title_id)
 
     try:
-        # Запрос для моделирования
-        modeling_query = (
-            db.query(
-                models.ModelingData.date,
-                (func.sum(models.ModelingData.total_mass) / 100000000).label("total_mass"),
-                (func.sum(models.ModelingData.total_complexity) / func.count(models.ModelingData.total_complexity)).label("avg_complexity")
-            )
-            .join(models.Title, models.ModelingData.title_id == models.Title.id)
-            .filter(models.ModelingData.title_id == title_id)  # Исправлена ошибка с `DrawingData`
-            .group_by(models.ModelingData.date)
-            .order_by(models.ModelingData.date)
-        )
-        modeling_result = modeling_query.all()
-
-        # Запрос по рабочим часам
-        work_hours_query = (
-            db.query(
-                models.WorkHoursInTekla.date,
-                func.sum(models.WorkHoursInTekla.hours_worked).label("total_hours")
-            )
-            .filter(models.WorkHoursInTekla.title_id == title_id)
-            .group_by(models.WorkHoursInTekla.date)
-        )
-        work_hours_result = work_hours_query.all()
+        modeling_df = read_frame(db, modeling_series_query(title_id), MODELING_COLUMNS)
+        return _modeling_frame(modeling_df)
+
+    except SQLAlchemyError as e:
+        report_error(f"❌ Ошибка БД: {e}")
+        db.rollback()  # Откат транзакции в случае ошибки
+        return None
+    except Exception as e:
+        report_error(f"❌ Непредвиденная ошибка: {e}")
+        return None
+
+
+@cached_by_title
+async def get_drawing_data_for_project_async(db: AsyncSession, title_id: int):
+    """
+    Асинхронная версия get_drawing_data_for_project (сессия из database.async_db).
+    """
+    try:
+        drawing_df = await read_frame_async(db, drawing_series_query(title_id), DRAWING_COLUMNS)
+        return _drawing_frame(drawing_df)
+
+    except Exception as e:
+        report_error(f"Ошибка при получении данных: {e}")
+        return pd.DataFrame(columns=list(DRAWING_COLUMNS))
 
-        # Создание DataFrame
-        modeling_df = pd.DataFrame(modeling_result, columns=["Дата", "Масса", "Сложность"])
-        work_hours_df = pd.DataFrame(work_hours_result, columns=["Дата", "Общие часы"])
 
-        # Преобразование даты
-        modeling_df["Дата"] = pd.to_datetime(modeling_df["Дата"], errors="coerce")
-        work_hours_df["Дата"] = pd.to_datetime(work_hours_df["Дата"], errors="coerce")
+@cached_by_title
+async def get_data_for_project_async(db: AsyncSession, title_id: int):
+    """
+    Асинхронная версия get_data_for_project (сессия из database.async_db).
+    """
+    _check_title_id(title_id)
 
-        # Объединение
-        result_df = pd.merge(modeling_df, work_hours_df, on="Дата", how="left").fillna(0)
+    try:
+        modeling_df = await read_frame_async(db, modeling_series_query(title_id), MODELING_COLUMNS)
+        return _modeling_frame(modeling_df)
+
+    except SQLAlchemyError as e:
+        report_error(f"❌ Ошибка БД: {e}")
+        await db.rollback()
+        return None
+    except Exception as e:
+        report_error(f"❌ Непредвиденная ошибка: {e}")
+        return None
+
+
+@cached_by_title
+def get_drawing_data_since(db: Session, title_id: int, since=None):
+    """
+    Хвост ряда чертежей для живого режима: дни начиная с since (включительно — последний
+    показанный день мог пополниться). Кэшируется по версии титула, поэтому опрос без новых
+    загрузок не обращается к БД.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param title_id: ID титула
+    :param since: datetime.date последнего показанного дня; None — весь ряд
+    :return: DataFrame с колонками [Дата, Всего чертежей]
+    """
+    try:
+        return read_frame(db, drawing_series_query(title_id, since), DRAWING_COLUMNS)
+    except Exception as e:
+        report_error(f"Ошибка при получении новых данных: {e}")
+        return pd.DataFrame(columns=list(DRAWING_COLUMNS))
 
-        # Рассчёт плановой массы
-        result_df["Плановая масса"] = result_df["Общие часы"] / 3
 
-        if result_df.empty:
-            print("⚠️ DataFrame пуст!")
+@cached_by_title
+def get_data_since(db: Session, title_id: int, since=None):
+    """
+    Хвост ряда моделирования для живого режима (см. get_drawing_data_since).
 
-        return result_df
+    :return: DataFrame с колонками [Дата, Масса, Сложность, Общие часы, Плановая масса]
+    """
+    _check_title_id(title_id)
 
+    try:
+        return _modeling_frame(read_frame(db, modeling_series_query(title_id, since), MODELING_COLUMNS))
     except SQLAlchemyError as e:
-        print(f"❌ Ошибка БД: {e}")
-        db.rollback()  # Откат транзакции в случае ошибки
+        report_error(f"❌ Ошибка БД: {e}")
+        db.rollback()
         return None
     except Exception as e:
-        print(f"❌ Непредвиденная ошибка: {e}")
+        report_error(f"❌ Непредвиденная ошибка: {e}")
         return None
-    finally:
-        db.close()  # Закрытие соединения
+
+
+@timed_service
+def get_comparison_data(db: Session, title_ids: list):
+    """
+    Ряды для сравнения нескольких титулов одним запросом.
+    Результат кэшируется с версиями всех титулов в ключе, поэтому загрузка данных по любому
+    из них делает запись устаревшей.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param title_ids: Список ID титулов
+    :return: DataFrame с колонками [title_id, title_name, Дата, Масса, Всего чертежей]
+    """
+    title_ids = tuple(sorted({int(title_id) for title_id in title_ids}))
+    key = ("get_comparison_data", title_ids, tuple(service_cache.version(title_id) for title_id in title_ids))
+    found, value = service_cache.get(key)
+    if found:
+        return value.copy()
+
+    try:
+        comparison_df = read_frame(db, comparison_series_query(title_ids), COMPARISON_COLUMNS)
+    except Exception as e:
+        report_error(f"❌ Ошибка при получении данных для сравнения: {e}")
+        return pd.DataFrame(columns=list(COMPARISON_COLUMNS))
+
+    if not comparison_df.empty:
+        service_cache.set(key, comparison_df.copy())
+    return comparison_df
@@ -1,100 +1,184 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, union_all, literal, case
 
 from database import models
+from services.cache import cached_by_title
+from services.frames import as_float, read_frame, read_frame_async
+from services.metrics import report_error, timed_service
+from services.table_query import (
+    filter_frame, parse_filter_query, parse_sort_by, sort_frame, sql_conditions, sql_order_by,
+)
 
 import pandas as pd
-import numpy as np
 
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
-def get_executors_data_by_project(db_session: Session, title_id: int):
+# Колонки таблицы специалистов и их типы, в порядке колонок executor_stats_query
+EXECUTOR_DTYPES = {
+    "executor_id": "int64",
+    "name": object,
+    "mass": "float64",
+    "total_hours": "float64",
+    "plan_mass": "float64",
+    "completed_drawings": "int64",
+    "tekla_hours": "float64",
+    "tekla_percentage": "float64",
+}
+EXECUTOR_COLUMNS = list(EXECUTOR_DTYPES)
+
+
+def _facts_by_executor(title_id: int):
+    """
+    Подзапрос (executor_id, total_mass, drawing_rows, work_section_hours, tekla_hours) по таблицам фактов:
+    четыре сгруппированных по executor_id источника объединяются через UNION ALL и суммируются.
+    """
+    zero = literal(0)
+    modeling = models.ModelingData
+    drawing = models.DrawingData
+    work_section = models.WorkHoursInWorkSection
+    tekla = models.WorkHoursInTekla
+
+    parts = union_all(
+        select(modeling.executor_id, func.sum(modeling.total_mass).label("total_mass"),
+               zero.label("drawing_rows"), zero.label("work_section_hours"), zero.label("tekla_hours"))
+        .where(modeling.title_id == title_id).group_by(modeling.executor_id),
+        select(drawing.executor_id, zero, func.count(drawing.number_of_drawings), zero, zero)
+        .where(drawing.title_id == title_id).group_by(drawing.executor_id),
+        select(work_section.executor_id, zero, zero, func.sum(work_section.hours_worked), zero)
+        .where(work_section.title_id == title_id).group_by(work_section.executor_id),
+        select(tekla.executor_id, zero, zero, zero, func.sum(tekla.hours_worked))
+        .where(tekla.title_id == title_id).group_by(tekla.executor_id),
+    ).subquery("parts")
+
+    return (
+        select(
+            parts.c.executor_id,
+            func.sum(parts.c.total_mass).label("total_mass"),
+            func.sum(parts.c.drawing_rows).label("drawing_rows"),
+            func.sum(parts.c.work_section_hours).label("work_section_hours"),
+            func.sum(parts.c.tekla_hours).label("tekla_hours"),
+        )
+        .group_by(parts.c.executor_id)
+        .subquery("facts")
+    )
+
+
+def executor_stats_query(title_id: int, from_facts: bool = False):
+    """
+    Один запрос со всеми строками таблицы специалистов по титулу, с соединением по executor_id.
+
+    :param title_id: ID титула
+    :param from_facts: Считать по таблицам фактов вместо агрегатов TitleExecutorStats
+    """
+    if from_facts:
+        stats = _facts_by_executor(title_id).c
+        condition = None
+    else:
+        stats = models.TitleExecutorStats.__table__.c
+        condition = stats.title_id == title_id
+
+    total_hours = func.coalesce(stats.work_section_hours, 0)
+    tekla_hours = func.coalesce(stats.tekla_hours, 0)
+
+    query = (
+        select(
+            stats.executor_id,
+            models.Executor.executor_name.label("name"),
+            as_float(func.round(func.coalesce(stats.total_mass, 0) / 1000000, 2)).label("mass"),
+            as_float(func.round(total_hours, 2)).label("total_hours"),
+            as_float(func.round(tekla_hours / 3, 2)).label("plan_mass"),
+            func.coalesce(stats.drawing_rows, 0).label("completed_drawings"),
+            as_float(tekla_hours).label("tekla_hours"),
+            as_float(case(
+                (total_hours != 0, func.round(tekla_hours * 100 / total_hours, 1)),
+                else_=0  # Если total_hours == 0, устанавливаем значение 0
+            )).label("tekla_percentage"),
+        )
+        .join(models.Executor, models.Executor.id == stats.executor_id)
+        .order_by(models.Executor.executor_name, stats.executor_id)
+    )
+    if condition is not None:
+        query = query.where(condition)
+    return query
+
+
+@cached_by_title
+def get_executors_data_by_project(db_session: Session, title_id: int, from_facts: bool = False):
     try:
-        with db_session as db:  # Гарантированное закрытие соединения после выхода из блока
-            # Запрос данных
-            modeling_query = (
-                db.query(
-                    models.Executor.executor_name.label("name"),
-                    func.round(func.sum(models.ModelingData.total_mass) / 1000000, 2).label("mass")
-                )
-                .join(models.ModelingData, models.Executor.id == models.ModelingData.executor_id)
-                .join(models.Title, models.Title.id == models.ModelingData.title_id)
-                .filter(models.Title.id == title_id)
-                .group_by(models.Executor.executor_name)
-            )
-
-            work_hours_query = (    
-                db.query(
-                    models.Executor.executor_name.label("name"),
-                    func.round(func.sum(models.WorkHoursInWorkSection.hours_worked), 2).label("total_hours"),
-                    # func.round(func.sum(models.WorkHoursInTekla.hours_worked) / 3, 2).label("plan_mass")
-                )
-                # .join(models.WorkHoursInWorkSection, models.Executor.id == models.WorkHoursInWorkSection.executor_id)
-                # .join(models.WorksectionTask, models.WorksectionTask.id == models.WorkHoursInWorkSection.task_id)
-                # .join(models.Title, models.Title.id == models.WorksectionTask.title_id)
-                .join(models.Executor, models.Executor.id == models.WorkHoursInWorkSection.executor_id)
-                # .outerjoin(models.WorkHoursInTekla, models.Executor.id == models.WorkHoursInTekla.executor_id)  # ДОБАВЛЕН JOIN
-                .filter(models.WorkHoursInWorkSection.title_id == title_id)
-                .group_by(models.Executor.executor_name)
-            )
-
-            drawing_query = (
-                db.query(
-                    models.Executor.executor_name.label("name"),
-                    func.count(models.DrawingData.number_of_drawings).label("completed_drawings")
-                )
-                .join(models.DrawingData, models.Executor.id == models.DrawingData.executor_id)
-                .join(models.Title, models.Title.id == models.DrawingData.title_id)
-                .filter(models.Title.id == title_id)
-                .group_by(models.Executor.executor_name)
-            )
-
-            tekla_hours_query = (
-                db.query(
-                    models.Executor.executor_name.label("name"),
-                    func.sum(models.WorkHoursInTekla.hours_worked).label("tekla_hours")
-                )
-                .join(models.WorkHoursInTekla, models.Executor.id == models.WorkHoursInTekla.executor_id)
-                .join(models.Title, models.Title.id == models.WorkHoursInTekla.title_id)
-                .filter(models.Title.id == title_id)
-                .group_by(models.Executor.executor_name)
-            )
-
-            # Выполнение запросов
-            modeling_result = modeling_query.all()
-            work_hours_result = work_hours_query.all()
-            drawing_result = drawing_query.all()
-            tekla_hours_result = tekla_hours_query.all()
-
-            # Преобразование результатов в DataFrame
-            modeling_df = pd.DataFrame(modeling_result, columns=["name", "mass"])
-            work_hours_df = pd.DataFrame(work_hours_result, columns=["name", "total_hours", "plan_mass"])
-            drawing_df = pd.DataFrame(drawing_result, columns=["name", "completed_drawings"])
-            tekla_hours_df = pd.DataFrame(tekla_hours_result, columns=["name", "tekla_hours"])
-
-            # Объединение данных
-            result_df = modeling_df.merge(work_hours_df, on="name", how="outer")
-            result_df = result_df.merge(drawing_df, on="name", how="outer")
-            result_df = result_df.merge(tekla_hours_df, on="name", how="outer")
-
-            # Обработка NaN значений
-            result_df.fillna(0, inplace=True)
-            
-            result_df["tekla_hours"] = result_df["tekla_hours"].astype(float)
-            result_df["total_hours"] = result_df["total_hours"].astype(float)
-
-            result_df["tekla_percentage"] = np.where(
-                result_df["total_hours"] != 0,
-                (result_df["tekla_hours"] / result_df["total_hours"]) * 100,
-                0  # Если total_hours == 0, устанавливаем значение 0
-            ).round(1)
-            result_df.fillna(0, inplace=True)  # Заполняем NaN после деления
-
-
-            logging.info("Данные успешно получены и обработаны.")
-            return result_df
+        # Все показатели специалистов — одним запросом
+        result_df = read_frame(db_session, executor_stats_query(title_id, from_facts), EXECUTOR_DTYPES)
+        result_df.fillna(0, inplace=True)
+
+        logging.info("Данные успешно получены и обработаны.")
+        return result_df
+    except Exception as e:
+        report_error(f"Ошибка при получении данных: {e}")
+        return pd.DataFrame(columns=EXECUTOR_COLUMNS)
+
+
+@cached_by_title
+async def get_executors_data_by_project_async(db_session: AsyncSession, title_id: int, from_facts: bool = False):
+    """
+    Асинхронная версия get_executors_data_by_project (сессия из database.async_db).
+    """
+    try:
+        result_df = await read_frame_async(db_session, executor_stats_query(title_id, from_facts), EXECUTOR_DTYPES)
+        result_df.fillna(0, inplace=True)
+        return result_df
+    except Exception as e:
+        report_error(f"Ошибка при получении данных: {e}")
+        return pd.DataFrame(columns=EXECUTOR_COLUMNS)
+
+
+def executor_page_query(title_id: int, filters: list, sort: list, offset: int, limit: int):
+    """
+    Страница таблицы специалистов: WHERE / ORDER BY / LIMIT / OFFSET поверх executor_stats_query.
+
+    :return: (запрос страницы, запрос числа строк после фильтра)
+    """
+    stats = executor_stats_query(title_id).subquery("executor_stats")
+    filtered = select(*stats.c).where(*sql_conditions(stats.c, filters))
+    page = (
+        filtered
+        .order_by(*sql_order_by(stats.c, sort), stats.c.name, stats.c.executor_id)
+        .offset(offset)
+        .limit(limit)
+    )
+    count = select(func.count()).select_from(filtered.subquery())
+    return page, count
+
+
+@timed_service
+def get_executors_page(db_session: Session, title_id: int, page_current: int = 0, page_size: int = 5,
+                       sort_by=None, filter_query: str = ""):
+    """
+    Страница таблицы специалистов для DataTable с page/sort/filter_action="custom".
+    Если полная таблица титула уже есть в кэше — фильтрация и сортировка в pandas без запроса к БД,
+    иначе фильтр, сортировка и LIMIT/OFFSET выполняются в SQL.
+
+    :param db_session: Сессия базы данных SQLAlchemy
+    :param title_id: ID титула
+    :param page_current: Номер страницы (с 0)
+    :param page_size: Строк на странице
+    :param sort_by: sort_by DataTable
+    :param filter_query: filter_query DataTable
+    :return: (DataFrame страницы, число строк после фильтра)
+    """
+    filters = parse_filter_query(filter_query, EXECUTOR_DTYPES)
+    sort = parse_sort_by(sort_by, EXECUTOR_DTYPES)
+    offset = max(page_current, 0) * page_size
+    try:
+        found, result_df = get_executors_data_by_project.peek(title_id=title_id)
+        if found:
+            result_df = sort_frame(filter_frame(result_df, filters), sort)
+            return result_df.iloc[offset:offset + page_size], len(result_df)
+
+        page, count = executor_page_query(title_id, filters, sort, offset, page_size)
+        result_df = read_frame(db_session, page, EXECUTOR_DTYPES).fillna(0)
+        return result_df, db_session.execute(count).scalar_one()
     except Exception as e:
-        logging.error(f"Ошибка при получении данных: {e}")
-        return pd.DataFrame(columns=["name", "mass", "total_hours", "plan_mass", "completed_drawings", "tekla_hours", "tekla_percentage"])
+        report_error(f"Ошибка при получении страницы специалистов: {e}")
+        return pd.DataFrame(columns=EXECUTOR_COLUMNS), 0
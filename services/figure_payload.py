@@ -0,0 +1,238 @@
+"""
+Компактное представление фигур plotly для ответа колбека.
+
+Вместо fig.to_dict() (шаблон оформления целиком, даты строками ISO, числа списками JSON):
+- от шаблона оформления остаются цвета, шрифт, сетка осей и настройки трасс, которые есть на графике;
+- x/y передаются типизированными массивами plotly.js ({"dtype": "f8", "bdata": base64});
+- даты — числом миллисекунд от эпохи, ось x помечается как type="date";
+- длинные ряды прореживаются LTTB (Largest-Triangle-Three-Buckets) до max_points точек —
+  ширины графика в пикселях (max_points_for_width), форма кривой сохраняется. Точки выбираются
+  по первой трассе и берутся те же для всех трасс с тем же x, чтобы подсказка
+  hovermode="x unified" и линии совпадали по датам.
+
+list_figure — обратный случай для живого режима: x/y обычными списками, чтобы колбек мог
+дописывать точки Patch-ем (типизированные массивы и прореженные ряды так не продлить).
+"""
+import base64
+
+import numpy as np
+
+from config import set as settings
+
+_ARRAY_KEYS = ("x", "y")
+
+
+def encode_array(values) -> dict:
+    """Типизированный массив plotly.js (float64, base64)."""
+    data = np.ascontiguousarray(values, dtype="<f8")
+    return {"dtype": "f8", "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+
+def _as_array(value):
+    # plotly >= 6 сам кодирует числовые массивы в to_plotly_json(); приводим обратно к ndarray
+    if isinstance(value, dict) and "bdata" in value:
+        return np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+    return np.asarray(value)
+
+
+def epoch_ms(values) -> np.ndarray:
+    """Даты в миллисекунды от эпохи (NaT -> NaN) — ось type="date" в plotly.js понимает такие числа."""
+    dates = np.asarray(values, dtype="datetime64[ms]")
+    result = dates.astype("int64").astype("float64")
+    result[np.isnat(dates)] = np.nan
+    return result
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Индексы точек, отобранных Largest-Triangle-Three-Buckets.
+
+    :param x: Значения по оси x (возрастающие числа)
+    :param y: Значения по оси y; NaN при выборе считаются нулём
+    :param threshold: Сколько точек оставить (первая и последняя входят всегда)
+    :return: Возрастающий массив индексов
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.nan_to_num(np.asarray(y, dtype="float64"))
+
+    # threshold - 2 корзины по внутренним точкам [1, n - 1); после последней корзины — последняя точка
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def _numbers(values) -> np.ndarray:
+    values = _as_array(values)
+    return epoch_ms(values) if np.issubdtype(values.dtype, np.datetime64) else values
+
+
+def sample_indices(x, y, max_points: int):
+    """
+    Индексы LTTB для ряда (x, y) — их же можно применить к другим рядам с тем же x (compact_trace(keep=...)).
+
+    :return: Массив индексов или None, если ряд не длиннее max_points (или max_points = 0)
+    """
+    if not max_points or len(x) <= max_points:
+        return None
+    return lttb_indices(_numbers(x), _numbers(y), max_points)
+
+
+def compact_trace(trace: dict, max_points: int = 0, keep=None) -> dict:
+    """
+    Переводит x/y трассы в типизированные массивы; даты — в миллисекунды от эпохи.
+
+    :param trace: Трасса в виде словаря (fig.to_plotly_json()["data"][i] или go.Scatter(...).to_plotly_json())
+    :param max_points: Прореживание LTTB до этого числа точек; 0 — без прореживания
+    :param keep: Готовые индексы точек (sample_indices по основному ряду); если заданы, max_points не используется
+    :return: Новый словарь трассы
+    """
+    trace = dict(trace)
+    arrays = {key: _numbers(trace[key]) for key in _ARRAY_KEYS if trace.get(key) is not None}
+
+    if keep is None and len(arrays) == 2:
+        keep = sample_indices(arrays["x"], arrays["y"], max_points)
+    if keep is not None:
+        arrays = {key: values[keep] for key, values in arrays.items()}
+
+    for key, values in arrays.items():
+        trace[key] = encode_array(values) if values.dtype.kind in "biuf" else values.tolist()
+    return trace
+
+
+# Нижняя граница предела точек: ширина ещё не измерена браузером или график скрыт
+MIN_GRAPH_POINTS = 200
+
+
+def max_points_for_width(width) -> int:
+    """
+    Предел точек LTTB для графика шириной width пикселей (store-graph-width): по точке на пиксель,
+    не больше settings.line_graph_max_points; без ширины — settings.line_graph_max_points.
+    """
+    limit = settings.line_graph_max_points
+    if not limit or not width:
+        return limit
+    return min(limit, max(int(width), MIN_GRAPH_POINTS))
+
+
+# Части layout шаблона plotly, влияющие на двумерные графики дашборда; остальное (цветовые шкалы,
+# geo, polar, scene и т. п.) — большая часть ~7 КБ шаблона в каждом ответе
+_TEMPLATE_LAYOUT_KEYS = (
+    "autotypenumbers", "colorway", "font", "hovermode", "hoverlabel", "paper_bgcolor", "plot_bgcolor",
+    "title", "xaxis", "yaxis",
+)
+
+
+def minimal_template(figure: dict):
+    """
+    Шаблон оформления фигуры без частей, которые графики не используют: layout из _TEMPLATE_LAYOUT_KEYS
+    и настройки только тех типов трасс, что есть на графике.
+
+    :param figure: fig.to_plotly_json()
+    :return: Словарь шаблона или None, если шаблона нет
+    """
+    template = figure["layout"].get("template")
+    if not template:
+        return None
+    trace_types = {trace.get("type", "scatter") for trace in figure["data"]}
+    return {
+        "layout": {key: value for key, value in template.get("layout", {}).items() if key in _TEMPLATE_LAYOUT_KEYS},
+        "data": {key: value for key, value in template.get("data", {}).items() if key in trace_types},
+    }
+
+
+def _layout(figure: dict) -> dict:
+    layout = dict(figure["layout"])
+    template = minimal_template(figure)
+    if template is None:
+        layout.pop("template", None)
+    else:
+        layout["template"] = template
+    return layout
+
+
+def compact_figure(fig, max_points: int = None) -> dict:
+    """
+    Фигура для ответа колбека в компактном виде (с сокращённым шаблоном оформления, minimal_template).
+
+    :param fig: go.Figure
+    :param max_points: Предел точек на трассу; по умолчанию settings.line_graph_max_points
+    :return: {"data": [...], "layout": {...}}
+    """
+    if max_points is None:
+        max_points = settings.line_graph_max_points
+
+    figure = fig.to_plotly_json()
+    layout = _layout(figure)
+
+    data = []
+    sampled = []  # (x, индексы LTTB) рядов, по которым уже выбраны точки
+    for trace in figure["data"]:
+        x = _as_array(trace.get("x", []))
+        keep = None
+        if trace.get("y") is not None:
+            keep = next((indices for other, indices in sampled if np.array_equal(other, x)), None)
+            if keep is None:
+                keep = sample_indices(x, trace["y"], max_points)
+                sampled.append((x, keep))
+        data.append(compact_trace(trace, keep=keep))
+        if np.issubdtype(x.dtype, np.datetime64):
+            layout["xaxis"] = {**layout.get("xaxis", {}), "type": "date"}
+    return {"data": data, "layout": layout}
+
+
+def figure_payload(fig, max_points: int = None) -> dict:
+    """compact_figure или fig.to_dict() — в зависимости от settings.compact_figures."""
+    if settings.compact_figures:
+        return compact_figure(fig, max_points)
+    return fig.to_dict()
+
+
+def list_values(values) -> list:
+    """Массив в список JSON: даты — 'YYYY-MM-DD', NaN / NaT — None."""
+    values = _as_array(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [None if text == "NaT" else text for text in np.datetime_as_string(values, unit="D").tolist()]
+    if values.dtype.kind == "f":
+        return [None if np.isnan(value) else value for value in values.tolist()]
+    return values.tolist()
+
+
+def list_figure(fig) -> dict:
+    """
+    Фигура с x/y обычными списками и сокращённым шаблоном оформления: к её трассам можно дописывать
+    точки через dash.Patch (живой режим линейного графика).
+
+    :param fig: go.Figure
+    :return: {"data": [...], "layout": {...}}
+    """
+    figure = fig.to_plotly_json()
+    layout = _layout(figure)
+
+    data = []
+    for trace in figure["data"]:
+        trace = dict(trace)
+        for key in _ARRAY_KEYS:
+            if trace.get(key) is not None:
+                trace[key] = list_values(trace[key])
+        data.append(trace)
+    return {"data": data, "layout": layout}
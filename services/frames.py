@@ -0,0 +1,132 @@
+"""
+Типизированное получение результатов запросов для DataFrame сервисов.
+
+Суммы и средние по NUMERIC-колонкам приводятся к FLOAT на стороне БД (as_float), поэтому драйвер
+(psycopg2 / asyncpg / sqlite3) сразу возвращает float: без создания Decimal на каждую строку
+и без последующего .astype(float) над колонками типа object.
+
+read_frame / read_frame_async читают результат пакетами (yield_per / серверный курсор) прямо
+в предвыделенные NumPy-массивы колонок, минуя список Row-объектов целиком;
+iter_frames отдаёт те же колонки по пакетам (потоковая выгрузка, routes/export_routes.py).
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, cast
+
+from services import metrics
+
+
+def as_float(expression):
+    """CAST(expression AS FLOAT): значение приходит из драйвера как float."""
+    return cast(expression, Float)
+
+
+# Небольшие пакеты: строки пакета освобождаются до перевода в старшие поколения сборщика мусора,
+# и полные сборки по мере чтения не запускаются (benchmarks/bench_frame_fetch.py)
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class _ColumnBuffer:
+    """Предвыделенный массив колонки, растущий удвоением по мере поступления пакетов строк."""
+
+    def __init__(self, dtype, capacity: int):
+        self.dtype = np.dtype(dtype)
+        self.data = np.empty(capacity, dtype=self.dtype)
+        self.size = 0
+
+    def extend(self, values):
+        if self.dtype.kind == "M":
+            # date/datetime-объекты: векторный разбор pandas на порядок быстрее np.asarray
+            chunk = pd.to_datetime(values, errors="coerce").to_numpy(self.dtype)
+        else:
+            chunk = np.asarray(values, dtype=self.dtype)
+        end = self.size + len(chunk)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=self.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = chunk
+        self.size = end
+
+    def array(self):
+        return self.data[:self.size]
+
+
+def _buffers(columns: dict, chunk_size: int):
+    return {name: _ColumnBuffer(dtype, chunk_size) for name, dtype in columns.items()}
+
+
+def _fill(buffers: dict, partition):
+    # Транспонирование пакета строк в колонки; преобразование типов — целиком на уровне NumPy
+    for buffer, values in zip(buffers.values(), zip(*partition)):
+        buffer.extend(values)
+
+
+def _frame(buffers: dict):
+    return pd.DataFrame({name: buffer.array() for name, buffer in buffers.items()})
+
+
+def _observed_frame(buffers: dict, start: float, build_seconds: float):
+    # Метрики read_frame: fetch — выполнение запроса и чтение пакетов, build — колонки и DataFrame
+    build_start = time.perf_counter()
+    frame = _frame(buffers)
+    end = time.perf_counter()
+    build_seconds += end - build_start
+    metrics.observe_frame(end - start - build_seconds, build_seconds, len(frame))
+    return frame
+
+
+def read_frame(db, statement, columns: dict, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Читает результат запроса пакетами (yield_per / серверный курсор) сразу в типизированные колонки.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param statement: select(), колонки которого идут в порядке columns
+    :param columns: {имя колонки: dtype}, например {"Дата": "datetime64[ns]", "Масса": "float64", "name": object};
+                    NULL допустимы во float64 (NaN), datetime64 (NaT) и object
+    :param chunk_size: Размер пакета строк
+    :return: DataFrame с колонками и типами из columns
+    """
+    start = time.perf_counter()
+    buffers = _buffers(columns, chunk_size)
+    # Выполнение на уровне Core: строки не проходят через ORM-загрузчик
+    result = db.connection().execute(statement, execution_options={"yield_per": chunk_size})
+    build_seconds = 0.0
+    for partition in result.partitions():
+        build_start = time.perf_counter()
+        _fill(buffers, partition)
+        build_seconds += time.perf_counter() - build_start
+    return _observed_frame(buffers, start, build_seconds)
+
+
+def iter_frames(db, statement, columns: dict, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Как read_frame, но отдаёт отдельный DataFrame на каждый пакет строк — для потоковой выгрузки,
+    при которой результат целиком в памяти не собирается. Для пустого результата — один DataFrame
+    без строк с колонками и типами из columns (заголовок CSV, схема Parquet).
+    """
+    result = db.connection().execute(statement, execution_options={"yield_per": chunk_size})
+    empty = True
+    for partition in result.partitions():
+        buffers = _buffers(columns, len(partition))
+        _fill(buffers, partition)
+        empty = False
+        yield _frame(buffers)
+    if empty:
+        yield _frame(_buffers(columns, 0))
+
+
+async def read_frame_async(db, statement, columns: dict, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Асинхронная версия read_frame для AsyncSession (серверный курсор через db.stream)."""
+    start = time.perf_counter()
+    buffers = _buffers(columns, chunk_size)
+    connection = await db.connection()
+    result = await connection.stream(statement, execution_options={"yield_per": chunk_size})
+    build_seconds = 0.0
+    async for partition in result.partitions():
+        build_start = time.perf_counter()
+        _fill(buffers, partition)
+        build_seconds += time.perf_counter() - build_start
+    return _observed_frame(buffers, start, build_seconds)
@@ -0,0 +1,404 @@
+"""
+Метрики дашборда в формате Prometheus (GET /metrics, routes/metrics_routes.py).
+
+Гистограммы:
+  dashboard_callback_duration_seconds{callback}    — колбек Dash целиком;
+  dashboard_callback_response_bytes{callback}      — размер JSON-ответа колбека (для графиков — в основном фигура);
+  dashboard_service_duration_seconds{service,cache} — сервисные функции; cache: hit / miss / none (без кэша);
+  dashboard_db_query_duration_seconds{source}      — выполнение SQL (события Engine); source — сервис или колбек;
+  dashboard_frame_seconds{source,stage}            — read_frame: fetch (строки из курсора) и build (колонки, DataFrame);
+  dashboard_frame_rows{source}                     — строк в DataFrame.
+Счётчик dashboard_errors_total{source} — ошибки, перехваченные колбеками и сервисами (report_error).
+
+Замер — perf_counter и увеличение счётчика бакета под блокировкой, поэтому метрики можно держать
+включёнными в продакшене (settings.metrics_enabled). Значения накапливаются в процессе; при
+settings.metrics_dir каждый воркер gunicorn раз в metrics_flush_seconds сбрасывает их в файл JSON,
+и /metrics отдаёт сумму по всем воркерам. Каталог создаётся приватным при старте сервера
+(prepare_metrics_dir, services/runtime_dir.py).
+"""
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import set as settings
+from services.runtime_dir import check_private_dir, create_private_dir, ensure_private_dir
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ROWS_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+ENABLED = settings.metrics_enabled
+logger = logging.getLogger(__name__)
+_lock = threading.Lock()
+_current_callback = ContextVar("dashboard_callback", default="")
+_current_service = ContextVar("dashboard_service", default="")
+
+
+class Histogram:
+    """Гистограмма с фиксированными бакетами; значения по наборам меток."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}  # метки -> [счётчики по бакетам (последний — +Inf), сумма]
+
+    def observe(self, value: float, *labels):
+        if not ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @staticmethod
+    def merge(target: list, state: list):
+        for index, value in enumerate(state):
+            target[index] += value
+
+    def lines(self, values: dict):
+        for labels, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le=bound)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {state[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}  # метки -> [значение]
+
+    def inc(self, *labels, amount: float = 1):
+        if not ENABLED:
+            return
+        with _lock:
+            state = self.values.setdefault(labels, [0])
+            state[0] += amount
+
+    merge = staticmethod(Histogram.merge)
+
+    def lines(self, values: dict):
+        for labels, state in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {state[0]}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+CALLBACK_SECONDS = Histogram(
+    "dashboard_callback_duration_seconds", "Время выполнения колбека Dash", ("callback",), TIME_BUCKETS,
+)
+CALLBACK_BYTES = Histogram(
+    "dashboard_callback_response_bytes", "Размер JSON-ответа колбека Dash", ("callback",), BYTES_BUCKETS,
+)
+SERVICE_SECONDS = Histogram(
+    "dashboard_service_duration_seconds", "Время сервисной функции", ("service", "cache"), TIME_BUCKETS,
+)
+QUERY_SECONDS = Histogram(
+    "dashboard_db_query_duration_seconds", "Время выполнения SQL-запроса", ("source",), TIME_BUCKETS,
+)
+FRAME_SECONDS = Histogram(
+    "dashboard_frame_seconds", "Чтение строк и сборка DataFrame в read_frame", ("source", "stage"), TIME_BUCKETS,
+)
+FRAME_ROWS = Histogram("dashboard_frame_rows", "Строк в DataFrame из read_frame", ("source",), ROWS_BUCKETS)
+ERRORS = Counter("dashboard_errors_total", "Ошибки, перехваченные колбеками и сервисами", ("source",))
+
+REGISTRY = (CALLBACK_SECONDS, CALLBACK_BYTES, SERVICE_SECONDS, QUERY_SECONDS, FRAME_SECONDS, FRAME_ROWS, ERRORS)
+
+
+def current_source() -> str:
+    """Сервис, внутри которого идёт выполнение, иначе колбек; вне обоих — "other"."""
+    return _current_service.get() or _current_callback.get() or "other"
+
+
+def current_callback() -> str:
+    return _current_callback.get()
+
+
+# Колбеки
+def timed_callback(func):
+    """Оборачивает колбек Dash: время выполнения и имя колбека для вложенных замеров."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_callback.set(name)
+        if has_app_context():
+            g.dashboard_callback = name  # для размера ответа (routes/metrics_routes.py)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            ERRORS.inc(name)
+            raise
+        finally:
+            CALLBACK_SECONDS.observe(time.perf_counter() - start, name)
+            _current_callback.reset(token)
+
+    return wrapper
+
+
+class _InstrumentedApp:
+    # Прокси Dash-приложения: app.callback(...) регистрирует колбек, обёрнутый timed_callback
+    def __init__(self, app):
+        self._app = app
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+    def callback(self, *args, **kwargs):
+        register = self._app.callback(*args, **kwargs)
+
+        def decorator(func):
+            return register(timed_callback(func))
+
+        return decorator
+
+
+def instrument_app(app):
+    """Прокси app для register_graph_callbacks: все серверные колбеки измеряются."""
+    return _InstrumentedApp(app) if ENABLED else app
+
+
+def observe_response(callback: str, size: int):
+    CALLBACK_BYTES.observe(size, callback)
+
+
+# Сервисы
+@contextmanager
+def service_scope(name: str):
+    """Запросы и DataFrame внутри блока учитываются под именем сервиса."""
+    token = _current_service.set(name)
+    try:
+        yield
+    finally:
+        _current_service.reset(token)
+
+
+def observe_service(name: str, seconds: float, cache: str):
+    SERVICE_SECONDS.observe(seconds, name, cache)
+
+
+def timed_service(func):
+    """Замер сервисной функции без кэша (для @cached_by_title замер встроен в декоратор)."""
+    name = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        with service_scope(name):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe_service(name, time.perf_counter() - start, "none")
+
+    return wrapper
+
+
+def observe_frame(fetch_seconds: float, build_seconds: float, rows: int):
+    source = current_source()
+    FRAME_SECONDS.observe(fetch_seconds, source, "fetch")
+    FRAME_SECONDS.observe(build_seconds, source, "build")
+    FRAME_ROWS.observe(rows, source)
+
+
+def report_error(message: str):
+    """Пишет сообщение об ошибке в лог и учитывает её в dashboard_errors_total."""
+    ERRORS.inc(current_source())
+    logger.error(message)
+
+
+# SQL: события всех Engine, включая sync_engine асинхронного
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("dashboard_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("dashboard_query_start")
+    if starts:
+        QUERY_SECONDS.observe(time.perf_counter() - starts.pop(), current_source())
+
+
+def instrument_engines():
+    if ENABLED and not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Несколько воркеров: периодический сброс значений процесса в settings.metrics_dir
+def _snapshot() -> dict:
+    with _lock:
+        return {metric.name: {labels: list(state) for labels, state in metric.values.items()} for metric in REGISTRY}
+
+
+def _dump_path(pid: int) -> str:
+    return os.path.join(settings.metrics_dir, f"metrics_{pid}.json")
+
+
+def flush():
+    """Записывает значения текущего процесса в settings.metrics_dir (JSON, атомарной заменой файла)."""
+    dump = {name: [[list(labels), state] for labels, state in states.items()] for name, states in _snapshot().items()}
+    path = _dump_path(os.getpid())
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(dump, file)
+    os.replace(temporary, path)
+
+
+_flusher = None
+
+
+def start_flusher():
+    """Поток, сбрасывающий метрики процесса каждые settings.metrics_flush_seconds (один на процесс)."""
+    global _flusher
+    if not ENABLED or not settings.metrics_dir:
+        return None
+    if _flusher is not None and _flusher.is_alive():
+        return _flusher
+    try:
+        check_private_dir(settings.metrics_dir)
+    except OSError as e:
+        report_error(f"Каталог метрик не используется: {e}")
+        return None
+
+    def run():
+        while True:
+            time.sleep(settings.metrics_flush_seconds)
+            try:
+                flush()
+            except OSError as e:
+                report_error(f"Ошибка записи метрик: {e}")
+
+    _flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+    _flusher.start()
+    return _flusher
+
+
+def prepare_metrics_dir():
+    """
+    Готовит каталог метрик при старте сервера (gunicorn.conf.py, до запуска воркеров): без
+    settings.metrics_dir — новый приватный каталог; заданный METRICS_DIR создаётся с правами 0700
+    или проверяется (ensure_private_dir) и очищается — счётчики прошлого запуска не суммируются с новыми.
+
+    :return: Созданный каталог (удаляется при остановке сервера) или None для заданного METRICS_DIR
+    """
+    if not settings.metrics_dir:
+        settings.metrics_dir = create_private_dir("project_dashboard_metrics_")
+        return settings.metrics_dir
+    ensure_private_dir(settings.metrics_dir)
+    for path in glob.glob(os.path.join(settings.metrics_dir, "metrics_*.json*")):
+        os.remove(path)
+    return None
+
+
+def _read_dump(path: str, metrics: dict) -> dict:
+    """
+    Значения из файла воркера: {имя метрики: {метки: состояние}}; записи, не совпадающие
+    с метрикой по числу меток и бакетов, пропускаются.
+    """
+    with open(path, encoding="utf-8") as file:
+        dump = json.load(file)
+    values = {}
+    for name, entries in dump.items() if isinstance(dump, dict) else ():
+        metric = metrics.get(name)
+        if metric is None or not isinstance(entries, list):
+            continue
+        size = len(metric.buckets) + 2 if isinstance(metric, Histogram) else 1
+        for entry in entries:
+            try:
+                labels, state = entry
+            except (TypeError, ValueError):
+                continue
+            if (
+                isinstance(labels, list) and len(labels) == len(metric.labelnames)
+                and all(isinstance(label, str) for label in labels)
+                and isinstance(state, list) and len(state) == size
+                and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in state)
+            ):
+                values.setdefault(name, {})[tuple(labels)] = state
+    return values
+
+
+def collect() -> dict:
+    """
+    Значения метрик: текущего процесса, а при settings.metrics_dir — сумма по файлам всех
+    воркеров (включая завершившиеся: счётчики Prometheus не должны уменьшаться).
+    """
+    values = _snapshot()
+    if not settings.metrics_dir:
+        return values
+    try:
+        check_private_dir(settings.metrics_dir)
+    except OSError as e:
+        report_error(f"Каталог метрик не используется: {e}")
+        return values
+
+    own = _dump_path(os.getpid())
+    metrics = {metric.name: metric for metric in REGISTRY}
+    for path in glob.glob(os.path.join(settings.metrics_dir, "metrics_*.json")):
+        if path == own:
+            continue
+        try:
+            dump = _read_dump(path, metrics)
+        except (OSError, ValueError):
+            continue
+        for name, states in dump.items():
+            for labels, state in states.items():
+                target = values[name].setdefault(labels, [0] * len(state))
+                metrics[name].merge(target, state)
+    return values
+
+
+def _gauges(extra_gauges: dict):
+    for name, (documentation, value) in extra_gauges.items():
+        yield f"# HELP {name} {documentation}"
+        yield f"# TYPE {name} gauge"
+        yield f"{name} {value}"
+
+
+def render(extra_gauges: dict = None) -> str:
+    """
+    Текст в формате Prometheus exposition.
+
+    :param extra_gauges: {имя: (описание, значение)} — состояние пула и кэша (по текущему процессу)
+    """
+    values = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines(values[metric.name]))
+    lines.extend(_gauges(extra_gauges or {}))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,60 @@
+"""
+Прогресс выполнения титула: смоделированная масса против проектного тоннажа (Title.initial_mass).
+
+Накопленная масса берётся из TitleTotals, которую database/rollups.py увеличивает при каждой
+загрузке ModelingData, поэтому выбор титула — поиск одной строки по первичному ключу,
+без суммирования истории.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+
+from database import models
+from services.cache import cached_by_title
+from services.frames import as_float
+from services.metrics import report_error
+
+# total_mass хранится в тех же единицах, что и в таблице специалистов: / 1e6 -> тонны
+MASS_DIVISOR = 1000000
+
+
+def title_progress_query(title_id: int):
+    totals = models.TitleTotals
+    return (
+        select(
+            as_float(func.coalesce(totals.total_mass, 0) / MASS_DIVISOR).label("mass"),
+            as_float(models.Title.initial_mass).label("initial_mass"),
+        )
+        .outerjoin(totals, totals.title_id == models.Title.id)
+        .where(models.Title.id == title_id)
+    )
+
+
+def completion_percentage(mass: float, initial_mass: float):
+    """Процент выполнения; None, если проектный тоннаж не задан."""
+    if not initial_mass or initial_mass <= 0:
+        return None
+    return round(mass * 100 / initial_mass, 1)
+
+
+@cached_by_title
+def get_title_progress(db: Session, title_id: int):
+    """
+    Прогресс выполнения титула.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param title_id: ID титула
+    :return: {"title_id", "mass", "initial_mass", "percentage"} или None, если титула нет
+    """
+    try:
+        row = db.execute(title_progress_query(title_id)).first()
+        if row is None:
+            return None
+        return {
+            "title_id": title_id,
+            "mass": row.mass,
+            "initial_mass": row.initial_mass,
+            "percentage": completion_percentage(row.mass, row.initial_mass),
+        }
+    except Exception as e:
+        report_error(f"❌ Ошибка при получении прогресса титула: {e}")
+        return None
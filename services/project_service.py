@@ -1,7 +1,13 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import models
-from sqlalchemy import func
-import pandas as pd
+from services.cache import TTLCache, cached_by_title
+from services.frames import as_float, read_frame, read_frame_async
+from services.metrics import report_error, timed_service
+from database.db import session_scope
+from database import events
+from config import set as settings
+from sqlalchemy import func, select
 
 
 # Получение списка проектов из базы данных
@@ -9,6 +15,18 @@ def get_project_list(db: Session):
     projects = db.query(models.Project).all()
     return [{"label": project.project_name, "value": project.id} for project in projects]
 
+# Список проектов для выпадающего списка с коротким TTL: новые проекты появляются без перезапуска
+_project_list_cache = TTLCache(max_entries=1, ttl_seconds=settings.project_list_ttl_seconds)
+
+@timed_service
+def get_project_list_cached():
+    found, projects = _project_list_cache.get(("projects",))
+    if not found:
+        with session_scope() as db:
+            projects = get_project_list(db)
+        _project_list_cache.set(("projects",), projects)
+    return projects
+
 # Получение списка заголовков по проекту
 def get_titles_by_project(db: Session, project_id: int):
     titles = db.query(models.Title).filter(models.Title.project_id == project_id).all()
@@ -44,36 +62,162 @@ def get_drawing_data_for_task(db: Session, task_id: int):
     drawing_data = db.query(models.DrawingData).filter(models.DrawingData.title_id == task_id).all()
     return [{"executor_id": data.executor_id, "number_of_drawings": data.number_of_drawings} for data in drawing_data]
 
-def get_time_by_chapter_for_title(db: Session, title_id: int):
-    try:
-        query = (
-            db.query(
-                models.TitleChapter.chapter_name.label("chapter_name"),
-                func.sum(models.WorksectionTask.time).label("total_time")
+# Запрос времени по главам титула; общий для sync и async версий
+def time_by_chapter_query(title_id: int, from_facts: bool = False):
+    """
+    Время по главам титула с группировкой по chapter_id (главы с одинаковым именем не сливаются).
+
+    :param title_id: ID титула
+    :param from_facts: Суммировать WorksectionTask вместо агрегатов TitleChapterStats
+    """
+    chapter = models.TitleChapter
+    if from_facts:
+        task = models.WorksectionTask
+        stats = (
+            select(
+                task.chapter_id.label("chapter_id"),
+                func.sum(task.time).label("total_time"),
             )
-            .join(models.WorksectionTask, models.WorksectionTask.chapter_id == models.TitleChapter.id)
-            .filter(models.WorksectionTask.title_id == title_id)
-            .group_by(models.TitleChapter.chapter_name)
+            .where(task.title_id == title_id)
+            .group_by(task.chapter_id)
+            .subquery("stats")
+        ).c
+    else:
+        stats = models.TitleChapterStats.__table__.c
+
+    query = (
+        select(
+            stats.chapter_id,
+            chapter.chapter_name.label("chapter_name"),
+            as_float(stats.total_time).label("total_time")
         )
+        .join(chapter, chapter.id == stats.chapter_id)
+        .order_by(chapter.chapter_name, stats.chapter_id)
+    )
+    if not from_facts:
+        query = query.where(stats.title_id == title_id)
+    return query
+
+CHAPTER_COLUMNS = {"chapter_id": "int64", "chapter_name": object, "total_time": "float64"}
+
+def _chapter_frame(df, title_id: int):
+    if df.empty:
+        print(f"⚠️ Нет данных для title_id: {title_id}")
+        return None
 
-        result = query.all()
+    df["total_time"] = df["total_time"].fillna(0)
 
-        if not result:
-            print(f"⚠️ Нет данных для title_id: {title_id}")
-            return None
+    total_time = df["total_time"].sum()
+    df["percentage"] = (df["total_time"] / total_time) * 100 if total_time > 0 else 0
 
-        df = pd.DataFrame(result, columns=["chapter_name", "total_time"])
-        df["total_time"] = df["total_time"].fillna(0).astype(float)
+    return df
 
-        total_time = df["total_time"].sum()
-        df["percentage"] = (df["total_time"] / total_time) * 100 if total_time > 0 else 0
+@cached_by_title
+def get_time_by_chapter_for_title(db: Session, title_id: int, from_facts: bool = False):
+    try:
+        df = read_frame(db, time_by_chapter_query(title_id, from_facts), CHAPTER_COLUMNS)
+        return _chapter_frame(df, title_id)
 
-        return df
+    except Exception as e:
+        report_error(f"❌ Ошибка при получении данных: {e}")
+        return None
+
+@cached_by_title
+async def get_time_by_chapter_for_title_async(db: AsyncSession, title_id: int, from_facts: bool = False):
+    try:
+        df = await read_frame_async(db, time_by_chapter_query(title_id, from_facts), CHAPTER_COLUMNS)
+        return _chapter_frame(df, title_id)
 
     except Exception as e:
-        print(f"❌ Ошибка при получении данных: {e}")
+        report_error(f"❌ Ошибка при получении данных: {e}")
         return None
 
-    finally:
-        db.close()  # Закрываем соединение вручную
 
+# Обзор проекта: показатели по каждому титулу проекта
+PROJECT_OVERVIEW_COLUMNS = {
+    "title_id": "int64",
+    "title_name": object,
+    "initial_mass": "float64",
+    "mass": "float64",
+    "plan_mass": "float64",
+    "drawings": "int64",
+    "work_section_hours": "float64",
+    "tekla_hours": "float64",
+}
+
+def _title_sums(model, title_ids, **columns):
+    """Подзапрос title_id + суммы по титулам проекта."""
+    return (
+        select(model.title_id, *(func.sum(column).label(name) for name, column in columns.items()))
+        .where(model.title_id.in_(title_ids))
+        .group_by(model.title_id)
+        .subquery()
+    )
+
+def project_overview_query(project_id: int, from_facts: bool = False):
+    """
+    Один запрос со строкой на каждый титул проекта: масса (т), плановая масса по часам Tekla,
+    проектный тоннаж (initial_mass), чертежи и часы.
+
+    :param project_id: ID проекта
+    :param from_facts: Суммировать таблицы фактов вместо итогов TitleTotals
+    """
+    title = models.Title
+    if from_facts:
+        title_ids = select(title.id).where(title.project_id == project_id).scalar_subquery()
+        mass = _title_sums(models.ModelingData, title_ids, total_mass=models.ModelingData.total_mass)
+        drawings = _title_sums(models.DrawingData, title_ids, total_drawings=models.DrawingData.number_of_drawings)
+        tekla = _title_sums(models.WorkHoursInTekla, title_ids, tekla_hours=models.WorkHoursInTekla.hours_worked)
+        work_section = _title_sums(
+            models.WorkHoursInWorkSection, title_ids, work_section_hours=models.WorkHoursInWorkSection.hours_worked,
+        )
+        sources = [mass, drawings, tekla, work_section]
+    else:
+        # Итоги по титулу поддерживаются при загрузке: по строке на титул, без суммирования по дням
+        totals = models.TitleTotals.__table__
+        mass = drawings = tekla = work_section = totals
+        sources = [totals]
+
+    tekla_hours = func.coalesce(tekla.c.tekla_hours, 0)
+    query = select(
+        title.id.label("title_id"),
+        title.title_name,
+        as_float(title.initial_mass).label("initial_mass"),
+        as_float(func.coalesce(mass.c.total_mass, 0) / 1000000).label("mass"),
+        as_float(tekla_hours / 3).label("plan_mass"),
+        func.coalesce(drawings.c.total_drawings, 0).label("drawings"),
+        as_float(func.coalesce(work_section.c.work_section_hours, 0)).label("work_section_hours"),
+        as_float(tekla_hours).label("tekla_hours"),
+    )
+    for source in sources:
+        query = query.outerjoin(source, source.c.title_id == title.id)
+    return query.where(title.project_id == project_id).order_by(title.title_name, title.id)
+
+# Кэш обзора проектов; очищается при любой загрузке данных (database/events.py)
+_project_overview_cache = TTLCache(max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
+events.subscribe(lambda title_ids: _project_overview_cache.clear())
+events.subscribe_reset(_project_overview_cache.clear)
+
+@timed_service
+def get_project_overview(db: Session, project_id: int, from_facts: bool = False):
+    """
+    Показатели всех титулов проекта.
+
+    :param db: Сессия базы данных SQLAlchemy
+    :param project_id: ID проекта
+    :param from_facts: Считать по таблицам фактов (для проверки агрегатов)
+    :return: DataFrame с колонками PROJECT_OVERVIEW_COLUMNS
+    """
+    key = ("get_project_overview", project_id, from_facts)
+    found, df = _project_overview_cache.get(key)
+    if found:
+        return df.copy()
+
+    try:
+        df = read_frame(db, project_overview_query(project_id, from_facts), PROJECT_OVERVIEW_COLUMNS)
+    except Exception as e:
+        report_error(f"❌ Ошибка при получении обзора проекта: {e}")
+        return None
+
+    _project_overview_cache.set(key, df.copy())
+    return df
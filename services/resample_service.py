@@ -0,0 +1,95 @@
+"""
+Векторизованная агрегация временных рядов дашборда по интервалам day / week / month / quarter.
+
+Границы интервалов вычисляются арифметикой над datetime64 (без Period-объектов и apply),
+агрегаты — через np.add.reduceat по отсортированным интервалам.
+"""
+import numpy as np
+import pandas as pd
+
+INTERVALS = ("day", "week", "month", "quarter")
+
+# Агрегации линейного графика: масса, чертежи и плановая масса суммируются, сложность усредняется
+LINE_AGGREGATIONS = {
+    "Масса": "sum",
+    "Сложность": "mean",
+    "Плановая масса": "sum",
+    "Общие часы": "sum",
+    "Всего чертежей": "sum",
+}
+
+# 1970-01-01 — четверг; сдвиг на 3 дня даёт начало недели в понедельник (как to_period("W"))
+_EPOCH_WEEKDAY_SHIFT = 3
+
+
+def bucket_dates(dates, interval: str) -> np.ndarray:
+    """
+    Возвращает начало интервала для каждой даты.
+
+    :param dates: Series / массив datetime64
+    :param interval: day / week / month / quarter
+    :return: np.ndarray datetime64[ns]; NaT остаются NaT
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Неизвестный интервал: {interval}")
+
+    days = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+
+    if interval == "day":
+        buckets = days
+    elif interval == "week":
+        nat = np.isnat(days)
+        ordinal = days.astype(np.int64)
+        buckets = (ordinal - (ordinal + _EPOCH_WEEKDAY_SHIFT) % 7).astype("datetime64[D]")
+        buckets[nat] = np.datetime64("NaT")
+    else:
+        months = days.astype("datetime64[M]")
+        if interval == "quarter":
+            nat = np.isnat(months)
+            ordinal = months.astype(np.int64)
+            months = (ordinal - ordinal % 3).astype("datetime64[M]")
+            months[nat] = np.datetime64("NaT")
+        buckets = months.astype("datetime64[D]")
+
+    return buckets.astype("datetime64[ns]")
+
+
+def resample_series(df: pd.DataFrame, interval: str, aggregations: dict = None, date_column: str = "Дата") -> pd.DataFrame:
+    """
+    Агрегирует ряд по интервалу, применяя к каждой колонке свою агрегацию (sum / mean).
+    Колонки, отсутствующие в aggregations, отбрасываются; NaN в mean не учитываются.
+
+    :param df: DataFrame с колонкой дат date_column
+    :param interval: day / week / month / quarter
+    :param aggregations: {колонка: "sum" | "mean"}, по умолчанию LINE_AGGREGATIONS
+    :return: DataFrame [date_column, *колонки] по одной строке на интервал
+    """
+    aggregations = LINE_AGGREGATIONS if aggregations is None else aggregations
+    columns = [column for column in df.columns if column in aggregations]
+
+    buckets = bucket_dates(df[date_column], interval)
+    valid = ~np.isnat(buckets)
+    buckets = buckets[valid]
+
+    order = np.argsort(buckets, kind="stable")
+    buckets = buckets[order]
+    if len(buckets):
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    else:
+        starts = np.array([], dtype=np.intp)
+
+    result = {date_column: buckets[starts]}
+    for column in columns:
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)[valid][order]
+        present = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(present, values, 0.0), starts) if len(starts) else np.array([])
+        if aggregations[column] == "mean":
+            counts = np.add.reduceat(present.astype(np.int64), starts) if len(starts) else np.array([])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[column] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        elif aggregations[column] == "sum":
+            result[column] = sums
+        else:
+            raise ValueError(f"Неизвестная агрегация: {aggregations[column]}")
+
+    return pd.DataFrame(result)
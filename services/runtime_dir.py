@@ -0,0 +1,54 @@
+"""
+Приватные каталоги для файлов, которые делят воркеры gunicorn: общий кэш (services/cache.py)
+и метрики (services/metrics.py).
+
+По умолчанию каталог создаёт gunicorn.conf.py при старте сервера через tempfile.mkdtemp
+(права 0700, новое имя при каждом запуске) и передаёт воркерам через настройки и переменную
+окружения; готовый каталог в /tmp не переиспользуется. Каталог, заданный явно
+(CACHE_PATH, METRICS_DIR), и файлы в нём должны принадлежать текущему пользователю
+и быть недоступны на запись остальным — иначе PermissionError.
+"""
+import os
+import stat
+import tempfile
+
+
+def create_private_dir(prefix: str) -> str:
+    """Новый каталог с правами 0700 во временном каталоге системы."""
+    return tempfile.mkdtemp(prefix=prefix)
+
+
+def _check_owner(path: str, info: os.stat_result):
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path}: принадлежит другому пользователю (uid {info.st_uid})")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path}: доступен на запись другим пользователям")
+
+
+def check_private_dir(path: str):
+    """Каталог существует, не является ссылкой и доступен на запись только владельцу — текущему пользователю."""
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path}: не каталог")
+    _check_owner(path, info)
+
+
+def check_private_file(path: str):
+    """Как check_private_dir для каталога файла; сам файл, если он есть, — обычный и свой."""
+    check_private_dir(os.path.dirname(os.path.abspath(path)))
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISREG(info.st_mode):
+        raise PermissionError(f"{path}: не обычный файл")
+    _check_owner(path, info)
+
+
+def ensure_private_dir(path: str):
+    """Создаёт каталог с правами 0700, если его нет, и проверяет его (check_private_dir)."""
+    try:
+        os.makedirs(path, mode=0o700)
+    except FileExistsError:
+        pass
+    check_private_dir(path)
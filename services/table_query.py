@@ -0,0 +1,135 @@
+"""
+Серверная постраничная выдача для DataTable (page_action / sort_action / filter_action = "custom").
+
+filter_query Dash (например, '{name} contains "Ив" && {mass} > 10') разбирается в список условий,
+которые применяются либо к SQL-запросу (WHERE / ORDER BY / LIMIT / OFFSET), либо к уже
+посчитанному DataFrame из кэша — с одинаковой семантикой.
+Значение условия приводится к типу колонки: для текстовых — строка как есть ({name} = 5 ищет "5"),
+для числовых — число; текстовые операции (contains, datestartswith) и нечисловые значения
+для числовых колонок отбрасываются.
+"""
+import operator
+import re
+
+import numpy as np
+from sqlalchemy import asc, desc
+
+# Операторы filter_query и их синонимы
+FILTER_OPERATORS = {
+    "ge": "ge", ">=": "ge",
+    "le": "le", "<=": "le",
+    "lt": "lt", "<": "lt",
+    "gt": "gt", ">": "gt",
+    "ne": "ne", "!=": "ne",
+    "eq": "eq", "=": "eq",
+    "contains": "contains",
+    "datestartswith": "datestartswith",
+}
+TEXT_OPERATIONS = ("contains", "datestartswith")
+
+# {колонка} оператор значение; оператор ищется сразу после имени колонки, а не в значении
+_FILTER_PART = re.compile(r"\s*\{(?P<name>[^}]*)\}\s*(?P<operator>>=|<=|!=|<|>|=|[a-z]+)(?:\s+|(?<=[=<>])\s*)(?P<value>.*)", re.S)
+
+_COMPARISONS = {
+    "ge": operator.ge,
+    "le": operator.le,
+    "lt": operator.lt,
+    "gt": operator.gt,
+    "ne": operator.ne,
+    "eq": operator.eq,
+}
+
+
+def _split_filter_part(part: str):
+    match = _FILTER_PART.fullmatch(part)
+    if match is None or match["operator"] not in FILTER_OPERATORS:
+        return None
+    value_part = match["value"].strip()
+    quote = value_part[:1]
+    if quote and quote == value_part[-1:] and quote in ("'", '"', "`") and len(value_part) > 1:
+        value = value_part[1:-1].replace("\\" + quote, quote)
+    else:
+        value = value_part
+    return match["name"], FILTER_OPERATORS[match["operator"]], value
+
+
+def _typed_value(operation: str, value: str, dtype):
+    """Значение условия в типе колонки; None — условие к колонке неприменимо."""
+    if np.dtype(dtype).kind not in "biuf":
+        return value
+    if operation in TEXT_OPERATIONS:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_filter_query(filter_query: str, dtypes: dict) -> list:
+    """
+    Разбирает filter_query DataTable.
+
+    :param filter_query: Строка фильтра Dash
+    :param dtypes: Допустимые колонки и их типы ({колонка: dtype}, как EXECUTOR_DTYPES);
+        условия по остальным колонкам и неприменимые к типу колонки отбрасываются
+    :return: [(колонка, операция, значение)]
+    """
+    filters = []
+    for part in (filter_query or "").split(" && "):
+        parsed = _split_filter_part(part)
+        if not parsed or parsed[0] not in dtypes:
+            continue
+        name, operation, value = parsed
+        value = _typed_value(operation, value, dtypes[name])
+        if value is not None:
+            filters.append((name, operation, value))
+    return filters
+
+
+def parse_sort_by(sort_by, columns) -> list:
+    """sort_by DataTable -> [(колонка, по возрастанию)]"""
+    return [
+        (item["column_id"], item.get("direction") != "desc")
+        for item in (sort_by or [])
+        if item.get("column_id") in columns
+    ]
+
+
+def sql_conditions(columns, filters) -> list:
+    """Условия WHERE; columns — коллекция колонок запроса (subquery.c)."""
+    conditions = []
+    for name, operation, value in filters:
+        column = columns[name]
+        if operation == "contains":
+            conditions.append(column.icontains(value))
+        elif operation == "datestartswith":
+            conditions.append(column.startswith(value))
+        else:
+            conditions.append(_COMPARISONS[operation](column, value))
+    return conditions
+
+
+def sql_order_by(columns, sort) -> list:
+    return [asc(columns[name]) if ascending else desc(columns[name]) for name, ascending in sort]
+
+
+def filter_frame(df, filters):
+    for name, operation, value in filters:
+        column = df[name]
+        if operation == "contains":
+            mask = column.astype(str).str.lower().str.contains(value.lower(), regex=False)
+        elif operation == "datestartswith":
+            mask = column.astype(str).str.startswith(value)
+        else:
+            mask = _COMPARISONS[operation](column, value)
+        df = df[mask]
+    return df
+
+
+def sort_frame(df, sort):
+    if not sort:
+        return df
+    # Устойчивая сортировка сохраняет исходный порядок (как доп. ключи ORDER BY в SQL)
+    return df.sort_values(
+        [name for name, _ in sort], ascending=[ascending for _, ascending in sort], kind="stable",
+    )
@@ -0,0 +1,149 @@
+"""
+Данные, необходимые при выборе титула: линейные ряды, разбивка времени по главам и таблица специалистов.
+
+Независимые запросы выполняются параллельно в одном event loop (database.async_db);
+если асинхронный драйвер недоступен или не подключается — в пуле потоков с отдельной сессией на запрос.
+get_title_snapshot собирает всё в один JSON-совместимый словарь для dcc.Store.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy.exc import DBAPIError
+
+from config import set as settings
+from database.db import session_scope
+from services.drawing_service import (
+    get_data_for_project, get_data_for_project_async,
+    get_drawing_data_for_project, get_drawing_data_for_project_async,
+)
+from services.executor_service import get_executors_data_by_project, get_executors_data_by_project_async
+from services.project_service import get_time_by_chapter_for_title, get_time_by_chapter_for_title_async
+from services.metrics import timed_service
+
+# Части данных титула: имя -> (sync-сервис, async-сервис)
+TITLE_PARTS = {
+    "modeling": (get_data_for_project, get_data_for_project_async),
+    "drawings": (get_drawing_data_for_project, get_drawing_data_for_project_async),
+    "pie": (get_time_by_chapter_for_title, get_time_by_chapter_for_title_async),
+    "executors": (get_executors_data_by_project, get_executors_data_by_project_async),
+}
+
+# Части, попадающие в dcc.Store; таблица специалистов запрашивается постранично
+# (executor_service.get_executors_page), при загрузке титула она только прогревает кэш сервисов
+STORE_PARTS = ("modeling", "drawings", "pie")
+
+_thread_pool = ThreadPoolExecutor(max_workers=len(TITLE_PARTS), thread_name_prefix="title-data")
+
+
+async def _with_session(service, **kwargs):
+    from database.async_db import async_session_scope
+
+    # Отдельная сессия на каждый запрос: одна AsyncSession не выполняет запросы параллельно
+    async with async_session_scope() as db:
+        return await service(db, **kwargs)
+
+
+def _with_sync_session(service, **kwargs):
+    with session_scope() as db:
+        return service(db, **kwargs)
+
+
+async def gather_title_data_async(title_id: int, parts=("modeling", "pie", "executors")) -> dict:
+    """
+    Параллельно получает части данных титула через асинхронные сервисы.
+
+    :param title_id: ID титула
+    :param parts: Имена частей из TITLE_PARTS
+    :return: {имя части: DataFrame | None}
+    """
+    results = await asyncio.gather(*(_with_session(TITLE_PARTS[part][1], title_id=title_id) for part in parts))
+    return dict(zip(parts, results))
+
+
+def _gather_in_threads(title_id: int, parts) -> dict:
+    futures = {part: _thread_pool.submit(_with_sync_session, TITLE_PARTS[part][0], title_id=title_id) for part in parts}
+    return {part: future.result() for part, future in futures.items()}
+
+
+# Ошибки конфигурации — async-путь отключается до перезапуска воркера: нет драйвера,
+# неподдерживаемая база или параметры URL (TypeError от asyncpg)
+ASYNC_CONFIG_ERRORS = (ImportError, ValueError, TypeError)
+# Ошибки подключения (база временно недоступна) — запрос выполняется в пуле потоков,
+# async-путь пробуется снова через settings.db_async_retry_seconds
+ASYNC_CONNECTION_ERRORS = (OSError, DBAPIError)
+
+_async_available = None  # None — подключение ещё не проверено
+_async_retry_at = 0.0  # time.monotonic(), до которого после ошибки подключения используется пул потоков
+
+def gather_title_data(title_id: int, parts=("modeling", "pie", "executors"), timeout: float = None) -> dict:
+    """
+    Синхронная обёртка для Dash-колбеков: async-путь, при его недоступности — пул потоков.
+    Сервисы перехватывают свои ошибки, поэтому перед первым запросом (и после ошибки
+    подключения) подключение проверяется отдельно (check_connection).
+    """
+    global _async_available, _async_retry_at
+    if _async_available is not False and time.monotonic() >= _async_retry_at:
+        try:
+            from database.async_db import check_connection, run_async
+            if _async_available is None:
+                run_async(check_connection(), timeout)
+                _async_available = True
+            return run_async(gather_title_data_async(title_id, parts), timeout)
+        except TimeoutError:
+            raise  # подкласс OSError, но это не отказ драйвера
+        except ASYNC_CONFIG_ERRORS as e:
+            logging.warning(f"Асинхронный доступ к БД недоступен ({e}), используется пул потоков")
+            _async_available = False
+        except ASYNC_CONNECTION_ERRORS as e:
+            logging.warning(
+                f"Нет асинхронного подключения к БД ({e}), пул потоков; "
+                f"повтор через {settings.db_async_retry_seconds:g} s"
+            )
+            _async_available = None
+            _async_retry_at = time.monotonic() + settings.db_async_retry_seconds
+    return _gather_in_threads(title_id, parts)
+
+
+# Сериализация DataFrame в dcc.Store (по колонкам) и обратно
+TEXT_COLUMNS = {"name", "chapter_name"}
+
+def frame_to_columns(df):
+    if df is None:
+        return None
+    columns = {}
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            columns[column] = df[column].dt.strftime("%Y-%m-%d").tolist()
+        elif column in TEXT_COLUMNS:
+            columns[column] = df[column].astype(str).tolist()
+        else:
+            values = pd.to_numeric(df[column], errors="coerce")
+            columns[column] = values.tolist() if pd.api.types.is_integer_dtype(values) else values.astype(float).tolist()
+    return columns
+
+
+def frame_from_columns(columns, date_column: str = "Дата"):
+    if not columns:
+        return pd.DataFrame()
+    df = pd.DataFrame(columns)
+    if date_column in df.columns:
+        df[date_column] = pd.to_datetime(df[date_column], errors="coerce")
+    return df
+
+
+@timed_service
+def get_title_snapshot(title_id: int, timeout: float = None) -> dict:
+    """
+    Все агрегаты титула одним скоординированным запросом: оба линейных ряда (моделирование и чертежи),
+    разбивка времени по главам и таблица специалистов (последняя остаётся в кэше сервисов).
+
+    :return: {"title_id", "modeling", "drawings", "pie"}; значения — колонки для dcc.Store
+    """
+    data = gather_title_data(title_id, parts=tuple(TITLE_PARTS), timeout=timeout)
+    snapshot = {"title_id": title_id}
+    for part in STORE_PARTS:
+        snapshot[part] = frame_to_columns(data[part])
+    return snapshot
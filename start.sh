@@ -1,3 +1,3 @@
 #!/bin/bash
 pip install -r requirements.txt
-python -m app.py
+exec gunicorn -c gunicorn.conf.py wsgi:server
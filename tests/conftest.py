@@ -0,0 +1,72 @@
+"""
+Общие фикстуры тестов: временная база SQLite вместо DATABASE_URL окружения.
+
+Переменные окружения задаются до импорта config, поэтому модули приложения
+импортируются только внутри тестов и фикстур.
+
+    python -m pytest -q
+"""
+import datetime
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEST_DIR = tempfile.mkdtemp(prefix="project_dashboard_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'dashboard.sqlite3')}"
+# benchmarks.common (наполнение базы в seeded_db) берёт базу из BENCH_DATABASE_URL
+os.environ["BENCH_DATABASE_URL"] = os.environ["DATABASE_URL"]
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["CACHE_PATH"] = ""
+os.environ["METRICS_DIR"] = ""
+os.environ["CACHE_INVALIDATION_LISTEN"] = "false"
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """
+    База с проектом из трёх титулов, исполнителями, главами и строками всех таблиц фактов.
+
+    :return: {"project_id": ..., "title_ids": [...], "executor_ids": [...]}
+    """
+    from benchmarks.bench_indexes import seed
+    from benchmarks.common import reset_database, seed_dimensions
+    from database import crud, models
+    from database.db import SessionLocal
+    from services.cache import service_cache
+
+    random.seed(7)
+    reset_database(force=True)  # временная база тестов
+    db = SessionLocal()
+    try:
+        title_ids, _ = seed_dimensions(db, titles=3, executors=8)
+        executor_ids = [executor_id for (executor_id,) in db.query(models.Executor.id).all()]
+        seed(db, 2000, title_ids, executor_ids)
+        chapters = [crud.create_title_chapter(db, f"chapter-{i}", title_ids[0]).id for i in range(3)]
+        crud.bulk_create_worksection_tasks(db, [
+            {
+                "task_name": f"task-{i}",
+                "date": datetime.date(2020, 1, 1 + i % 28),
+                "time": random.uniform(1, 5),
+                "money": 1,
+                "user_id": executor_ids[i % len(executor_ids)],
+                "title_id": title_ids[0],
+                "chapter_id": chapters[i % len(chapters)],
+            }
+            for i in range(60)
+        ])
+        project_id = db.query(models.Project.id).scalar()
+    finally:
+        db.close()
+    service_cache.clear()
+    return {"project_id": project_id, "title_ids": title_ids, "executor_ids": executor_ids}
@@ -0,0 +1,140 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from services.cache import FileCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    directory = tmp_path / "cache"
+    directory.mkdir(mode=0o700)
+    return str(directory / "cache.sqlite3")
+
+
+def test_file_cache_is_shared_between_instances(cache_path):
+    writer = FileCache(cache_path, max_entries=10, ttl_seconds=60)
+    reader = FileCache(cache_path, max_entries=10, ttl_seconds=60)
+    frame = pd.DataFrame({"date": pd.to_datetime(["2020-01-01", "2020-01-02"]), "value": [1.5, 2.5]})
+
+    writer.set(("get_data", 1, 0, ()), frame)
+    found, value = reader.get(("get_data", 1, 0, ()))
+
+    assert found
+    pd.testing.assert_frame_equal(value, frame)
+    assert reader.get(("get_data", 2, 0, ())) == (False, None)
+
+
+def test_file_cache_invalidation_is_shared(cache_path):
+    first = FileCache(cache_path, max_entries=10, ttl_seconds=60)
+    second = FileCache(cache_path, max_entries=10, ttl_seconds=60)
+    first.set(("get_data", 1, 0, ()), "title 1")
+    first.set(("get_data", 2, 0, ()), "title 2")
+
+    second.invalidate_titles([1])
+
+    assert first.version(1) == 1 and first.version(2) == 0
+    assert first.get(("get_data", 1, 0, ())) == (False, None)
+    assert first.get(("get_data", 2, 0, ())) == (True, "title 2")
+
+
+def test_file_cache_expires_by_ttl(cache_path):
+    writer = FileCache(cache_path, max_entries=10, ttl_seconds=0.05)
+    reader = FileCache(cache_path, max_entries=10, ttl_seconds=0.05)
+    writer.set(("get_data", 1, 0, ()), "value")
+    assert reader.get(("get_data", 1, 0, ())) == (True, "value")
+
+    time.sleep(0.1)
+
+    assert reader.get(("get_data", 1, 0, ())) == (False, None)
+    assert reader.stats()["entries"] == 0
+
+
+def test_file_cache_evicts_oldest_when_full(cache_path):
+    first = FileCache(cache_path, max_entries=3, ttl_seconds=60)
+    second = FileCache(cache_path, max_entries=3, ttl_seconds=60)
+    for index in range(5):
+        (first if index % 2 else second).set(("get_data", index, 0, ()), index)
+        time.sleep(0.01)
+
+    assert first.stats()["entries"] == 3
+    assert first.evictions + second.evictions == 2
+    assert [first.get(("get_data", index, 0, ()))[0] for index in range(5)] == [False, False, True, True, True]
+
+
+def test_file_cache_refuses_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    cache = FileCache(str(shared / "cache.sqlite3"), max_entries=10, ttl_seconds=60)
+
+    with pytest.raises(PermissionError):
+        cache.get(("get_data", 1, 0, ()))
+
+
+def test_file_cache_refuses_planted_file(cache_path, tmp_path):
+    path = cache_path
+    os.symlink(tmp_path / "elsewhere.sqlite3", path)
+    cache = FileCache(path, max_entries=10, ttl_seconds=60)
+
+    with pytest.raises(PermissionError):
+        cache.set(("get_data", 1, 0, ()), "value")
+
+
+def load_gunicorn_conf(monkeypatch, workers: int):
+    import importlib.util
+    from config import set as settings
+
+    monkeypatch.setattr(settings, "web_workers", workers)
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py"))
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    return conf
+
+
+class FakeServer:
+    class log:
+        warnings = []
+
+        @classmethod
+        def warning(cls, message):
+            cls.warnings.append(message)
+
+
+@pytest.mark.parametrize("workers, backend", [(3, "file"), (1, "memory")])
+def test_gunicorn_picks_cache_backend_by_workers(monkeypatch, workers, backend):
+    from config import set as settings
+    from services import cache
+
+    monkeypatch.setattr(settings, "cache_backend", "")
+    monkeypatch.setattr(settings, "cache_path", "")
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    monkeypatch.setattr(cache, "_private_dir", None)
+    monkeypatch.setenv("CACHE_BACKEND", "")
+    monkeypatch.setenv("CACHE_PATH", "")
+    conf = load_gunicorn_conf(monkeypatch, workers)
+
+    conf.on_starting(FakeServer)
+    try:
+        assert settings.cache_backend == backend
+        assert os.environ["CACHE_BACKEND"] == backend
+        assert bool(settings.cache_path) == (backend == "file")
+    finally:
+        conf.on_exit(FakeServer)
+    assert not any(os.path.exists(path) for path in conf._created_dirs)
+
+
+def test_gunicorn_warns_about_memory_cache_with_workers(monkeypatch):
+    from config import set as settings
+
+    monkeypatch.setattr(settings, "cache_backend", "memory")
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    monkeypatch.setattr(FakeServer.log, "warnings", [])
+    conf = load_gunicorn_conf(monkeypatch, 4)
+
+    conf.on_starting(FakeServer)
+
+    assert settings.cache_backend == "memory"
+    assert len(FakeServer.log.warnings) == 1 and "CACHE_BACKEND=memory" in FakeServer.log.warnings[0]
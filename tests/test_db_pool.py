@@ -0,0 +1,37 @@
+import sqlite3
+import threading
+import time
+
+from database.db import TimedQueuePool
+
+CONNECT_SECONDS = 0.05
+
+
+def slow_connect():
+    time.sleep(CONNECT_SECONDS)
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+def test_connect_time_is_not_counted_as_wait():
+    pool = TimedQueuePool(slow_connect, pool_size=1, max_overflow=0, timeout=5)
+
+    pool.connect().close()
+
+    assert pool.connect_count == 1
+    assert pool.connect_seconds_total >= CONNECT_SECONDS
+    assert pool.wait_count == 1
+    assert pool.wait_seconds_total < CONNECT_SECONDS / 2
+
+
+def test_blocked_checkout_is_counted_as_wait():
+    pool = TimedQueuePool(slow_connect, pool_size=1, max_overflow=0, timeout=5)
+    held = pool.connect()
+    release = threading.Timer(0.2, held.close)
+
+    release.start()
+    pool.connect().close()
+    release.join()
+
+    assert pool.connect_count == 1
+    assert pool.wait_count == 2
+    assert pool.wait_seconds_max >= 0.15
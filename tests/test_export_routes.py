@@ -0,0 +1,79 @@
+import importlib.util
+import io
+
+import pandas as pd
+import pytest
+
+from database.db import session_scope
+from routes.export_routes import EXPORTS
+from services.frames import read_frame
+
+FORMATS = [
+    "csv",
+    pytest.param("parquet", marks=pytest.mark.skipif(
+        importlib.util.find_spec("pyarrow") is None, reason="выгрузка в Parquet требует pyarrow",
+    )),
+]
+
+
+@pytest.fixture(scope="module")
+def client(seeded_db):
+    from app import app
+
+    return app.server.test_client()
+
+
+def expected_frame(dataset: str, title_ids: list):
+    query, columns, finish = EXPORTS[dataset]
+    frames = []
+    with session_scope() as db:
+        for title_id in title_ids:
+            frame = read_frame(db, query(title_id), columns)
+            if finish is not None:
+                frame = finish(frame)
+            frame.insert(0, "title_id", title_id)
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def download(client, dataset: str, fmt: str, title_ids: list):
+    query = "&".join(f"title_id={title_id}" for title_id in title_ids)
+    response = client.get(f"/export/{dataset}.{fmt}?{query}")
+    assert response.status_code == 200
+    data = response.get_data()
+    if fmt == "csv":
+        assert data.startswith("\ufeff".encode("utf-8"))
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig")
+    return pd.read_parquet(io.BytesIO(data))
+
+
+def comparable(frame):
+    frame = frame.copy()
+    if "Дата" in frame.columns:
+        frame["Дата"] = pd.to_datetime(frame["Дата"]).dt.strftime("%Y-%m-%d")
+    return frame.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("dataset", list(EXPORTS))
+def test_download_matches_read_frame(client, seeded_db, dataset, fmt):
+    title_ids = seeded_db["title_ids"][:2]
+    expected = expected_frame(dataset, title_ids)
+    assert not expected.empty
+
+    downloaded = download(client, dataset, fmt, title_ids)
+
+    assert list(downloaded.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(comparable(downloaded), comparable(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_empty_download_keeps_columns(client, seeded_db, fmt):
+    title_id = seeded_db["title_ids"][2]  # у третьего титула нет глав
+    expected = expected_frame("chapters", [title_id])
+    assert expected.empty
+
+    downloaded = download(client, "chapters", fmt, [title_id])
+
+    assert downloaded.empty
+    assert list(downloaded.columns) == ["title_id", *EXPORTS["chapters"][1]]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from services.figure_payload import _as_array, compact_figure, list_figure
+
+
+@pytest.fixture(scope="module")
+def graph_callbacks():
+    from callbacks import graph_callbacks
+
+    return graph_callbacks
+
+
+def modeling_series(days: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "Дата": pd.date_range("2015-01-01", periods=days, freq="D"),
+        "Масса": rng.gamma(2, 5, days),
+        "Сложность": rng.uniform(1, 10, days),
+        "Общие часы": rng.uniform(0, 8, days),
+        "Плановая масса": rng.gamma(2, 5, days),
+    })
+
+
+def xs(figure: dict) -> list:
+    return [_as_array(trace["x"]) for trace in figure["data"]]
+
+
+def test_traces_with_shared_x_keep_the_same_points(graph_callbacks):
+    df_line = graph_callbacks.prepare_line_data(modeling_series(), "day", True)
+    fig = graph_callbacks.create_line_graph(df_line, "day", True, ["show_complexity"])
+
+    figure = compact_figure(fig, max_points=300)
+    overlay = graph_callbacks.complexity_overlay(df_line, "day", True, 300)
+
+    first, *others = xs(figure) + [_as_array(overlay["trace"]["x"])]
+    assert len(first) == 300
+    for x in others:
+        np.testing.assert_array_equal(x, first)
+
+
+def test_traces_with_different_x_are_sampled_separately():
+    df = modeling_series()
+    fig = go.Figure([
+        go.Scatter(x=df["Дата"], y=df["Масса"]),
+        go.Scatter(x=df["Дата"].iloc[::2], y=df["Плановая масса"].iloc[::2]),
+    ])
+
+    first, second = xs(compact_figure(fig, max_points=200))
+
+    assert len(first) == len(second) == 200
+    assert not np.array_equal(first, second)
+
+
+@pytest.mark.parametrize("to_payload", [compact_figure, list_figure])
+def test_payload_keeps_template_styling(to_payload):
+    fig = go.Figure([go.Bar(x=["a", "b"], y=[1, 2]), go.Scatter(x=[1, 2], y=[3, 4])])
+    template = pio.templates[pio.templates.default]
+
+    layout = to_payload(fig)["layout"]
+
+    assert layout["template"]["layout"]["colorway"] == list(template.layout.colorway)
+    assert layout["template"]["layout"]["xaxis"]["gridcolor"] == template.layout.xaxis.gridcolor
+    assert set(layout["template"]["data"]) == {"bar", "scatter"}
+    assert "colorscale" not in layout["template"]["layout"]
@@ -0,0 +1,108 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from services.cache import service_cache
+from services.title_service import get_title_snapshot
+
+
+@pytest.fixture(scope="module")
+def graph_callbacks(seeded_db):
+    from callbacks import graph_callbacks
+
+    return graph_callbacks
+
+
+def live_with_new_day(graph_callbacks, snapshot, mass):
+    """Состояние живого режима со строкой дня после последнего дня снимка."""
+    live = graph_callbacks.new_live_state(snapshot)
+    last = datetime.date.fromisoformat(snapshot["modeling"]["Дата"][-1])
+    row = {column: values[-1] for column, values in snapshot["modeling"].items()}
+    row.update({"Дата": (last + datetime.timedelta(days=1)).isoformat(), "Масса": mass})
+    rows = graph_callbacks.fresh_rows({column: [value] for column, value in row.items()}, live["rows"]["modeling"])
+    known = graph_callbacks.merge_series(live["rows"]["modeling"], {c: [r[c] for r in rows] for c in rows[0]})
+    live["rows"]["modeling"] = graph_callbacks.frame_to_columns(known)
+    return live, row
+
+
+@pytest.mark.parametrize("interval", ["week", "month", "quarter"])
+def test_rebuilt_graph_includes_live_rows(graph_callbacks, seeded_db, interval):
+    service_cache.clear()
+    snapshot = get_title_snapshot(seeded_db["title_ids"][0])
+    live, row = live_with_new_day(graph_callbacks, snapshot, mass=12345.0)
+
+    series = graph_callbacks.merge_series(snapshot["modeling"], live["rows"]["modeling"])
+    figure, overlay, df_line = graph_callbacks.line_figure(series, interval, True, ["show_complexity"], 2000)
+
+    expected = graph_callbacks.prepare_line_data(series.copy(), interval, True)
+    pd.testing.assert_frame_equal(df_line, expected)
+    assert pd.Timestamp(series["Дата"].iloc[-1]) == pd.Timestamp(row["Дата"])
+    assert df_line["Масса"].iloc[-1] >= 12345.0
+    assert [trace["name"] for trace in figure["data"]] == ["Масса", "Плановая масса", "Сложность"]
+    assert overlay["trace"]["name"] == "Сложность"
+
+
+def test_comparison_fingerprint_tracks_data(graph_callbacks, seeded_db):
+    title_ids = seeded_db["title_ids"][:2]
+    service_cache.clear()
+    _, first = graph_callbacks.comparison_figure(title_ids, "week", True, 2000)
+    _, second = graph_callbacks.comparison_figure(title_ids, "week", True, 2000)
+    _, single = graph_callbacks.comparison_figure(title_ids[:1], "week", True, 2000)
+
+    assert first is not None
+    assert first == second
+    assert single != first
+
+
+def refresh_request(live, snapshot, interval, compare_titles=None):
+    from app import app
+
+    output = next(key for key in app.callback_map if "store-live.data@" in key)
+    state = [
+        ("store-live", "data", live),
+        ("toggle-complexity", "value", []),
+        ("store-title-snapshot", "data", snapshot),
+        ("toggle-switch", "value", True),
+        ("store-interval", "data", interval),
+        ("compare-dropdown", "value", compare_titles or []),
+        ("store-graph-width", "data", 1200),
+    ]
+    response = app.server.test_client().post("/_dash-update-component", json={
+        "output": output,
+        "outputs": [dict(zip(("id", "property"), part.split("."))) for part in output[2:-2].split("...")],
+        "inputs": [{"id": "live-interval", "property": "n_intervals", "value": 1}],
+        "state": [{"id": i, "property": p, "value": v} for i, p, v in state],
+        "changedPropIds": ["live-interval.n_intervals"],
+    })
+    assert response.status_code == 200
+    return response.get_json()["response"]
+
+
+def test_live_refresh_rebuilds_non_day_graph(graph_callbacks, seeded_db):
+    from database import crud
+    from database.db import session_scope
+
+    day = datetime.date(2022, 6, 1)
+    with session_scope() as db:
+        title_id = crud.create_title(db, "live", seeded_db["project_id"]).id
+        crud.bulk_create_modeling_data(db, [
+            {"date": day + datetime.timedelta(days=i), "executor_id": seeded_db["executor_ids"][0], "title_id": title_id,
+             "total_mass": 1e6, "total_complexity": 2, "number_of_records": 1}
+            for i in range(20)
+        ])
+    snapshot = get_title_snapshot(title_id)
+    live = graph_callbacks.new_live_state(snapshot)
+
+    assert refresh_request(live, snapshot, "week") == {}  # новых строк нет — ничего не пересылается
+
+    with session_scope() as db:
+        crud.bulk_create_modeling_data(db, [{
+            "date": day + datetime.timedelta(days=30), "executor_id": seeded_db["executor_ids"][0], "title_id": title_id,
+            "total_mass": 5e6, "total_complexity": 2, "number_of_records": 1,
+        }])
+
+    response = refresh_request(live, snapshot, "week")
+    figure = response["line-graph"]["figure"]
+    assert [trace["name"] for trace in figure["data"]] == ["Масса", "Плановая масса"]
+    assert response["store-live"]["data"]["rows"]["modeling"]["Дата"][-1] == (day + datetime.timedelta(days=30)).isoformat()
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from config import set as settings
+from services import metrics
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "metrics"
+    directory.mkdir(mode=0o700)
+    monkeypatch.setattr(settings, "metrics_dir", str(directory))
+    saved = {metric.name: metric.values for metric in metrics.REGISTRY}
+    for metric in metrics.REGISTRY:
+        metric.values = {}
+    yield directory
+    for metric in metrics.REGISTRY:
+        metric.values = saved[metric.name]
+
+
+def flush_as_worker(pid: int, monkeypatch):
+    # Значения текущего процесса записываются в файл воркера pid, после чего обнуляются
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "getpid", lambda: pid)
+        metrics.flush()
+    for metric in metrics.REGISTRY:
+        metric.values = {}
+
+
+def test_collect_merges_worker_files(metrics_dir, monkeypatch):
+    metrics.CALLBACK_SECONDS.observe(0.003, "update_graph")
+    metrics.CALLBACK_SECONDS.observe(0.2, "update_graph")
+    metrics.ERRORS.inc("update_graph")
+    flush_as_worker(1001, monkeypatch)
+
+    metrics.CALLBACK_SECONDS.observe(0.004, "update_graph")
+    metrics.CALLBACK_SECONDS.observe(1.5, "update_pie_chart")
+    metrics.ERRORS.inc("update_graph", amount=2)
+    flush_as_worker(1002, monkeypatch)
+
+    metrics.CALLBACK_SECONDS.observe(0.02, "update_graph")  # текущий процесс, ещё не сброшен в файл
+
+    values = metrics.collect()
+    buckets = metrics.CALLBACK_SECONDS.buckets
+    graph = values[metrics.CALLBACK_SECONDS.name][("update_graph",)]
+    assert sum(graph[:-1]) == 4
+    assert graph[-1] == pytest.approx(0.003 + 0.2 + 0.004 + 0.02)
+    assert graph[buckets.index(0.005)] == 2
+    assert graph[buckets.index(0.025)] == 1
+    assert graph[buckets.index(0.25)] == 1
+    assert sum(values[metrics.CALLBACK_SECONDS.name][("update_pie_chart",)][:-1]) == 1
+    assert values[metrics.ERRORS.name][("update_graph",)] == [3]
+
+    text = metrics.render()
+    assert 'dashboard_callback_duration_seconds_count{callback="update_graph"} 4' in text
+    assert 'dashboard_callback_duration_seconds_bucket{callback="update_graph",le="+Inf"} 4' in text
+    assert 'dashboard_errors_total{source="update_graph"} 3' in text
+
+
+def test_collect_skips_malformed_files(metrics_dir):
+    (metrics_dir / "metrics_1.json").write_text("not json")
+    (metrics_dir / "metrics_2.json").write_text(
+        '{"dashboard_errors_total": [[["a", "extra"], [1]], [["b"], ["1"]], [["c"], [5]]], "unknown": []}'
+    )
+    (metrics_dir / "metrics_3.pickle").write_bytes(b"\x80\x05N.")
+
+    values = metrics.collect()
+
+    assert values[metrics.ERRORS.name] == {("c",): [5]}
+
+
+def test_collect_ignores_shared_directory(metrics_dir):
+    (metrics_dir / "metrics_2.json").write_text('{"dashboard_errors_total": [[["c"], [5]]]}')
+    metrics_dir.chmod(0o777)
+
+    values = metrics.collect()
+
+    assert ("c",) not in values[metrics.ERRORS.name]
+
+
+def test_prepare_metrics_dir_creates_private_directory(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_dir", "")
+    created = metrics.prepare_metrics_dir()
+    try:
+        assert created == settings.metrics_dir
+        assert os.stat(created).st_mode & 0o777 == 0o700
+    finally:
+        os.rmdir(created)
@@ -0,0 +1,110 @@
+import datetime
+
+import pytest
+
+from database import crud, migrations, models, rollups
+from database.db import SessionLocal, engine
+
+
+def snapshot(db) -> dict:
+    """Содержимое всех таблиц агрегатов: {таблица: {ключ: {колонка: значение}}}."""
+    tables = {}
+    for rollup_model, key_columns in rollups.KEY_COLUMNS.items():
+        table = rollup_model.__table__
+        rows = {}
+        for row in db.execute(table.select()).mappings():
+            key = tuple(row[column] for column in key_columns)
+            rows[key] = {column: value for column, value in row.items() if column not in key_columns}
+        tables[table.name] = rows
+    return tables
+
+
+def assert_same_rollups(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for table in expected:
+        assert actual[table].keys() == expected[table].keys(), table
+        for key, values in expected[table].items():
+            assert actual[table][key] == pytest.approx(values), (table, key)
+
+
+@pytest.fixture
+def db(seeded_db):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def ingest_mixed(db, title_id: int, executor_ids: list):
+    # Одиночные вставки и пакеты, в том числе строки без сложности и без исполнителя
+    day = datetime.date(2021, 3, 1)
+    crud.create_modeling_data(db, {
+        "date": day, "executor_id": executor_ids[0], "title_id": title_id,
+        "total_mass": 2.5e6, "total_complexity": None, "number_of_records": 1,
+    })
+    crud.create_modeling_data(db, {
+        "date": day, "executor_id": None, "title_id": title_id,
+        "total_mass": 1e6, "total_complexity": 3, "number_of_records": 1,
+    })
+    crud.create_drawing_data(db, {"date": day, "executor_id": executor_ids[1], "title_id": title_id, "number_of_drawings": 4})
+    crud.create_work_hours_in_tekla(db, {"date": day, "executor_id": executor_ids[2], "title_id": title_id, "hours_worked": 7.5})
+    crud.create_work_hours_in_work_section(db, {
+        "date": day, "executor_id": executor_ids[2], "title_id": title_id, "hours_worked": 2,
+    })
+    chapter = crud.create_title_chapter(db, "mixed", title_id)
+    crud.create_worksection_task(db, {
+        "task_name": "mixed", "date": day, "time": 1.25, "money": 1,
+        "user_id": executor_ids[0], "title_id": title_id, "chapter_id": chapter.id,
+    })
+    crud.bulk_create_modeling_data(db, [
+        {
+            "date": day + datetime.timedelta(days=index % 3), "executor_id": executor_ids[index % len(executor_ids)],
+            "title_id": title_id, "total_mass": 1e5 * index, "total_complexity": index % 4 or None,
+            "number_of_records": 1,
+        }
+        for index in range(50)
+    ], chunk_size=7)
+    crud.bulk_create_drawing_data(db, [
+        {"date": day, "executor_id": executor_ids[index % 3], "title_id": title_id, "number_of_drawings": index}
+        for index in range(10)
+    ], chunk_size=3)
+
+
+def test_incremental_rollups_match_rebuild(db, seeded_db):
+    title = crud.create_title(db, "mixed", seeded_db["project_id"])
+    ingest_mixed(db, title.id, seeded_db["executor_ids"])
+    incremental = snapshot(db)
+
+    rollups.rebuild_rollups(db)
+
+    assert_same_rollups(snapshot(db), incremental)
+
+
+def test_upgrade_backfills_empty_rollups(db):
+    expected = snapshot(db)
+    for rollup_model in rollups.KEY_COLUMNS:
+        db.query(rollup_model).delete()
+    db.commit()
+    assert rollups.rollups_empty(db)
+
+    migrations.upgrade(engine)
+
+    db.expire_all()
+    assert_same_rollups(snapshot(db), expected)
+    assert not migrations.backfill_rollups(engine)
+
+
+def test_upsert_sends_records_in_key_order(db, seeded_db, monkeypatch):
+    title_id = seeded_db["title_ids"][1]
+    increments = {
+        (title_id, datetime.date(2022, 1, 3)): {"tekla_hours": 1.0},
+        (title_id, datetime.date(2022, 1, 1)): {"tekla_hours": 1.0},
+        (title_id, datetime.date(2022, 1, 2)): {"tekla_hours": 1.0},
+    }
+    sent = []
+    execute = db.execute
+    monkeypatch.setattr(db, "execute", lambda statement, records=None: sent.append(records) or execute(statement, records))
+
+    rollups._upsert_increments(db, models.TitleDailyStats, increments)
+    db.rollback()
+
+    assert [record["date"] for record in sent[0]] == sorted(key[1] for key in increments)
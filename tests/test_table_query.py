@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+from database.db import session_scope
+from services.cache import service_cache
+from services.executor_service import EXECUTOR_DTYPES, get_executors_data_by_project, get_executors_page
+from services.table_query import parse_filter_query, parse_sort_by
+
+
+@pytest.mark.parametrize("filter_query, expected", [
+    ("{mass} > 10", [("mass", "gt", 10.0)]),
+    ("{mass}>=10", [("mass", "ge", 10.0)]),
+    ("{mass} le -1.5", [("mass", "le", -1.5)]),
+    ("{mass} lt 3 && {mass} ne 2", [("mass", "lt", 3.0), ("mass", "ne", 2.0)]),
+    ("{completed_drawings} = 4", [("completed_drawings", "eq", 4.0)]),
+    ('{name} contains "Ив"', [("name", "contains", "Ив")]),
+    ("{name} contains Ив", [("name", "contains", "Ив")]),
+    ('{name} contains "Serge "', [("name", "contains", "Serge ")]),
+    ("{name} eq 'O\\'Brien'", [("name", "eq", "O'Brien")]),
+    ("{name} eq `12`", [("name", "eq", "12")]),
+    ("{name} datestartswith 2020-01", [("name", "datestartswith", "2020-01")]),
+    ("{name} contains 5", [("name", "contains", "5")]),
+    ("{name} = 5", [("name", "eq", "5")]),
+    ("{mass} = '5'", [("mass", "eq", 5.0)]),
+    ("{mass} contains 5", []),
+    ("{completed_drawings} datestartswith 2", []),
+    ("{mass} > abc && {name} ne x", [("name", "ne", "x")]),
+    ("{unknown} > 1 && {mass} gt 1", [("mass", "gt", 1.0)]),
+    ("{mass} between 1", []),
+    ("mass > 1", []),
+    ("", []),
+    (None, []),
+])
+def test_parse_filter_query(filter_query, expected):
+    assert parse_filter_query(filter_query, EXECUTOR_DTYPES) == expected
+
+
+def test_parse_sort_by():
+    sort_by = [{"column_id": "mass", "direction": "desc"}, {"column_id": "name", "direction": "asc"}, {"column_id": "x"}]
+
+    assert parse_sort_by(sort_by, EXECUTOR_DTYPES) == [("mass", False), ("name", True)]
+
+
+def page(title_id, filter_query, sort_by, cached: bool):
+    # cached=False — фильтр и сортировка в SQL; cached=True — по DataFrame из кэша сервисов
+    service_cache.clear()
+    with session_scope() as db:
+        if cached:
+            get_executors_data_by_project(db, title_id=title_id)
+        frame, total = get_executors_page(db, title_id, 0, 100, sort_by, filter_query)
+    service_cache.clear()
+    return frame.reset_index(drop=True), total
+
+
+@pytest.fixture(scope="module")
+def table(seeded_db):
+    title_id = seeded_db["title_ids"][0]
+    frame, total = page(title_id, "", None, cached=False)
+    assert total > 2
+    return title_id, frame
+
+
+FILTERS = [
+    "{mass} > %(mass)s", "{mass} gt %(mass)s",
+    "{mass} >= %(mass)s", "{mass} ge %(mass)s",
+    "{mass} < %(mass)s", "{mass} lt %(mass)s",
+    "{mass} <= %(mass)s", "{mass} le %(mass)s",
+    "{mass} = %(mass)s", "{mass} eq %(mass)s",
+    "{mass} != %(mass)s", "{mass} ne %(mass)s",
+    "{completed_drawings} >= %(drawings)s && {mass} > 0",
+    '{name} contains "%(fragment)s"', "{name} contains %(fragment_upper)s", "{name} contains %(digit)s",
+    "{name} datestartswith %(prefix)s",
+    "{name} = '%(name)s'", "{name} != '%(name)s'",
+    "{name} > '%(name)s'",
+]
+
+
+@pytest.mark.parametrize("template", FILTERS)
+@pytest.mark.parametrize("sort_by", [None, [{"column_id": "mass", "direction": "desc"}]])
+def test_sql_and_cached_pages_match(table, template, sort_by):
+    title_id, frame = table
+    middle = frame.iloc[len(frame) // 2]
+    filter_query = template % {
+        "mass": middle["mass"],
+        "drawings": int(middle["completed_drawings"]),
+        "name": middle["name"],
+        "fragment": middle["name"][-3:],
+        "fragment_upper": middle["name"][-3:].upper(),
+        "digit": middle["name"][-1],
+        "prefix": middle["name"][:5],
+    }
+
+    from_sql, sql_total = page(title_id, filter_query, sort_by, cached=False)
+    from_cache, cache_total = page(title_id, filter_query, sort_by, cached=True)
+
+    assert sql_total == cache_total == len(from_sql)
+    assert 0 < sql_total <= len(frame)
+    pd.testing.assert_frame_equal(from_sql, from_cache, check_dtype=False)
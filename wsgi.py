@@ -0,0 +1,8 @@
+"""
+WSGI-точка входа для продакшена:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+"""
+from app import app
+
+server = app.server